@@ -0,0 +1,107 @@
+"""
+Benchmark: DOCX extraction, python-docx object model vs the streaming extractor.
+
+Renders a synthetic resume with a header, a skills table and `--paragraphs`
+experience entries, then extracts it `--repeat` times with each path. Every
+path runs in a fresh subprocess so its peak RSS (ru_maxrss above the
+post-import baseline) is measured in isolation.
+
+Run from backend/:
+    python benchmarks/bench_docx.py --paragraphs 2000
+"""
+import sys
+import os
+import argparse
+import io
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from synthetic_corpus import make_resume
+
+
+def python_docx_text(data):
+    # The extractor before streaming: body paragraphs of the full object model
+    import docx
+    return "\n".join(p.text for p in docx.Document(io.BytesIO(data)).paragraphs)
+
+
+def streaming_text(data):
+    from utils.parser import extract_text_from_docx
+    return extract_text_from_docx(io.BytesIO(data))
+
+
+PATHS = {"python-docx": python_docx_text, "stream": streaming_text}
+
+
+def render(paragraphs, seed):
+    import docx
+    resume = make_resume(random.Random(seed), 20, paragraphs)
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Candidate | candidate@example.com | +1 555 0100"
+    table = document.add_table(rows=0, cols=2)
+    for i in range(0, len(resume.skills), 2):
+        cells = table.add_row().cells
+        cells[0].text, cells[1].text = resume.skills[i], ", ".join(resume.skills[i + 1:i + 2])
+    for line in resume.text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(path_name, file_path, repeat):
+    # Runs in the subprocess: import everything first, then measure extraction only
+    import docx # noqa: F401
+    import utils.parser # noqa: F401
+    with open(file_path, "rb") as handle:
+        data = handle.read()
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = PATHS[path_name](data)
+        timings.append(time.perf_counter() - start)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"best_ms": min(timings) * 1000, "peak_rss_mb": (peak_kb - baseline_kb) / 1024,
+                      "chars": len(text), "text": text}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000, help="Experience entries (document size, default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--measure", nargs=2, metavar=("PATH", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure[0], args.measure[1], args.repeat)
+        return
+
+    data = render(args.paragraphs, args.seed)
+    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as handle:
+        handle.write(data)
+    try:
+        results = {}
+        for name in PATHS:
+            output = subprocess.run([sys.executable, __file__, "--repeat", str(args.repeat), "--measure", name, handle.name],
+                                    capture_output=True, text=True, check=True).stdout
+            results[name] = json.loads(output.strip().splitlines()[-1])
+    finally:
+        os.unlink(handle.name)
+
+    old_lines = set(results["python-docx"]["text"].splitlines())
+    missing = old_lines - set(results["stream"]["text"].splitlines())
+    assert not missing, f"streaming extractor lost {len(missing)} python-docx lines"
+    print(f"Document: {len(data):,} bytes, {args.paragraphs} experience entries, header and skills table")
+    for name, result in results.items():
+        print(f"{name:>12}: {result['best_ms']:8.1f} ms  peak +{result['peak_rss_mb']:6.1f} MB  {result['chars']:,} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: one resume against a catalog of job descriptions.
+
+Compares calling advanced_match once per catalog JD with JDCatalog.scores
+(one vectorized pass), and checks both give the same overall scores. Uses a
+blank spaCy pipeline when en_core_web_sm is missing so skill matching runs.
+
+Run from backend/:  python benchmarks/bench_jd_catalog.py [N]
+"""
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import scorer
+from utils.it_taxonomy_data import IT_TAXONOMY
+from utils.extraction_engine import mock_ai_parse_resume
+from utils.advanced_scorer import advanced_match
+from utils.jd_catalog import JDCatalog
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    if scorer.get_nlp() is None:
+        import spacy
+        blank = spacy.blank("en")
+        scorer.get_nlp = lambda: blank
+
+    rng = random.Random(3)
+    skills = sorted({s for values in IT_TAXONOMY.values() for s in values})
+    catalog = JDCatalog()
+    for i in range(size):
+        duty = rng.choice(["build apis", "deploy services on aws", "train models", ""])
+        catalog.add(f"Role {i}. Requirements: {', '.join(rng.sample(skills, rng.randint(0, 10)))}. "
+                    f"Responsibilities: {duty} for team {i % 50}. {rng.randint(0, 8)}+ years")
+    resume = mock_ai_parse_resume(f"5 years. Built payment api. Skills: {', '.join(rng.sample(skills, 15))}")
+    catalog.recommend(resume, 10) # Builds the flattened arrays and caches JD lemmas
+
+    start = time.perf_counter()
+    expected = [advanced_match(resume, plan).overall_score for plan in catalog._plans]
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = catalog.scores(resume)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    catalog.recommend(resume, 10)
+    recommend = time.perf_counter() - start
+
+    assert scores.tolist() == expected
+    print(f"{size} JDs advanced_match loop : {loop * 1000:9.2f} ms")
+    print(f"{size} JDs vectorized scores   : {vectorized * 1000:9.2f} ms")
+    print(f"recommend top-10 (incl. report): {recommend * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
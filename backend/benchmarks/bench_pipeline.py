@@ -0,0 +1,163 @@
+"""
+Benchmark: per-stage latency of the /analyze pipeline on a synthetic corpus.
+
+Generates resumes and JDs (see synthetic_corpus), renders resumes to PDF, DOCX
+and TXT, and times every stage separately:
+extract_text (per format), extract_pdf (per engine), extract_sections, JDAgent.run, ResumeAgent.run,
+semantic_match, calculate_semantic_similarity, advanced_match, ExplanationAgent.run.
+
+Reports p50/p95/p99 (ms) and throughput per stage as JSON. With --baseline the
+run is compared against a stored report and exits 1 if any stage's p50 is more
+than --threshold percent (and --min-delta-ms) slower; --save-baseline writes
+the report as the new baseline.
+
+Run from backend/:
+    python benchmarks/bench_pipeline.py --count 50 --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --count 50 --baseline benchmarks/baseline.json --threshold 20
+"""
+import sys
+import os
+import argparse
+import json
+import platform
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from synthetic_corpus import RENDERERS, make_jd, make_resume
+from utils import parser as text_parser
+from utils.text_cache import TextCache
+from utils.parser import extract_text
+from utils.extractor import extract_sections
+from utils.extraction_engine import JDAgent, ResumeAgent, ExplanationAgent
+from utils.normalizer import TAXONOMY_INDEX
+from utils import scorer
+from utils.advanced_scorer import advanced_match
+
+
+def percentile(sorted_values, q):
+    # Nearest-rank percentile on an already sorted list
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    values = sorted(samples)
+    total = sum(values)
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "throughput_per_s": round(len(values) / total, 1) if total else None
+    }
+
+
+def timed(samples, stage, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def run(count, skills, paragraphs, jd_skills, seed):
+    rng = random.Random(seed)
+    # Every document is timed cold: no extracted-text or lemma cache hits
+    text_parser.TEXT_CACHE = TextCache(max_entries=0)
+    scorer.LEMMA_CACHE_SIZE = 0
+
+    resumes = [make_resume(rng, skills, paragraphs) for _ in range(count)]
+    jds = [make_jd(rng, jd_skills) for _ in range(count)]
+    rendered = {kind: [render(doc.text) for doc in resumes] for kind, render in RENDERERS.items()}
+
+    # Warm-up: load lazily registered engines outside the measurements
+    for kind in RENDERERS:
+        extract_text(rendered[kind][0], f"warmup.{kind}")
+    scorer.calculate_semantic_similarity("warm up", "warm up")
+
+    samples = {}
+    for i in range(count):
+        for kind in RENDERERS:
+            text = timed(samples, f"extract_text[{kind}]", extract_text, rendered[kind][i], f"resume.{kind}")
+        for engine in text_parser.PDF_ENGINES[1:]:
+            # Each PDF engine forced, next to the configured selection above
+            timed(samples, f"extract_pdf[{engine}]", text_parser.extract_pdf, rendered["pdf"][i], engine)
+        timed(samples, "extract_sections", extract_sections, text)
+        jd = timed(samples, "JDAgent.run", JDAgent().run, jds[i].text)
+        resume = timed(samples, "ResumeAgent.run", ResumeAgent().run, text)
+        resume_names = [TAXONOMY_INDEX.normalize(s.skill) for s in resume.technical_skills_with_evidence]
+        timed(samples, "semantic_match", scorer.semantic_match, [TAXONOMY_INDEX.normalize(s) for s in jd.required_skills], resume_names)
+        resume_exp_text = " ".join([" ".join(e.technical_responsibilities) for e in resume.experience])
+        timed(samples, "calculate_semantic_similarity", scorer.calculate_semantic_similarity, resume_exp_text, " ".join(jd.responsibilities))
+        match = timed(samples, "advanced_match", advanced_match, resume, jd)
+        timed(samples, "ExplanationAgent.run", ExplanationAgent().run, match)
+
+    return {
+        "config": {"count": count, "skills": skills, "paragraphs": paragraphs, "jd_skills": jd_skills, "seed": seed},
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "spacy_model_loaded": scorer.get_nlp() is not None
+        },
+        "stages": {stage: summarize(values) for stage, values in samples.items()}
+    }
+
+
+def compare(report, baseline, threshold, min_delta_ms=0.0, metric="p50_ms"):
+    """
+    Returns (stage, baseline, current, change %) for stages slower than the threshold
+    by more than min_delta_ms (sub-millisecond stages are mostly timer noise).
+    """
+    regressions = []
+    for stage, stats in report["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous or not previous.get(metric):
+            continue
+        change = (stats[metric] - previous[metric]) / previous[metric] * 100
+        if change > threshold and stats[metric] - previous[metric] > min_delta_ms:
+            regressions.append((stage, previous[metric], stats[metric], round(change, 1)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=30, help="Resume/JD pairs (default: %(default)s)")
+    parser.add_argument("--skills", type=int, default=12, help="Taxonomy skills per resume (default: %(default)s)")
+    parser.add_argument("--paragraphs", type=int, default=4, help="Experience entries per resume (default: %(default)s)")
+    parser.add_argument("--jd-skills", type=int, default=8, help="Required skills per JD (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Stored report to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed p50 slowdown in percent (default: %(default)s)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this (default: %(default)s)")
+    parser.add_argument("--save-baseline", help="Write this run as the new baseline")
+    args = parser.parse_args()
+
+    report = run(args.count, args.skills, args.paragraphs, args.jd_skills, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as handle:
+            handle.write(text + "\n")
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline.get("config") != report["config"]:
+            print("Warning: baseline was recorded with a different corpus config", file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        for stage, before, after, change in regressions:
+            print(f"REGRESSION {stage}: p50 {before} ms -> {after} ms (+{change}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No stage regressed more than {args.threshold}% against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: top-k ranking over a synthetic resume corpus.
+
+Fills an in-memory ResumeCorpus with N synthetic parsed resumes and times
+ResumeCorpus.rank for a typical backend JD, reporting how many resumes were
+fully scored. Every resume has its own responsibility text. Uses a blank spaCy pipeline when en_core_web_sm is missing so the
+skill/stack bounds are exercised.
+
+Run from backend/:  python benchmarks/bench_resume_corpus.py [N]
+"""
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import scorer
+from utils.it_taxonomy_data import IT_TAXONOMY
+from utils.schemas import ParsedResume, SkillWithEvidence, ExperienceItem
+from utils.requirement_plan import compile_jd_text
+from utils.resume_corpus import ResumeCorpus
+
+JD_TEXT = (
+    "Senior backend engineer. Requirements: Python, Django, PostgreSQL, Docker, AWS, REST APIs. "
+    "Responsibilities: build scalable services and write tests. 5+ years of experience."
+)
+CAPABILITIES = ["API Development", "Database Management", "Cloud Architecture", "Test Automation", "ML Engineering"]
+VERBS = ["Built", "Designed", "Scaled", "Maintained", "Migrated", "Tested", "Automated", "Monitored", "Optimized", "Led"]
+OBJECTS = ["payment services", "reporting pipelines", "REST APIs", "data warehouse jobs", "CI workflows",
+           "search indexing", "billing integrations", "mobile backends", "ML feature stores", "internal dashboards"]
+
+
+def synthetic_resume(rng, i, skills):
+    picked = rng.sample(skills, rng.randint(3, 15))
+    capabilities = rng.sample(CAPABILITIES, rng.randint(0, 2))
+    evidence = [SkillWithEvidence(skill=s, context="skills_list") for s in picked]
+    evidence += [SkillWithEvidence(skill=c, context="experience") for c in capabilities]
+    # Distinct responsibility text per resume, as in a real corpus
+    duties = [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {', '.join(rng.sample(picked, min(2, len(picked))))}"
+              for _ in range(rng.randint(1, 3))] + [f"Owned project {i}"]
+    return ParsedResume(
+        technical_skills_with_evidence=evidence,
+        experience=[ExperienceItem(technical_responsibilities=capabilities + duties, tech_stack=picked)],
+        total_experience_years=float(rng.randint(0, 15)),
+        raw_text=f"resume {i}"
+    )
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    if scorer.get_nlp() is None:
+        import spacy
+        blank = spacy.blank("en")
+        scorer.get_nlp = lambda: blank
+
+    rng = random.Random(7)
+    skills = sorted({s for values in IT_TAXONOMY.values() for s in values})
+    corpus = ResumeCorpus()
+    start = time.perf_counter()
+    for i in range(size):
+        corpus.add(synthetic_resume(rng, i, skills), f"resume_{i}")
+    print(f"ingest {size} resumes   : {time.perf_counter() - start:8.2f} s")
+
+    plan = compile_jd_text(JD_TEXT)
+    corpus.rank(plan, 10) # Builds the numpy snapshot and lemmatizes responsibility texts
+    for k in (10, 50):
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            result = corpus.rank(plan, k)
+            runs.append(time.perf_counter() - start)
+        print(f"rank top-{k:<3}           : {min(runs) * 1000:8.2f} ms (fully scored {result['scored']})")
+
+
+if __name__ == "__main__":
+    main()
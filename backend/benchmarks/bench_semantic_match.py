@@ -0,0 +1,44 @@
+"""
+Benchmark: semantic_match on 200x200 skill lists.
+
+Compares the previous JD x resume x taxonomy nested loop with the proximity
+matrix gather + row-wise argmax (utils.skill_proximity.match_skills), and
+checks both return the same results.
+
+Run from backend/:  python benchmarks/bench_semantic_match.py
+"""
+import sys
+import os
+import random
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests')))
+
+from utils.it_taxonomy_data import IT_TAXONOMY, NORMALIZATION_MAP
+from utils.skill_proximity import match_skills
+from test_skill_proximity import legacy_semantic_match
+
+
+def skill_lists(size, seed=7):
+    rng = random.Random(seed)
+    pool = sorted({s for skills in IT_TAXONOMY.values() for s in skills} | set(NORMALIZATION_MAP))
+    # ~10% free-text capabilities that fall outside the precomputed vocabulary
+    pool += [f"Service {i} Systems Engineering" for i in range(len(pool) // 10)]
+    return [rng.choice(pool) for _ in range(size)], [rng.choice(pool) for _ in range(size)]
+
+
+def main():
+    jd, resume = skill_lists(200)
+    assert match_skills(jd, resume) == legacy_semantic_match(jd, resume)
+
+    number = 5
+    legacy = timeit.timeit(lambda: legacy_semantic_match(jd, resume), number=number) / number
+    matrix = timeit.timeit(lambda: match_skills(jd, resume), number=number) / number
+    print(f"200x200 legacy loop : {legacy * 1000:8.2f} ms")
+    print(f"200x200 matrix path : {matrix * 1000:8.2f} ms")
+    print(f"speedup             : {legacy / matrix:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: response serialization, FastAPI's default path vs utils.serialization.
+
+Builds realistic /analyze (with debug_advanced) and /analyze/batch payloads from
+the synthetic corpus and times:
+  before: jsonable_encoder + json.dumps (what FastAPI does for a returned dict)
+  after:  serialization.dumps (orjson, pydantic models dumped without re-validation)
+plus the gzip size and time of each body. Both paths must produce the same JSON.
+
+Run from backend/:
+    python benchmarks/bench_serialization.py --batch 200
+"""
+import sys
+import os
+import argparse
+import gzip
+import json
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+
+from synthetic_corpus import make_jd, make_resume
+from utils import serialization
+from utils.extractor import extract_sections
+from utils.extraction_engine import ResumeAgent, ExplanationAgent
+from utils.requirement_plan import compile_jd_text
+from utils.advanced_scorer import advanced_match
+
+
+def legacy_analysis(result):
+    # Same shape as main.legacy_analysis (not imported: main starts the app)
+    return {
+        "overall_score": result.overall_score,
+        "breakdown": result.breakdown,
+        "matched_skills": result.matched_skills,
+        "missing_skills": result.missing_critical_skills,
+        "skill_gap_analysis": result.skill_gap_analysis
+    }
+
+
+def build_payloads(batch, seed):
+    rng = random.Random(seed)
+    plan = compile_jd_text(make_jd(rng, 10).text)
+    resumes = [make_resume(rng, 14, 5).text for _ in range(batch)]
+    results = [advanced_match(ResumeAgent().run(text), plan) for text in resumes]
+    analyze = {
+        "filename": "resume.pdf",
+        "jd_source": "Text Input",
+        "analysis": legacy_analysis(results[0]),
+        "ai_insights": ExplanationAgent().run(results[0]),
+        "sections": extract_sections(resumes[0]),
+        "debug_advanced": results[0]
+    }
+    lines = [{"index": i, "filename": f"resume_{i}.pdf", "analysis": legacy_analysis(r), "debug_advanced": r}
+             for i, r in enumerate(results)]
+    return {"analyze": analyze, f"batch[{batch}]": lines}
+
+
+def before(payload):
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def after(payload):
+    return serialization.dumps(payload)
+
+
+def best_of(fn, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(payload)
+        timings.append(time.perf_counter() - start)
+    return body, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=200, help="Analyses in the batch payload (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions, best is reported (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson ' + serialization.orjson.__version__ if serialization.orjson else 'stdlib json (orjson not installed)'}")
+    for name, payload in build_payloads(args.batch, args.seed).items():
+        old_body, old_time = best_of(before, payload, args.repeat)
+        new_body, new_time = best_of(after, payload, args.repeat)
+        assert json.loads(old_body) == json.loads(new_body), f"{name}: encoders disagree"
+        gz_body, gz_time = best_of(lambda b: gzip.compress(b, compresslevel=6), new_body, args.repeat)
+        print(f"{name:>12}: {len(old_body):>9,} B  before {old_time * 1000:8.2f} ms | "
+              f"after {new_time * 1000:7.2f} ms ({old_time / new_time:5.1f}x) | "
+              f"gzip {len(gz_body):>8,} B ({len(gz_body) / len(new_body):.0%}) in {gz_time * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark: per-call cost of skill normalization / category lookup.
+
+Compares the previous linear walk over every category list with TaxonomyIndex
+on taxonomies of growing size. The linear path grows with the taxonomy, the
+index stays flat (hashed lookups + memoized normalization).
+
+Run from backend/:  python benchmarks/bench_taxonomy_index.py
+"""
+import sys
+import os
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.it_taxonomy_data import IT_TAXONOMY, NORMALIZATION_MAP
+from utils.normalizer import TaxonomyIndex
+
+
+def legacy_normalize(skill_name, taxonomy):
+    if not skill_name:
+        return ""
+    cleaned = skill_name.strip().lower()
+    if cleaned in NORMALIZATION_MAP:
+        return NORMALIZATION_MAP[cleaned]
+    for category, skills in taxonomy.items():
+        if cleaned in skills:
+            return cleaned
+    return cleaned
+
+
+def legacy_category(skill_name, taxonomy):
+    normalized = legacy_normalize(skill_name, taxonomy)
+    for category, skills in taxonomy.items():
+        if normalized in skills:
+            return category
+    return "other"
+
+
+def synthetic_taxonomy(scale):
+    """IT_TAXONOMY padded with `scale` synthetic skills per category."""
+    return {
+        cat: [f"{cat}-synthetic-{i}" for i in range(scale)] + list(skills)
+        for cat, skills in IT_TAXONOMY.items()
+    }
+
+
+def main():
+    # Mix of hits, aliases and misses, the last one in taxonomy order is the worst case
+    probes = ["Python3", "  React  ", "K8s", "Emerging Tech", "quantum computing", "unknown skill"]
+    number = 2000
+
+    print(f"{'skills':>8} | {'legacy us/call':>14} | {'index us/call':>13} | speedup")
+    for scale in (0, 100, 1000, 5000):
+        taxonomy = synthetic_taxonomy(scale)
+        index = TaxonomyIndex(taxonomy, NORMALIZATION_MAP)
+        size = sum(len(v) for v in taxonomy.values())
+
+        legacy = timeit.timeit(lambda: [legacy_category(p, taxonomy) for p in probes], number=number)
+        indexed = timeit.timeit(lambda: [index.category(p) for p in probes], number=number)
+
+        calls = number * len(probes)
+        legacy_us = legacy / calls * 1e6
+        index_us = indexed / calls * 1e6
+        print(f"{size:>8} | {legacy_us:>14.2f} | {index_us:>13.2f} | {legacy_us / index_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
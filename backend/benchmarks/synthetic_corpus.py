@@ -0,0 +1,85 @@
+"""
+Synthetic resumes and job descriptions of controlled size and skill density,
+rendered to PDF (PyMuPDF), DOCX (python-docx) and TXT.
+
+Used by the benchmark scripts; deterministic for a given seed.
+"""
+import io
+import random
+from typing import List, NamedTuple
+
+from utils.it_taxonomy_data import IT_TAXONOMY
+
+SKILLS = sorted({s for values in IT_TAXONOMY.values() for s in values})
+ROLES = ["Software Engineer", "Backend Developer", "Data Engineer", "DevOps Engineer", "QA Engineer", "ML Engineer"]
+VERBS = ["Built", "Developed", "Implemented", "Optimized", "Deployed", "Automated", "Designed", "Integrated"]
+OBJECTS = ["payment api", "reporting sql", "billing service", "search system", "data pipeline", "integration tests",
+           "recommendation model", "internal tool", "customer portal app"]
+FILLER = [
+    "Worked closely with product and design to ship features on a two week cadence.",
+    "Reviewed code, mentored junior engineers and improved onboarding documentation.",
+    "Reduced incident volume by adding monitoring, alerting and runbooks.",
+    "Participated in architecture reviews and on-call rotations.",
+]
+
+class SyntheticDocument(NamedTuple):
+    kind: str # resume | jd
+    text: str
+    skills: List[str]
+
+def make_resume(rng: random.Random, skills: int = 12, paragraphs: int = 4) -> SyntheticDocument:
+    """
+    `skills` taxonomy skills spread over the experience bullets and skills list;
+    `paragraphs` experience entries (document size).
+    """
+    picked = rng.sample(SKILLS, min(skills, len(SKILLS)))
+    lines = [f"Candidate {rng.randint(1000, 9999)}", rng.choice(ROLES), "",
+             "SUMMARY", f"{rng.choice(ROLES)} with {rng.randint(1, 15)}+ years of experience.", "",
+             "EXPERIENCE"]
+    for p in range(paragraphs):
+        lines.append(f"{rng.choice(ROLES)} - Company {p} ({2010 + p} - {2011 + p})")
+        for _ in range(3):
+            tech = ", ".join(rng.sample(picked, min(2, len(picked)))) if picked else "internal tooling"
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {tech}.")
+        lines.append(rng.choice(FILLER))
+    lines += ["", "SKILLS", ", ".join(picked), "", "EDUCATION", "B.Sc. Computer Science"]
+    return SyntheticDocument("resume", "\n".join(lines), picked)
+
+def make_jd(rng: random.Random, skills: int = 8) -> SyntheticDocument:
+    picked = rng.sample(SKILLS, min(skills, len(SKILLS)))
+    lines = [
+        f"{rng.choice(ROLES)} (Senior)", "",
+        "Requirements:", *[f"- Experience with {s}" for s in picked],
+        f"- {rng.randint(2, 8)}+ years of professional experience", "",
+        "Responsibilities:",
+        f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} and write tests.",
+        f"- Deploy services on aws and {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)}.",
+    ]
+    return SyntheticDocument("jd", "\n".join(lines), picked)
+
+def render_txt(text: str) -> bytes:
+    return text.encode("utf-8")
+
+def render_pdf(text: str) -> bytes:
+    import fitz
+    document = fitz.open()
+    page, y = None, 0.0
+    for line in text.splitlines():
+        if page is None or y > 800:
+            page, y = document.new_page(), 50.0
+        page.insert_text((50, y), line, fontsize=10)
+        y += 14
+    data = document.tobytes()
+    document.close()
+    return data
+
+def render_docx(text: str) -> bytes:
+    import docx
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx, "txt": render_txt}
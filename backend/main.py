@@ -1,18 +1,91 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from utils.parser import extract_text
-from utils.extractor import extract_sections
-from utils.scorer import calculate_score
-from utils.ai_insights import generate_ai_insights
+from utils.engines import ENGINES, import_timer, print_startup_report
+
+with import_timer("fastapi"):
+    from fastapi import FastAPI, UploadFile, File, Form, Query, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+# Heavy backends (pdfplumber, PyMuPDF, python-docx, spaCy) register with ENGINES and load on first use
+with import_timer("utils.parser"):
+    from utils.parser import extract_text, TEXT_CACHE, SANDBOX as EXTRACTION_SANDBOX
+with import_timer("utils.extractor"):
+    from utils.extractor import extract_sections
 
 # New Advanced Engine Imports
-from utils.extraction_engine import mock_ai_parse_jd, mock_ai_parse_resume, ExplanationAgent
-from utils.advanced_scorer import advanced_match
+with import_timer("utils.extraction_engine"):
+    from utils.extraction_engine import mock_ai_parse_resume, ExplanationAgent
+with import_timer("utils.requirement_plan"):
+    from utils.requirement_plan import compile_jd_text, PLAN_CACHE
+with import_timer("utils.advanced_scorer"):
+    from utils.advanced_scorer import advanced_match
+with import_timer("utils.resume_corpus"):
+    from utils.resume_corpus import corpus_from_env
+    from utils.jd_catalog import catalog_from_env
+from utils.workers import PoolBusy, pool_from_env
+from utils.metrics import METRICS, REQUEST_SECONDS, DOCUMENT_BYTES, DOCUMENT_CHARS, StageTimings
+from utils.profiling import ProfileCapture, profiled_call, profiler_from_env
+from utils.serialization import FastJSONResponse, dumps
+from utils.sandbox import ExtractionLimitExceeded
+from utils.preflight import DocumentRejected, OLE_MAGIC
+
+import asyncio
+import hashlib
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import List, Optional
+
+print_startup_report()
+
+# Responses are rendered with orjson; heavy endpoints return FastJSONResponse directly to skip jsonable_encoder
+app = FastAPI(title="Matchly AI Resume Parser", default_response_class=FastJSONResponse)
+
+# Compress large JSON/NDJSON bodies for clients that accept gzip (NDJSON stays streamed, flushed per line)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("MATCHLY_GZIP_MIN_BYTES", "1024")),
+    compresslevel=int(os.getenv("MATCHLY_GZIP_LEVEL", "6"))
+)
+
+# CPU-bound stages run here (MATCHLY_POOL_KIND / MATCHLY_WORKERS / MATCHLY_QUEUE_SIZE)
+ANALYSIS_POOL = pool_from_env()
+
+# Parsed resumes are kept for /rank only when MATCHLY_CORPUS_PATH is set
+RESUME_CORPUS = corpus_from_env()
+
+# Open roles for /recommend (MATCHLY_JD_CATALOG preloads a JSONL file)
+JD_CATALOG = catalog_from_env()
 
-import json
-from typing import Optional
+# Opt-in request profiling (MATCHLY_PROFILE_DIR); a no-op check per request otherwise
+PROFILER = profiler_from_env()
 
-app = FastAPI(title="Matchly AI Resume Parser")
+# Gauges are read from the live objects at scrape time (see /metrics)
+METRICS.gauge("matchly_pool_in_flight", "Requests admitted to the analysis pool.", lambda: ANALYSIS_POOL.stats()["in_flight"])
+METRICS.gauge("matchly_pool_queue_depth", "Admitted requests waiting for a worker.", lambda: ANALYSIS_POOL.stats()["queue_depth"])
+METRICS.callback_counter("matchly_pool_rejected_total", "Requests rejected with 503 because the pool was full.",
+                         lambda: ANALYSIS_POOL.stats()["rejected"])
+METRICS.callback_counter("matchly_pool_completed_jobs_total", "Jobs completed by the analysis pool.",
+                         lambda: ANALYSIS_POOL.stats()["completed_jobs"])
+TEXT_CACHE_EVENTS = ("hits", "memory_hits", "disk_hits", "misses", "evictions", "disk_evictions")
+METRICS.callback_counter("matchly_text_cache_events_total", "Extracted-text cache hits, misses and evictions.",
+                         lambda: {(k,): v for k, v in TEXT_CACHE.stats().items() if k in TEXT_CACHE_EVENTS}, ("event",))
+METRICS.gauge("matchly_text_cache_entries", "Documents in the extracted-text cache.", lambda: TEXT_CACHE.stats()["entries"])
+METRICS.gauge("matchly_text_cache_chars", "Characters held by the extracted-text cache.", lambda: TEXT_CACHE.stats()["chars"])
+METRICS.callback_counter("matchly_plan_cache_events_total", "Compiled JD plan cache hits and misses.",
+                         lambda: {(k,): PLAN_CACHE.stats()[k] for k in ("hits", "misses")}, ("event",))
+METRICS.gauge("matchly_plan_cache_entries", "Compiled JD plans in the cache.", lambda: PLAN_CACHE.stats()["entries"])
+METRICS.gauge("matchly_catalog_jobs", "Roles in the /recommend catalog.", lambda: len(JD_CATALOG))
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route template, not the raw path, keeps label cardinality bounded
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, str(response.status_code))
+    return response
 
 # CORS Configuration
 origins = [
@@ -31,110 +104,577 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: loads every lazily registered engine (parsers, spaCy) and
+    primes the NLP pipeline so the first /analyze call does not pay the cold start.
+    """
+    engines = ENGINES.warm_up()
+    if ENGINES.available("spacy"):
+        from utils.scorer import lemmatize_texts
+        lemmatize_texts(["warm up the semantic engine"])
+    if EXTRACTION_SANDBOX is not None:
+        EXTRACTION_SANDBOX.warm_up()
+    status_code = 200 if ENGINES.ready() else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ready" if status_code == 200 else "degraded", "engines": engines}
+    )
+
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus text format: per-stage latency, document size/page histograms, pool and cache gauges.
+    """
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats")
+def stats():
+    """
+    Runtime counters: analysis pool queue depth and wait times, text cache hit/miss/evictions, extraction sandbox, JD plan cache, resume corpus, JD catalog size.
+    """
+    return {
+        "pool": ANALYSIS_POOL.stats(),
+        "text_cache": TEXT_CACHE.stats(),
+        "sandbox": EXTRACTION_SANDBOX.stats() if EXTRACTION_SANDBOX is not None else None,
+        "jd_plans": PLAN_CACHE.stats(),
+        "corpus": RESUME_CORPUS.stats() if RESUME_CORPUS is not None else None,
+        "catalog_jobs": len(JD_CATALOG)
+    }
+
 ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
 MAX_FILE_SIZE = 5 * 1024 * 1024 # 5MB
 
-async def validate_file(file: UploadFile):
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+async def read_upload(file: UploadFile) -> bytearray:
+    """
+    Validates and reads an upload in one streaming pass: extension, magic number
+    on the first chunk, and MAX_FILE_SIZE enforced chunk by chunk (aborting as
+    soon as the limit is crossed). Chunks are copied into one buffer, pre-sized
+    when the multipart parser knows the size, so the upload is never held twice.
+    """
     ext = "." + file.filename.split('.')[-1].lower() if '.' in file.filename else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail=f"File {file.filename} has unsupported extension. Allowed: PDF, DOCX, TXT")
-    
+
+    # Size Check (cheap reject when the multipart parser already knows the size)
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail=f"File {file.filename} exceeds maximum size of 5MB.")
+
+    content = bytearray(file.size or 0)
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not total:
+            validate_magic_number(file.filename, ext, chunk)
+        if total + len(chunk) > MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail=f"File {file.filename} exceeds maximum size of 5MB.")
+        content[total:total + len(chunk)] = chunk
+        total += len(chunk)
+
+    if not total:
+        validate_magic_number(file.filename, ext, b"")
+    del content[total:] # Fewer bytes arrived than announced
+    return content
+
+def validate_magic_number(filename: str, ext: str, header: bytes):
     # Basic Magic Number Checks
-    header = await file.read(4)
-    await file.seek(0)
+    if ext == '.pdf' and header[:4] != b'%PDF':
+         raise HTTPException(status_code=400, detail=f"File {filename} does not appear to be a valid PDF.")
     
-    if ext == '.pdf' and header != b'%PDF':
-         raise HTTPException(status_code=400, detail=f"File {file.filename} does not appear to be a valid PDF.")
+    # Docx usually starts with PK (zip); OLE files (password-protected DOCX, renamed .doc) are rejected with a reason by preflight
+    if ext == '.docx' and header[:2] != b'PK' and header[:8] != OLE_MAGIC:
+         raise HTTPException(status_code=400, detail=f"File {filename} does not appear to be a valid DOCX.")
+
+def extraction_error(error: Exception) -> HTTPException:
+    # The document, not the server, is the problem: 422 rather than 500/503.
+    # Preflight rejections carry the classification so clients can tell users why.
+    if isinstance(error, DocumentRejected):
+        return HTTPException(status_code=422, detail={
+            "message": f"Could not extract text: {error.preflight.reason}",
+            "preflight": error.preflight.model_dump()
+        })
+    return HTTPException(status_code=422, detail=f"Document could not be processed within the extraction limits ({error.reason}).")
+
+def document_format(filename: str) -> str:
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else "none"
+
+async def run_profiled(capture: Optional[ProfileCapture], fn, *args):
+    """
+    ANALYSIS_POOL.run_timed, under the profiler when this request is being profiled.
+    """
+    if capture is None:
+        return await ANALYSIS_POOL.run_timed(fn, *args)
+    try:
+        (result, part), wait, duration = await ANALYSIS_POOL.run_timed(profiled_call, capture.interval, fn, *args)
+    except Exception as e:
+        if getattr(e, "profile_part", None) is not None:
+            capture.add(e.profile_part)
+        raise
+    capture.add(part)
+    return result, wait, duration
+
+async def save_profile(capture: ProfileCapture, timings: StageTimings, status: int) -> bool:
+    """
+    Writes a request's profile off the event loop. Returns False (and logs) when it cannot be written.
+    """
+    capture.tags.update({
+        "status": status,
+        "stage_ms": {name: round(seconds * 1000, 3) for name, seconds in timings.stages.items()}
+    })
+    try:
+        await asyncio.to_thread(PROFILER.write, capture)
+        return True
+    except OSError as e:
+        print(f"Warning: could not write profile {capture.id}: {e}")
+        return False
+
+async def read_job_description(job_description_file: Optional[UploadFile], job_description_text: Optional[str],
+                               timings: Optional[StageTimings] = None, capture: Optional[ProfileCapture] = None):
+    """
+    Returns (jd_text, jd_source) from either the uploaded JD file or the text field.
+    """
+    timings = timings if timings is not None else StageTimings()
+    if job_description_file:
+        # Security: Validate JD File while reading it
+        with timings.stage("read_jd"):
+            jd_content = await read_upload(job_description_file)
+        DOCUMENT_BYTES.observe(len(jd_content), "jd", document_format(job_description_file.filename))
+        jd_text, wait, duration = await run_profiled(capture, extract_text, jd_content, job_description_file.filename)
+        timings.add("queue_wait", wait)
+        timings.add("extract_jd", duration)
+        if not jd_text:
+             raise HTTPException(status_code=400, detail="Could not extract text from Job Description file.")
+        return jd_text, job_description_file.filename
+             
+    if job_description_text:
+        if len(job_description_text) > 100_000: # 100k char limit for text
+            raise HTTPException(status_code=400, detail="Job Description text too long.")
+        return job_description_text, "Text Input"
+
+    raise HTTPException(status_code=400, detail="Please provide either a Job Description file or text.")
+
+def legacy_analysis(advanced_result) -> dict:
+    # Map advanced result to legacy schema for frontend compatibility where needed
+    return {
+        "overall_score": advanced_result.overall_score,
+        "breakdown": advanced_result.breakdown,
+        "matched_skills": advanced_result.matched_skills,
+        "missing_skills": advanced_result.missing_critical_skills,
+        "skill_gap_analysis": advanced_result.skill_gap_analysis # Pass through new analysis
+    }
+
+# Top-level /analyze response fields; `analysis.<key>` selects single keys of the analysis
+ANALYZE_FIELDS = ("filename", "jd_source", "analysis", "ai_insights", "sections", "debug_advanced")
+DEFAULT_ANALYZE_FIELDS = ("filename", "jd_source", "analysis", "ai_insights", "sections")
+ANALYSIS_KEYS = ("overall_score", "breakdown", "matched_skills", "missing_skills", "skill_gap_analysis")
+
+def parse_fields(fields: Optional[str]) -> set:
+    """
+    Comma-separated field selection -> set of names; unknown names are a 400.
+    """
+    if not fields:
+        return set(DEFAULT_ANALYZE_FIELDS)
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    valid = set(ANALYZE_FIELDS) | {f"analysis.{key}" for key in ANALYSIS_KEYS}
+    unknown = sorted(selected - valid)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(sorted(valid))}")
+    return selected
+
+def run_analysis(resume_text: str, jd_text: str, include=DEFAULT_ANALYZE_FIELDS):
+    """
+    CPU-bound part of /analyze: sections, agents, scoring and explanation.
+    Runs on ANALYSIS_POOL, never on the event loop. Stage timings are returned
+    (not recorded here) so they survive process workers. Sections and the
+    explanation are only computed when `include` asks for them.
+    """
+    timings = StageTimings()
+    # 3. Extract Sections from Resume (Legacy / Display)
+    sections = None
+    if "sections" in include:
+        with timings.stage("sections"):
+            sections = extract_sections(resume_text)
     
-    # Docx usually starts with PK (zip)
-    if ext == '.docx' and header[:2] != b'PK':
-         raise HTTPException(status_code=400, detail=f"File {file.filename} does not appear to be a valid DOCX.")
-
-    # Size Check
-    content = await file.read()
-    await file.seek(0)
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail=f"File {file.filename} exceeds maximum size of 5MB.")
+    # --- AGENTIC WORKFLOW START ---
+    # 1. Agent 1: JD Analyzer, compiled into a requirement plan (cached per JD text)
+    with timings.stage("jd_agent"):
+        jd_plan = compile_jd_text(jd_text)
+    
+    # 2. Agent 2: Resume Evidence
+    with timings.stage("resume_agent"):
+        parsed_resume = mock_ai_parse_resume(resume_text)
+    
+    # 3. Agent 3: Matching & Scoring (Hybrid)
+    # Using semantic embeddings and determinstic rules
+    with timings.stage("match"):
+        advanced_result = advanced_match(parsed_resume, jd_plan)
+    
+    # 4. Agent 5: Explanation
+    agent_insights = None
+    if "ai_insights" in include:
+        with timings.stage("explanation"):
+            explanation_agent = ExplanationAgent()
+            agent_insights = explanation_agent.run(advanced_result)
+    return sections, parsed_resume, advanced_result, agent_insights, timings
 
 @app.post("/analyze")
 async def analyze_resume(
+    request: Request,
     resume: UploadFile = File(...),
     job_description_file: Optional[UploadFile] = File(None),
-    job_description_text: Optional[str] = Form(None)
+    job_description_text: Optional[str] = Form(None),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all but debug_advanced)")
 ):
+    include = parse_fields(fields)
+    timings = StageTimings()
+    started = time.perf_counter()
+    capture = PROFILER.start(request.headers)
+    status = 500
     try:
-        # Security: Validate Resume
-        await validate_file(resume)
-        
-        # 1. Parse Resume
-        resume_content = await resume.read()
-        resume_text = extract_text(resume_content, resume.filename)
-        if not resume_text:
-             raise HTTPException(status_code=400, detail="Could not extract text from Resume file.")
-
-        # 2. Get Job Description Text
-        jd_text = ""
-        jd_source = ""
-        
-        if job_description_file:
-            # Security: Validate JD File
-            await validate_file(job_description_file)
-            
-            jd_content = await job_description_file.read()
-            jd_text = extract_text(jd_content, job_description_file.filename)
-            jd_source = job_description_file.filename
+        # Backpressure: fail fast instead of queueing behind a saturated pool
+        async with ANALYSIS_POOL.admit():
+            # Security: Validate Resume while reading it (single streaming pass)
+            with timings.stage("read_resume"):
+                resume_content = await read_upload(resume)
+            DOCUMENT_BYTES.observe(len(resume_content), "resume", document_format(resume.filename))
+            if capture is not None:
+                capture.tags.update({"resume_filename": resume.filename,
+                                     "resume_sha256": hashlib.sha256(resume_content).hexdigest()})
             
-            if not jd_text:
-                 raise HTTPException(status_code=400, detail="Could not extract text from Job Description file.")
-                 
-        elif job_description_text:
-            if len(job_description_text) > 100_000: # 100k char limit for text
-                raise HTTPException(status_code=400, detail="Job Description text too long.")
-            jd_text = job_description_text
-            jd_source = "Text Input"
-        else:
-            raise HTTPException(status_code=400, detail="Please provide either a Job Description file or text.")
+            # 1. Parse Resume
+            resume_text, wait, duration = await run_profiled(capture, extract_text, resume_content, resume.filename)
+            timings.add("queue_wait", wait)
+            timings.add("extract_resume", duration)
+            if not resume_text:
+                 raise HTTPException(status_code=400, detail="Could not extract text from Resume file.")
+            DOCUMENT_CHARS.observe(len(resume_text), "resume")
 
-        # 3. Extract Sections from Resume (Legacy / Display)
-        sections = extract_sections(resume_text)
-        
-        # --- AGENTIC WORKFLOW START ---
-        # 1. Agent 1: JD Analyzer
-        parsed_jd = mock_ai_parse_jd(jd_text)
-        
-        # 2. Agent 2: Resume Evidence
-        parsed_resume = mock_ai_parse_resume(resume_text)
-        
-        # 3. Agent 3: Matching & Scoring (Hybrid)
-        # Using semantic embeddings and determinstic rules
-        advanced_result = advanced_match(parsed_resume, parsed_jd)
-        
-        # 4. Agent 5: Explanation
-        explanation_agent = ExplanationAgent()
-        agent_insights = explanation_agent.run(advanced_result)
+            # 2. Get Job Description Text
+            jd_text, jd_source = await read_job_description(job_description_file, job_description_text, timings, capture)
+            DOCUMENT_CHARS.observe(len(jd_text), "jd")
+            if capture is not None:
+                capture.tags.update({"jd_source": jd_source,
+                                     "jd_text_sha256": hashlib.sha256(jd_text.encode("utf-8")).hexdigest()})
+
+            (sections, parsed_resume, advanced_result, agent_insights, worker_timings), wait, _ = await run_profiled(
+                capture, run_analysis, resume_text, jd_text, tuple(sorted(include))
+            )
+            timings.add("queue_wait", wait)
+            timings.merge(worker_timings)
+
+            if RESUME_CORPUS is not None:
+                # The corpus lives in this process, so it is written from a thread rather than the pool
+                with timings.stage("corpus"):
+                    await asyncio.to_thread(RESUME_CORPUS.add, parsed_resume, resume.filename)
+
+        timings.add("total", time.perf_counter() - started)
+        timings.observe()
+        headers = {"Server-Timing": timings.server_timing()}
+        status = 200
+        if capture is not None and await save_profile(capture, timings, status):
+            headers["X-Matchly-Profile-Id"] = capture.id
         
         # --- RESPONSE COMPOSITION ---
-        
-        # Map advanced result to legacy schema for frontend compatibility where needed
-        legacy_result = {
-            "overall_score": advanced_result.overall_score,
-            "breakdown": advanced_result.breakdown,
-            "matched_skills": advanced_result.matched_skills,
-            "missing_skills": advanced_result.missing_critical_skills,
-            "skill_gap_analysis": advanced_result.skill_gap_analysis # Pass through new analysis
-        }
-        
-        return {
-            "filename": resume.filename,
-            "jd_source": jd_source,
-            "analysis": legacy_result,
-            "ai_insights": agent_insights, # Use the Agent's structured output
-            "sections": sections,
-            "debug_advanced": advanced_result.dict() # For inspection
-        }
+        # Only the selected fields are built; the debug dump is opt-in
+        body = {}
+        if "filename" in include:
+            body["filename"] = resume.filename
+        if "jd_source" in include:
+            body["jd_source"] = jd_source
+        analysis = legacy_analysis(advanced_result)
+        if "analysis" in include:
+            body["analysis"] = analysis
+        else:
+            picked = {key: analysis[key] for key in ANALYSIS_KEYS if f"analysis.{key}" in include}
+            if picked:
+                body["analysis"] = picked
+        if "ai_insights" in include:
+            body["ai_insights"] = agent_insights # Use the Agent's structured output
+        if "sections" in include:
+            body["sections"] = sections
+        if "debug_advanced" in include:
+            body["debug_advanced"] = advanced_result # For inspection, dumped by the encoder
+        return FastJSONResponse(body, headers=headers)
+    except PoolBusy as busy:
+        status = 503
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy analyzing other documents. Please retry shortly.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except (ExtractionLimitExceeded, DocumentRejected) as error:
+        status = 422
+        raise extraction_error(error)
     except HTTPException as he:
+        status = he.status_code
         raise he
     except Exception as e:
+        status = 500
         print(f"Error processing files: {e}") # Log full validation/internal error
         # Security: Do not expose stack trace or raw system errors to client
         raise HTTPException(status_code=500, detail="Internal Server Error: processing failed.")
+    finally:
+        # Failed requests (timeouts, 422s, 500s) are often the slow ones worth a profile
+        if capture is not None and status != 200:
+            if "total" not in timings.stages:
+                timings.add("total", time.perf_counter() - started)
+            await save_profile(capture, timings, status)
+
+# --- BATCH SCREENING ---
+MAX_BATCH_FILES = int(os.getenv("MATCHLY_BATCH_MAX_FILES", "50"))
+MAX_BATCH_BYTES = int(os.getenv("MATCHLY_BATCH_MAX_MB", "50")) * 1024 * 1024
+BATCH_CONCURRENCY = int(os.getenv("MATCHLY_BATCH_CONCURRENCY", str(ANALYSIS_POOL.workers)))
+
+def score_resume_against_plan(resume_content: bytes, filename: str, jd_plan):
+    """
+    One batch item: extract, parse and score a resume against an already compiled JD.
+    Returns (parsed_resume, match_score), or None when no text could be extracted.
+    """
+    resume_text = extract_text(resume_content, filename)
+    if not resume_text:
+        return None
+    parsed_resume = mock_ai_parse_resume(resume_text)
+    return parsed_resume, advanced_match(parsed_resume, jd_plan)
+
+def ndjson_line(payload: dict) -> bytes:
+    return dumps(payload) + b"\n"
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    resumes: List[UploadFile] = File(...),
+    job_description_file: Optional[UploadFile] = File(None),
+    job_description_text: Optional[str] = Form(None)
+):
+    """
+    Scores many resumes against one JD. The JD is parsed and compiled once, resumes
+    fan out over the analysis pool (at most MATCHLY_BATCH_CONCURRENCY at a time, each
+    holding an admission slot) and
+    one NDJSON line is streamed per resume as soon as it finishes, followed by a summary line.
+    """
+    if len(resumes) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds maximum of {MAX_BATCH_FILES} resumes.")
+
+    # One admission slot per resume scored at a time, held by the whole batch until the stream ends
+    slots = max(1, min(BATCH_CONCURRENCY, len(resumes), ANALYSIS_POOL.capacity))
+    admission = AsyncExitStack()
+    try:
+        await admission.enter_async_context(ANALYSIS_POOL.admit(slots))
+
+        jd_text, jd_source = await read_job_description(job_description_file, job_description_text)
+        jd_plan = await ANALYSIS_POOL.run(compile_jd_text, jd_text)
+
+        # Uploads are read (and validated) before streaming starts; invalid files become error lines
+        items = []
+        total_bytes = 0
+        for index, upload in enumerate(resumes):
+            try:
+                content = await read_upload(upload)
+            except HTTPException as he:
+                items.append((index, upload.filename, None, he.detail))
+                continue
+            total_bytes += len(content)
+            if total_bytes > MAX_BATCH_BYTES:
+                raise HTTPException(status_code=400, detail=f"Batch exceeds maximum total size of {MAX_BATCH_BYTES // (1024 * 1024)}MB.")
+            items.append((index, upload.filename, content, None))
+    except PoolBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy analyzing other documents. Please retry shortly.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except BaseException as e:
+        await admission.aclose()
+        if isinstance(e, HTTPException) or not isinstance(e, Exception):
+            raise # Including cancellation
+        if isinstance(e, (ExtractionLimitExceeded, DocumentRejected)):
+            raise extraction_error(e)
+        print(f"Error preparing batch: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error: processing failed.")
+
+    semaphore = asyncio.Semaphore(slots)
+
+    async def score_item(index, filename, content):
+        async with semaphore:
+            try:
+                result = await ANALYSIS_POOL.run(score_resume_against_plan, content, filename, jd_plan)
+            except DocumentRejected as rejected:
+                return {"index": index, "filename": filename, "error": f"Could not extract text: {rejected.preflight.reason}",
+                        "preflight": rejected.preflight.model_dump()}
+            except ExtractionLimitExceeded as limit:
+                return {"index": index, "filename": filename, "error": extraction_error(limit).detail}
+            except Exception as e:
+                print(f"Error processing batch file {filename}: {e}")
+                return {"index": index, "filename": filename, "error": "Internal Server Error: processing failed."}
+        if result is None:
+            return {"index": index, "filename": filename, "error": "Could not extract text from Resume file."}
+        parsed_resume, match_score = result
+        if RESUME_CORPUS is not None:
+            await asyncio.to_thread(RESUME_CORPUS.add, parsed_resume, filename)
+        return {"index": index, "filename": filename, "analysis": legacy_analysis(match_score)}
+
+    async def stream():
+        started = time.perf_counter()
+        failed = 0
+        tasks = []
+        try:
+            for index, filename, content, error in items:
+                if error is not None:
+                    failed += 1
+                    yield ndjson_line({"index": index, "filename": filename, "error": error})
+                else:
+                    tasks.append(asyncio.create_task(score_item(index, filename, content)))
+
+            for finished in asyncio.as_completed(tasks):
+                line = await finished
+                failed += "error" in line
+                yield ndjson_line(line)
+
+            yield ndjson_line({"summary": {
+                "jd_source": jd_source,
+                "total": len(items),
+                "succeeded": len(items) - failed,
+                "failed": failed,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            }})
+        finally:
+            for task in tasks:
+                task.cancel()
+            await admission.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# --- CORPUS RANKING ---
+MAX_RANK_TOP_K = 100
+
+@app.post("/rank")
+async def rank_resumes(
+    job_description_file: Optional[UploadFile] = File(None),
+    job_description_text: Optional[str] = Form(None),
+    top_k: int = Form(10)
+):
+    """
+    Top-k stored resumes for a JD, scored with advanced_match. Only a small part of
+    the corpus is fully scored (see utils.resume_corpus).
+    """
+    if RESUME_CORPUS is None:
+        raise HTTPException(status_code=404, detail="Resume corpus is not enabled (set MATCHLY_CORPUS_PATH).")
+    if not 1 <= top_k <= MAX_RANK_TOP_K:
+        raise HTTPException(status_code=400, detail=f"top_k must be between 1 and {MAX_RANK_TOP_K}.")
+    try:
+        async with ANALYSIS_POOL.admit():
+            jd_text, jd_source = await read_job_description(job_description_file, job_description_text)
+            jd_plan = await ANALYSIS_POOL.run(compile_jd_text, jd_text)
+
+            started = time.perf_counter()
+            ranking = await asyncio.to_thread(RESUME_CORPUS.rank, jd_plan, top_k)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        return FastJSONResponse({
+            "jd_source": jd_source,
+            "corpus_size": ranking["corpus_size"],
+            "scored": ranking["scored"],
+            "elapsed_ms": elapsed_ms,
+            "results": [
+                {"resume_id": resume_id, "filename": label, "analysis": legacy_analysis(result)}
+                for resume_id, label, result in ranking["results"]
+            ]
+        })
+    except PoolBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy analyzing other documents. Please retry shortly.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except (ExtractionLimitExceeded, DocumentRejected) as error:
+        raise extraction_error(error)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error ranking resumes: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error: processing failed.")
+
+# --- JD CATALOG / REVERSE MATCHING ---
+@app.post("/catalog/jobs")
+async def add_catalog_job(
+    title: str = Form(""),
+    job_description_file: Optional[UploadFile] = File(None),
+    job_description_text: Optional[str] = Form(None)
+):
+    """
+    Parses and compiles a JD once and adds it to the catalog used by /recommend.
+    """
+    try:
+        async with ANALYSIS_POOL.admit():
+            jd_text, jd_source = await read_job_description(job_description_file, job_description_text)
+            jd_plan = await ANALYSIS_POOL.run(compile_jd_text, jd_text)
+        job_id = JD_CATALOG.add(jd_plan, title or jd_source)
+        return {"job_id": job_id, "title": title or jd_source, "catalog_jobs": len(JD_CATALOG)}
+    except PoolBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy analyzing other documents. Please retry shortly.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except (ExtractionLimitExceeded, DocumentRejected) as error:
+        raise extraction_error(error)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error adding catalog job: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error: processing failed.")
+
+@app.get("/catalog/jobs")
+def list_catalog_jobs():
+    return {"jobs": JD_CATALOG.jobs()}
+
+@app.post("/recommend")
+async def recommend_jobs(
+    resume: UploadFile = File(...),
+    top_k: int = Form(10)
+):
+    """
+    Best matching catalog roles for one resume: the resume is parsed once and scored
+    against every catalog JD in one vectorized pass (see utils.jd_catalog).
+    """
+    if not 1 <= top_k <= MAX_RANK_TOP_K:
+        raise HTTPException(status_code=400, detail=f"top_k must be between 1 and {MAX_RANK_TOP_K}.")
+    try:
+        async with ANALYSIS_POOL.admit():
+            resume_content = await read_upload(resume)
+            resume_text = await ANALYSIS_POOL.run(extract_text, resume_content, resume.filename)
+            if not resume_text:
+                 raise HTTPException(status_code=400, detail="Could not extract text from Resume file.")
+            parsed_resume = await ANALYSIS_POOL.run(mock_ai_parse_resume, resume_text)
+
+            started = time.perf_counter()
+            # The catalog lives in this process, so it is scored from a thread rather than the pool
+            recommendations = await asyncio.to_thread(JD_CATALOG.recommend, parsed_resume, top_k)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        return FastJSONResponse({
+            "filename": resume.filename,
+            "catalog_jobs": len(JD_CATALOG),
+            "elapsed_ms": elapsed_ms,
+            "results": [
+                {"job_id": job_id, "title": title, "analysis": legacy_analysis(result)}
+                for job_id, title, result in recommendations
+            ]
+        })
+    except PoolBusy as busy:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy analyzing other documents. Please retry shortly.",
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except (ExtractionLimitExceeded, DocumentRejected) as error:
+        raise extraction_error(error)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error recommending jobs: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error: processing failed.")
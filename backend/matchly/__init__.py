@@ -0,0 +1,3 @@
+"""
+Matchly command line tools. Run from backend/:  python -m matchly --help
+"""
@@ -0,0 +1,9 @@
+import sys
+import os
+
+# Same import root as main.py (backend/), wherever the package is run from
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matchly.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+Offline bulk scoring: one JD against a directory (or glob) of resumes.
+
+    python -m matchly JD_FILE RESUMES... [-o results.jsonl|results.csv] [--workers N]
+
+Resumes are scored on all cores (extract_text -> ResumeAgent -> advanced_match)
+and written to the output as they finish. Re-running with the same output file
+skips resumes already in it, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from utils.engines import ENGINES
+from utils.parser import extract_document, extract_text
+from utils.extraction_engine import ResumeAgent
+from utils.requirement_plan import compile_jd_text
+from utils.advanced_scorer import advanced_match
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+CSV_FIELDS = [
+    "path", "filename", "overall_score", "skill_score", "responsibility_score", "experience_score",
+    "stack_score", "ats_score", "detected_years_experience", "matched_skills", "missing_skills", "error",
+    "extraction_engine", "extraction_ms"
+]
+
+# Set in each worker by _init_worker
+_PLAN = None
+
+def _init_worker(plan):
+    global _PLAN
+    _PLAN = plan
+
+def score_file(path: str) -> dict:
+    """
+    Scores one resume file against the worker's JD plan. Never raises: failures become an "error" field.
+    """
+    filename = os.path.basename(path)
+    try:
+        with open(path, "rb") as handle:
+            extraction = extract_document(handle.read(), filename)
+        report = {"engine": extraction.engine, "ms": round(extraction.seconds * 1000, 2)}
+        if not extraction.text:
+            return {"path": path, "filename": filename, "error": "Could not extract text", "extraction": report}
+        result = advanced_match(ResumeAgent().run(extraction.text), _PLAN)
+        return {
+            "path": path,
+            "filename": filename,
+            "overall_score": result.overall_score,
+            "breakdown": result.breakdown,
+            "detected_years_experience": result.detected_years_experience,
+            "matched_skills": result.matched_skills,
+            "missing_skills": result.missing_critical_skills,
+            "extraction": report
+        }
+    except Exception as e:
+        return {"path": path, "filename": filename, "error": f"{type(e).__name__}: {e}"}
+
+def collect_resumes(inputs) -> list:
+    """
+    Files, directories (searched recursively) and glob patterns -> sorted unique resume paths.
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, f) for f in files)
+        elif glob.has_magic(item):
+            paths.update(glob.glob(item, recursive=True))
+        else:
+            paths.add(item)
+    return sorted(os.path.abspath(p) for p in paths if p.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(p))
+
+def read_jd(path: str) -> str:
+    with open(path, "rb") as handle:
+        text = extract_text(handle.read(), os.path.basename(path))
+    if not text:
+        raise SystemExit(f"Could not extract text from JD file {path}")
+    return text
+
+class ResultWriter:
+    """
+    Appends results as JSONL or CSV (by extension), flushing every row. On resume,
+    a partially written last line is dropped and already scored paths are reported.
+    """
+    def __init__(self, path: str, restart: bool = False):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self.done = set()
+        if restart or not os.path.exists(path):
+            self._handle = open(path, "w", encoding="utf-8", newline="")
+            fresh = True
+        else:
+            self._truncate_partial_line()
+            self.done = self._read_done()
+            self._handle = open(path, "a", encoding="utf-8", newline="")
+            fresh = os.path.getsize(path) == 0
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._handle, fieldnames=CSV_FIELDS)
+            if fresh:
+                self._csv.writeheader()
+
+    def _truncate_partial_line(self):
+        with open(self.path, "rb+") as handle:
+            data = handle.read()
+            if data and not data.endswith(b"\n"):
+                handle.truncate(data.rfind(b"\n") + 1)
+
+    def _read_done(self) -> set:
+        with open(self.path, "r", encoding="utf-8", newline="") as handle:
+            if self.format == "csv":
+                return {row["path"] for row in csv.DictReader(handle) if row.get("path")}
+            return {json.loads(line)["path"] for line in handle if line.strip()}
+
+    def write(self, record: dict):
+        if self.format == "csv":
+            breakdown = record.get("breakdown", {})
+            extraction = record.get("extraction", {})
+            self._csv.writerow({
+                "path": record["path"],
+                "filename": record["filename"],
+                "overall_score": record.get("overall_score", ""),
+                **{k: breakdown.get(k, "") for k in CSV_FIELDS[3:8]},
+                "detected_years_experience": record.get("detected_years_experience", ""),
+                "matched_skills": "; ".join(record.get("matched_skills", [])),
+                "missing_skills": "; ".join(record.get("missing_skills", [])),
+                "error": record.get("error", ""),
+                "extraction_engine": extraction.get("engine", ""),
+                "extraction_ms": extraction.get("ms", "")
+            })
+        else:
+            self._handle.write(json.dumps(record) + "\n")
+        self._handle.flush()
+
+    def close(self):
+        self._handle.close()
+
+class Progress:
+    def __init__(self, total: int, enabled: bool, interval: float = 0.5):
+        self.total = total
+        self.enabled = enabled
+        self.interval = interval
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, force: bool = False):
+        self.done += 0 if force else 1
+        now = time.perf_counter()
+        if not self.enabled or (not force and now - self._last < self.interval):
+            return
+        self._last = now
+        rate = self.done / max(now - self.started, 1e-9)
+        eta = (self.total - self.done) / rate if rate else 0.0
+        sys.stderr.write(f"\r  {self.done}/{self.total} resumes  {rate:7.1f}/s  ETA {eta:6.0f}s ")
+        sys.stderr.flush()
+
+def default_chunksize(count: int, workers: int) -> int:
+    # ~4 chunks per worker balances scheduling overhead against stragglers
+    return max(1, min(64, count // (workers * 4)))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m matchly", description="Score resumes against a job description.")
+    parser.add_argument("jd", help="Job description file (PDF, DOCX or TXT)")
+    parser.add_argument("resumes", nargs="+", help="Resume files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="matchly_results.jsonl", help="Output file, .jsonl or .csv (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Resumes per work unit (default: ~4 chunks per worker)")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress line")
+    args = parser.parse_args(argv)
+
+    plan = compile_jd_text(read_jd(args.jd))
+    paths = collect_resumes(args.resumes)
+    writer = ResultWriter(args.output, restart=args.restart)
+    pending = [p for p in paths if p not in writer.done]
+    skipped = len(paths) - len(pending)
+    workers = max(1, min(args.workers, len(pending) or 1))
+    chunksize = args.chunksize or default_chunksize(len(pending), workers)
+    print(f"Scoring {len(pending)} resumes ({skipped} already in {args.output}) on {workers} workers, chunksize {chunksize}")
+
+    # Load parsers/spaCy once here: forked workers inherit them instead of each importing them
+    ENGINES.warm_up()
+    progress = Progress(len(pending), enabled=not args.quiet)
+    scored = failed = 0
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(plan,)) as pool:
+            for record in pool.imap_unordered(score_file, pending, chunksize=chunksize):
+                writer.write(record)
+                if "error" in record:
+                    failed += 1
+                else:
+                    scored += 1
+                progress.update()
+    except KeyboardInterrupt:
+        print("\nInterrupted: re-run the same command to resume.")
+    finally:
+        writer.close()
+        progress.update(force=True)
+
+    elapsed = time.perf_counter() - progress.started
+    if not args.quiet:
+        sys.stderr.write("\n")
+    print(f"Scored {scored}, failed {failed}, skipped {skipped} in {elapsed:.1f}s "
+          f"({(scored + failed) / max(elapsed, 1e-9):.1f} resumes/s) -> {args.output}")
+    return 0 if scored + failed == len(pending) else 130
@@ -0,0 +1,308 @@
+import sys
+import os
+import pytest
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import json
+import time
+import pstats
+import main
+from main import app
+from utils.workers import AnalysisPool, PoolBusy
+from utils.engines import EngineRegistry, EngineUnavailable
+from utils.profiling import RequestProfiler
+from utils.sandbox import ExtractionLimitExceeded
+from utils.metrics import NLP_SECONDS
+from utils.jd_catalog import JDCatalog
+
+client = TestClient(app)
+
+def test_ready_warms_up_engines():
+    response = client.get("/ready")
+    body = response.json()
+    assert response.status_code == 200
+    assert body["engines"]["pdfplumber"]["loaded"]
+    assert body["engines"]["python-docx"]["loaded"]
+    # spaCy is optional: readiness does not depend on it
+    assert body["engines"]["spacy"]["required"] is False
+
+def test_engine_registry_loads_once_and_remembers_failures():
+    calls = []
+    registry = EngineRegistry()
+    registry.register("ok", lambda: calls.append(1) or "engine")
+    registry.register("broken", lambda: calls.append(1) or 1 / 0, required=False)
+
+    assert registry.status()["ok"]["loaded"] is False # Nothing loads at registration
+    assert registry.get("ok") == registry.get("ok") == "engine"
+    assert not registry.available("broken") and not registry.available("broken")
+    assert len(calls) == 2
+    assert registry.ready()
+    with pytest.raises(EngineUnavailable):
+        registry.get("broken")
+
+def test_pool_admission_is_bounded():
+    pool = AnalysisPool(workers=1, queue_size=1)
+
+    async def scenario():
+        async with pool.admit():
+            async with pool.admit():
+                assert pool.stats()["queue_depth"] == 1
+                with pytest.raises(PoolBusy):
+                    async with pool.admit():
+                        pass
+            assert await pool.run(sum, [1, 2]) == 3
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 0 and stats["rejected"] == 1 and stats["completed_jobs"] == 1
+    pool.shutdown()
+
+def observe_nlp(seconds):
+    NLP_SECONDS.observe(seconds)
+    return seconds
+
+def test_process_pool_metrics_reach_the_parent():
+    pool = AnalysisPool(workers=1, queue_size=0, kind="process")
+    before = sum(series[-1] for series in NLP_SECONDS._series.values())
+    try:
+        assert asyncio.run(pool.run(observe_nlp, 0.25)) == 0.25
+    finally:
+        pool.shutdown()
+    # Observed in the worker process, replayed in this one
+    assert sum(series[-1] for series in NLP_SECONDS._series.values()) == pytest.approx(before + 0.25)
+
+def test_process_pool_cache_counts_reach_the_parent(monkeypatch):
+    from utils import parser, requirement_plan
+    from utils.text_cache import TextCache
+    monkeypatch.setattr(parser, "TEXT_CACHE", TextCache())
+    monkeypatch.setattr(requirement_plan, "PLAN_CACHE", requirement_plan.RequirementPlanCache())
+    pool = AnalysisPool(workers=1, queue_size=0, kind="process")
+    resume = docx_bytes("Python developer with Django")
+
+    async def twice():
+        for _ in range(2):
+            await pool.run(requirement_plan.compile_jd_text, "Python developer")
+            await pool.run(parser.extract_text, resume, "resume.docx")
+
+    try:
+        asyncio.run(twice())
+    finally:
+        pool.shutdown()
+    # Looked up in the worker's caches, counted in this process's
+    assert requirement_plan.PLAN_CACHE.stats()["hits"] == 1 and requirement_plan.PLAN_CACHE.stats()["misses"] == 1
+    assert parser.TEXT_CACHE.stats()["hits"] == 1 and parser.TEXT_CACHE.stats()["misses"] == 1
+
+def test_analyze_returns_503_when_pool_is_full(monkeypatch):
+    import threading
+    saturated = AnalysisPool(workers=1, queue_size=0, retry_after=7)
+    monkeypatch.setattr(main, "ANALYSIS_POOL", saturated)
+    release = threading.Event()
+
+    async def occupy():
+        # One admitted request running a job that blocks the only worker
+        async with saturated.admit():
+            await saturated.run(release.wait)
+
+    holder = threading.Thread(target=asyncio.run, args=(occupy(),))
+    holder.start()
+    try:
+        deadline = time.monotonic() + 5
+        while saturated.stats()["in_flight"] < saturated.capacity and time.monotonic() < deadline:
+            time.sleep(0.01)
+        files = {'resume': ('resume.txt', b"python developer", 'text/plain')}
+        response = client.post("/analyze", files=files, data={'job_description_text': "python"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "7"
+        assert client.get("/stats").json()["pool"]["rejected"] == 1
+    finally:
+        release.set()
+        holder.join()
+        saturated.shutdown()
+    assert saturated.stats()["in_flight"] == 0 and saturated.stats()["completed_jobs"] == 1
+
+def docx_bytes(text):
+    import io
+    import docx
+    document = docx.Document()
+    document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def test_analyze_batch_streams_one_line_per_resume():
+    docx_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    files = [
+        ('resumes', ('a.docx', docx_bytes("Python developer with Django and PostgreSQL, 5 years of experience"), docx_type)),
+        ('resumes', ('b.docx', docx_bytes("Java engineer working with Spring"), docx_type)),
+        ('resumes', ('c.exe', b"MZ\x90\x00", 'application/octet-stream')),
+    ]
+    jd = "Looking for a Python developer with Django, PostgreSQL and AWS. 3+ years of experience."
+    response = client.post("/analyze/batch", files=files, data={'job_description_text': jd})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = {line["index"]: line for line in lines[:-1]}
+    assert sorted(results) == [0, 1, 2]
+    assert "analysis" in results[0] and "analysis" in results[1]
+    assert results[0]["analysis"]["overall_score"] > results[1]["analysis"]["overall_score"]
+    assert "error" in results[2]
+    assert lines[-1]["summary"]["succeeded"] == 2 and lines[-1]["summary"]["failed"] == 1
+    assert client.get("/stats").json()["pool"]["in_flight"] == 0
+
+def test_batch_takes_one_admission_slot_per_concurrent_resume(monkeypatch):
+    pool = AnalysisPool(workers=1, queue_size=1)
+    monkeypatch.setattr(main, "ANALYSIS_POOL", pool)
+    monkeypatch.setattr(main, "BATCH_CONCURRENCY", 2)
+    files = [('resumes', (f'{name}.txt', b"python developer", 'text/plain')) for name in "ab"]
+
+    async def batch_with_one_slot_taken():
+        async with pool.admit():
+            return client.post("/analyze/batch", files=files, data={'job_description_text': "python"})
+
+    try:
+        # Two resumes at a time need two slots; only one of the two is free
+        response = asyncio.run(batch_with_one_slot_taken())
+        assert response.status_code == 503
+        response = client.post("/analyze/batch", files=files, data={'job_description_text': "python"})
+        assert response.status_code == 200
+        assert json.loads(response.text.splitlines()[-1])["summary"]["succeeded"] == 2
+    finally:
+        pool.shutdown()
+    assert pool.stats()["in_flight"] == 0 and pool.stats()["rejected"] == 1
+
+def test_recommend_ranks_catalog_roles(monkeypatch):
+    monkeypatch.setattr(main, "JD_CATALOG", JDCatalog())
+    client.post("/catalog/jobs", data={'title': "Java", 'job_description_text': "Java engineer with Spring. 3+ years"})
+    client.post("/catalog/jobs", data={'title': "Python", 'job_description_text': "Python developer with Django and PostgreSQL. 3+ years"})
+    assert [job["title"] for job in client.get("/catalog/jobs").json()["jobs"]] == ["Java", "Python"]
+
+    docx_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    files = {'resume': ('a.docx', docx_bytes("Python developer with Django and PostgreSQL, 5 years of experience"), docx_type)}
+    body = client.post("/recommend", files=files, data={'top_k': 2}).json()
+    scores = [r["analysis"]["overall_score"] for r in body["results"]]
+    assert body["catalog_jobs"] == 2 and scores == sorted(scores, reverse=True)
+
+def test_catalog_job_errors_are_formatted_500s(monkeypatch):
+    catalog = JDCatalog()
+    def broken_add(*args):
+        raise RuntimeError("catalog failure")
+    monkeypatch.setattr(catalog, "add", broken_add)
+    monkeypatch.setattr(main, "JD_CATALOG", catalog)
+    response = client.post("/catalog/jobs", data={'job_description_text': "Go developer"})
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Internal Server Error: processing failed."
+
+def test_analyze_reports_stage_timings_and_metrics():
+    docx_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    files = {'resume': ('a.docx', docx_bytes("Python developer with Django, 5 years of experience"), docx_type)}
+    response = client.post("/analyze", files=files, data={'job_description_text': "Python developer. 3+ years"})
+    assert response.status_code == 200
+    stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert {"read_resume", "extract_resume", "match", "total"} <= set(stages)
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'matchly_stage_seconds_bucket{stage="match",le="+Inf"}' in metrics.text
+    assert 'matchly_document_bytes_count{role="resume",format="docx"}' in metrics.text
+    assert 'matchly_request_seconds_count{endpoint="/analyze",status="200"}' in metrics.text
+    assert "matchly_pool_in_flight 0" in metrics.text
+    assert "# TYPE matchly_pool_rejected_total counter" in metrics.text
+    assert 'matchly_text_cache_events_total{event="misses"}' in metrics.text
+
+def test_profiling_is_opt_in_per_request(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "PROFILER", RequestProfiler(directory=str(tmp_path), interval=0.001))
+    files = {'resume': ('a.docx', docx_bytes("Python developer with Django, 5 years of experience"), 'application/octet-stream')}
+    data = {'job_description_text': "Python developer. 3+ years"}
+
+    assert "x-matchly-profile-id" not in client.post("/analyze", files=files, data=data).headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.post("/analyze", files=files, data=data, headers={"X-Matchly-Profile": "1"})
+    profile_id = response.headers["x-matchly-profile-id"]
+    tags = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert len(tags["resume_sha256"]) == 64 and "match" in tags["stage_ms"]
+    assert pstats.Stats(str(tmp_path / f"{profile_id}.prof")).total_calls > 0
+    assert (tmp_path / f"{profile_id}.folded").exists()
+
+    # Failed requests are profiled too, including the stage that raised
+    def limit_exceeded(*args):
+        raise ExtractionLimitExceeded("timeout")
+    monkeypatch.setattr(main, "extract_text", limit_exceeded)
+    response = client.post("/analyze", files=files, data=data, headers={"X-Matchly-Profile": "1"})
+    assert response.status_code == 422
+    failed = [json.loads(path.read_text()) for path in tmp_path.glob("*.json") if path.stem != profile_id]
+    assert len(failed) == 1 and failed[0]["status"] == 422 and len(failed[0]["resume_sha256"]) == 64
+    assert pstats.Stats(str(tmp_path / f"{failed[0]['id']}.prof")).total_calls > 0
+
+def test_analyze_fields_skip_unrequested_work(monkeypatch):
+    def fail(*args):
+        raise AssertionError("not requested")
+    monkeypatch.setattr(main, "extract_sections", fail)
+    monkeypatch.setattr(main, "ExplanationAgent", fail)
+
+    files = {'resume': ('a.docx', docx_bytes("Python developer with Django, 5 years of experience"), 'application/octet-stream')}
+    data = {'job_description_text': "Python developer with AWS. 3+ years"}
+    response = client.post("/analyze?fields=analysis.overall_score,analysis.missing_skills", files=files, data=data)
+    assert response.status_code == 200
+    body = response.json()
+    assert list(body) == ["analysis"] and set(body["analysis"]) == {"overall_score", "missing_skills"}
+    assert "aws" in body["analysis"]["missing_skills"]
+    assert "explanation" not in response.headers["server-timing"]
+
+    assert client.post("/analyze?fields=analysis,bogus", files=files, data=data).status_code == 400
+
+def test_analyze_debug_dump_is_serialized_and_gzipped():
+    files = {'resume': ('a.docx', docx_bytes("Python developer with Django, 5 years of experience"), 'application/octet-stream')}
+    data = {'job_description_text': "Python developer with AWS. 3+ years"}
+    response = client.post("/analyze?fields=analysis,debug_advanced", files=files, data=data, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    debug = response.json()["debug_advanced"]
+    assert debug["overall_score"] == response.json()["analysis"]["overall_score"]
+    assert isinstance(debug["detailed_match_report"], list)
+
+def test_extraction_limit_is_a_422(monkeypatch):
+    def over_limit(content, filename):
+        raise ExtractionLimitExceeded("timeout")
+    monkeypatch.setattr(main, "extract_text", over_limit)
+    files = {'resume': ('slow.pdf', b"%PDF-1.4\n" + b"0" * 64, 'application/pdf')}
+    response = client.post("/analyze", files=files, data={'job_description_text': "Python developer"})
+    assert response.status_code == 422 and "timeout" in response.json()["detail"]
+    assert client.get("/ready").status_code == 200
+
+def test_analyze_rejects_scanned_pdf_with_preflight_reason():
+    import fitz
+    document = fitz.open()
+    document.new_page().insert_image(fitz.Rect(50, 50, 300, 300), pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 20), 0))
+    files = {'resume': ('scan.pdf', document.tobytes(), 'application/pdf')}
+    response = client.post("/analyze", files=files, data={'job_description_text': "Python developer"})
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["preflight"]["status"] == "image_only" and detail["preflight"]["parseable"] is False
+    assert 'matchly_preflight_total{format="pdf",status="image_only"}' in client.get("/metrics").text
+
+def test_process_pool_analyzes_pdfs_after_ready(monkeypatch):
+    import fitz
+    from utils import parser
+    from utils.text_cache import TextCache
+    pool = AnalysisPool(workers=1, queue_size=0, kind="process")
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), "Python developer with Django and PostgreSQL experience")
+    files = {'resume': ('resume.pdf', document.tobytes(), 'application/pdf')}
+    data = {'job_description_text': "Python developer"}
+    expected = client.post("/analyze", files=files, data=data).json()
+    monkeypatch.setattr(main, "ANALYSIS_POOL", pool)
+    # Empty cache, so the forked worker really extracts the PDF
+    monkeypatch.setattr(parser, "TEXT_CACHE", TextCache())
+    try:
+        # /ready starts the sandbox (and its forkserver) here, before the pool forks its worker
+        assert client.get("/ready").status_code == 200
+        response = client.post("/analyze", files=files, data=data)
+        assert response.status_code == 200
+        assert response.json() == expected
+    finally:
+        pool.shutdown()
@@ -0,0 +1,43 @@
+import sys
+import os
+import csv
+import json
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matchly.cli import main, collect_resumes
+
+def write_inputs(tmp_path, count):
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    for i in range(count):
+        (folder / f"r{i}.txt").write_text(f"{i % 8} years. Python, Django and AWS developer {i}")
+    (folder / "notes.md").write_text("ignored")
+    jd = tmp_path / "jd.txt"
+    jd.write_text("Python developer with Django and AWS. 3+ years.")
+    return str(jd), str(folder)
+
+def test_cli_scores_directory_and_resumes_after_interruption(tmp_path):
+    jd, folder = write_inputs(tmp_path, 12)
+    output = str(tmp_path / "out.jsonl")
+    assert len(collect_resumes([folder, os.path.join(folder, "*.txt")])) == 12
+
+    assert main([jd, folder, "-o", output, "-w", "2", "-q"]) == 0
+    lines = open(output).read().splitlines()
+    assert len(lines) == 12 and all("overall_score" in json.loads(line) for line in lines)
+    assert all(json.loads(line)["extraction"]["engine"] == "plain" for line in lines)
+
+    # Simulate a run killed mid-write: 5 complete rows plus a partial one
+    with open(output, "w") as handle:
+        handle.write("\n".join(lines[:5]) + "\n" + lines[5][:20])
+    assert main([jd, folder, "-o", output, "-w", "2", "-q"]) == 0
+    paths = [json.loads(line)["path"] for line in open(output)]
+    assert sorted(paths) == sorted(json.loads(line)["path"] for line in lines)
+
+def test_cli_writes_csv(tmp_path):
+    jd, folder = write_inputs(tmp_path, 3)
+    output = str(tmp_path / "out.csv")
+    assert main([jd, os.path.join(folder, "*.txt"), "-o", output, "-w", "1", "-q"]) == 0
+    rows = list(csv.DictReader(open(output)))
+    assert len(rows) == 3 and all(row["overall_score"] and not row["error"] for row in rows)
@@ -8,9 +8,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.schemas import ParsedResume, ParsedJobDescription, SkillWithEvidence, ExperienceItem, ProjectItem
 from utils.extraction_engine import JDAgent, ResumeAgent
-from utils.advanced_scorer import advanced_match
+from utils.advanced_scorer import advanced_match, advanced_match_many
+from utils.requirement_plan import compile_plan, RequirementPlanCache
+from utils import scorer
 from utils.scorer import calculate_semantic_similarity, semantic_match
-from utils.normalizer import normalize_skill
+from utils.normalizer import normalize_skill, get_skill_category, TAXONOMY_INDEX
+from utils.skill_matcher import IT_SKILL_MATCHER
 
 # ==========================================
 # 🧪 CATEGORY 1: IT SKILL NORMALIZATION
@@ -36,6 +39,14 @@ def test_skill_normalization(input_skill, expected):
     if input_skill == "AWS-S3": return
     assert norm == expected
 
+def test_taxonomy_index_lookups():
+    assert get_skill_category("JavaScript") == "languages" # First category in taxonomy order
+    assert TAXONOMY_INDEX.categories_of["javascript"] == ("languages", "frontend")
+    assert get_skill_category("K8s") == "devops" # Alias resolved before lookup
+    assert get_skill_category("cobol") == "other"
+    assert TAXONOMY_INDEX.shared_category("django", "fastapi") == "backend"
+    assert TAXONOMY_INDEX.shared_category("python", "react") is None
+
 # ==========================================
 # 🧪 CATEGORY 2: IT SEMANTIC SIMILARITY
 # ==========================================
@@ -55,6 +66,68 @@ def test_semantic_quality(text1, text2, threshold):
     similarity = calculate_semantic_similarity(text1, text2)
     assert similarity >= threshold or (text1.lower() == "python" and text2.lower() == "java" and similarity < 0.3)
 
+def test_tfidf_cosine_matches_sklearn():
+    sklearn_text = pytest.importorskip("sklearn.feature_extraction.text")
+    from sklearn.metrics.pairwise import cosine_similarity
+    pairs = [
+        ("build rest api python python", "python api deploy aws"),
+        ("deep learning model", "neural network"),
+        ("", "python"),
+    ]
+    for a, b in pairs:
+        matrix = sklearn_text.TfidfVectorizer().fit_transform([a, b])
+        expected = float(cosine_similarity(matrix[0:1], matrix[1:2])[0][0])
+        assert scorer.tfidf_cosine(a, b) == pytest.approx(expected)
+    assert scorer.tfidf_cosine("a", "!") == 0.0 # Empty vocabulary
+
+def test_lemmatize_texts_batches_and_caches(monkeypatch):
+    spacy = pytest.importorskip("spacy")
+    blank = spacy.blank("en")
+    batches = []
+
+    class CountingPipeline:
+        def pipe(self, texts, batch_size):
+            batches.append(list(texts))
+            return blank.pipe(batches[-1], batch_size=batch_size)
+
+    monkeypatch.setattr(scorer, "get_nlp", CountingPipeline)
+    monkeypatch.setattr(scorer, "_lemma_cache", scorer.OrderedDict())
+    monkeypatch.setattr(scorer, "LEMMA_CACHE_SIZE", 2)
+
+    scorer.lemmatize_texts(["Same JD", "resume one", "same jd"])
+    scorer.lemmatize_texts(["same jd", "resume two"])
+    # Duplicates within a batch and across calls are lemmatized once
+    assert batches == [["same jd", "resume one"], ["resume two"]]
+    assert list(scorer._lemma_cache) == ["same jd", "resume two"] # Bounded LRU
+
+def test_lemmatize_texts_guards_cache_with_lock(monkeypatch):
+    import threading
+
+    class Token:
+        is_stop = is_punct = False
+        def __init__(self, text):
+            self.lemma_ = text
+
+    piped = threading.Event()
+
+    class Pipeline:
+        def pipe(self, texts, batch_size):
+            piped.set()
+            return [[Token(text)] for text in texts]
+
+    monkeypatch.setattr(scorer, "get_nlp", Pipeline)
+    monkeypatch.setattr(scorer, "_lemma_cache", scorer.OrderedDict())
+    results = []
+    # While another thread holds the cache lock, lookups wait instead of racing its evictions
+    with scorer._lemma_lock:
+        worker = threading.Thread(target=lambda: results.append(scorer.lemmatize_texts(["pool thread"])))
+        worker.start()
+        worker.join(0.05)
+        assert worker.is_alive() and not piped.is_set()
+    worker.join(1)
+    assert results == [["pool thread"]]
+    assert list(scorer._lemma_cache) == ["pool thread"]
+
 # ==========================================
 # 🧪 CATEGORY 3: IT JD NATURE DETECTION
 # ==========================================
@@ -125,6 +198,50 @@ def test_it_early_rejection():
     parsed = agent.run(jd)
     assert parsed.job_title == "NON-IT ROLE REJECTED"
 
+def test_requirement_plan_scores_like_parsed_jd():
+    jd = JDAgent().run("Senior backend role: Python, Django, PostgreSQL, Docker on AWS. 4+ years. Build REST api.")
+    resume = ResumeAgent().run("Built payment api with Python and Flask. Deployed services on AWS with Docker. 6 years.")
+    plan = compile_plan(jd)
+
+    assert plan.required == tuple(normalize_skill(s) for s in jd.required_skills)
+    assert advanced_match(resume, plan) == advanced_match(resume, jd)
+
+def test_requirement_plan_cache_reuses_compiled_jd():
+    cache = RequirementPlanCache(max_entries=1)
+    first = cache.get_or_compile("Python developer with AWS")
+    assert cache.get_or_compile("PYTHON developer with aws") is first # Same normalized JD
+    cache.get_or_compile("Java developer")
+    assert cache.get_or_compile("Python developer with AWS") is not first # Evicted
+    assert cache.stats() == {"hits": 1, "misses": 3, "entries": 1}
+
+@pytest.mark.parametrize("use_blank_nlp", [False, True])
+def test_advanced_match_many_matches_advanced_match(monkeypatch, use_blank_nlp):
+    if use_blank_nlp:
+        # Exercises the skill/stack matching path without the en_core_web_sm model
+        spacy = pytest.importorskip("spacy")
+        blank = spacy.blank("en")
+        monkeypatch.setattr(scorer, "get_nlp", lambda: blank)
+        monkeypatch.setattr(scorer, "_lemma_cache", scorer.OrderedDict())
+
+    plan = compile_plan(JDAgent().run("Backend role: Python, Django, PostgreSQL, Docker on AWS. 4+ years. Build REST api."))
+    resumes = [ResumeAgent().run(text) for text in [
+        "Built payment api with Python and Flask. Deployed services on AWS with Docker. 6 years.",
+        "Java and Spring developer, MySQL, 2 years.",
+        "Senior engineer: Django, PostgreSQL, Kubernetes, GCP.",
+        "Dog walker",
+    ]] + [ParsedResume()]
+    batch = advanced_match_many(resumes, plan, details=[0])
+
+    for i, resume in enumerate(resumes):
+        single = advanced_match(resume, plan)
+        assert batch.overall[i] == single.overall_score
+        assert [round(float(batch.skills[i]), 1), round(float(batch.responsibilities[i]), 1), round(float(batch.experience[i]), 1),
+                round(float(batch.stack[i]), 1), round(float(batch.ats[i]), 1)] == [
+            single.breakdown[k] for k in ("skill_score", "responsibility_score", "experience_score", "stack_score", "ats_score")
+        ]
+    assert list(batch.reports) == [0] and batch.reports[0] == advanced_match(resumes[0], plan)
+    assert batch.ranking()[0] in (0, 2)
+
 # ==========================================
 # 🧪 CATEGORY 6: SEMANTIC FRAMEWORK MATCHING
 # ==========================================
@@ -150,5 +267,24 @@ def test_semantic_framework_matching():
     assert score.breakdown["skill_score"] > 0
     assert any(m.match_status == "partial" for m in score.detailed_match_report)
 
+# ==========================================
+# 🧪 CATEGORY 7: COMPILED SKILL MATCHER
+# ==========================================
+def test_skill_matcher_symbols_and_spans():
+    text = "worked with c++, c# and spring boot (asp.net) on aws; good at golang"
+    hits = {(h.skill, h.category): (h.start, h.end) for h in IT_SKILL_MATCHER.finditer(text)}
+
+    assert text[slice(*hits[("c++", "languages")])] == "c++"
+    assert ("c#", "languages") in hits
+    assert ("asp.net", "backend") in hits
+    # Overlapping skills sharing a start position are all reported
+    assert ("spring boot", "backend") in hits and ("spring", "backend") in hits
+    # Word boundaries still apply: "go" inside "good"/"golang" is not a hit
+    assert ("go", "languages") not in hits
+
+def test_skill_matcher_multi_category_first_hits():
+    hits = IT_SKILL_MATCHER.first_hits("javascript and javascript")
+    assert [(h.category, h.start) for h in hits] == [("languages", 0), ("frontend", 0)]
+
 if __name__ == "__main__":
     pytest.main([__file__])
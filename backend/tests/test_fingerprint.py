@@ -0,0 +1,40 @@
+import sys
+import os
+import random
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.normalizer import TAXONOMY_INDEX
+from utils.extraction_engine import mock_ai_parse_resume, JDAgent
+from utils.fingerprint import SkillFingerprint, VOCABULARY, fingerprint, resume_fingerprint, jd_fingerprint
+
+def test_bitwise_ops_match_set_semantics():
+    rng = random.Random(5)
+    pool = list(VOCABULARY) + ["API Development", "Payments Systems Engineering"]
+    for _ in range(200):
+        a, b = set(rng.sample(pool, 12)), set(rng.sample(pool, 12))
+        fa, fb = fingerprint(a), fingerprint(b)
+        assert set((fa & fb).skills()) == a & b
+        assert set((fa | fb).skills()) == a | b
+        assert fa.overlap(fb) == len(a & b) and len(fa) == len(a)
+        assert all(s in fa for s in a) and not any(s in fa for s in b - a)
+        assert fa.category_counts() == tuple(
+            sum(1 for s in a if s in TAXONOMY_INDEX.skills_by_category[cat]) for cat in TAXONOMY_INDEX.categories
+        )
+
+def test_serialization_is_compact_and_checked():
+    resume = mock_ai_parse_resume("5 years. Built payment api. Python, Django, PostgreSQL, Docker, AWS, React, Kubernetes")
+    fp = resume_fingerprint(resume)
+    assert resume_fingerprint(resume) is fp and "_fingerprint" not in resume.model_dump() # Kept on the resume, not serialized
+    data = fp.to_bytes()
+    assert SkillFingerprint.from_bytes(data) == fp
+    assert len(data) <= 64
+    assert "python" in fp and "api development" in fp # Capabilities are kept outside the bitset
+
+    jd = jd_fingerprint(JDAgent().run("Python developer with Django and AWS"))
+    assert "languages" in fp.shared_categories(jd)
+
+    with pytest.raises(ValueError):
+        SkillFingerprint.from_bytes(b"\x00\x00\x00\x00" + data[4:])
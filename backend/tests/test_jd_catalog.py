@@ -0,0 +1,57 @@
+import sys
+import os
+import random
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import scorer
+from utils.it_taxonomy_data import IT_TAXONOMY
+from utils.extraction_engine import mock_ai_parse_resume, JDAgent
+from utils.advanced_scorer import advanced_match
+from utils.jd_catalog import JDCatalog
+
+ALL_SKILLS = sorted({s for skills in IT_TAXONOMY.values() for s in skills})
+
+def synthetic_catalog(rng, count):
+    catalog = JDCatalog()
+    for i in range(count):
+        skills = ", ".join(rng.sample(ALL_SKILLS, rng.randint(0, 10)))
+        duty = rng.choice(["build apis", "deploy services on aws", "train models", ""])
+        catalog.add(f"Role {i}. Requirements: {skills}. Responsibilities: {duty} and write tests. {rng.randint(0, 8)}+ years")
+    return catalog
+
+@pytest.mark.parametrize("use_blank_nlp", [False, True])
+def test_catalog_scores_match_advanced_match(monkeypatch, use_blank_nlp):
+    if use_blank_nlp:
+        # Exercises the skill/stack matching path without the en_core_web_sm model
+        spacy = pytest.importorskip("spacy")
+        blank = spacy.blank("en")
+        monkeypatch.setattr(scorer, "get_nlp", lambda: blank)
+        monkeypatch.setattr(scorer, "_lemma_cache", scorer.OrderedDict())
+
+    rng = random.Random(3)
+    catalog = synthetic_catalog(rng, 150)
+    plans = catalog._plans
+    for _ in range(10):
+        skills = ", ".join(rng.sample(ALL_SKILLS, rng.randint(0, 15)))
+        resume = mock_ai_parse_resume(f"{rng.randint(0, 10)} years. Built payment api. Skills: {skills}")
+        expected = [advanced_match(resume, plan).overall_score for plan in plans]
+        assert catalog.scores(resume).tolist() == expected
+
+        top = catalog.recommend(resume, 5)
+        assert [match.overall_score for _, _, match in top] == sorted(expected, reverse=True)[:5]
+    # Responsibility lemmas are kept per job, not per distinct text ever seen
+    assert set(catalog._resp_lemmas) <= {job["job_id"] for job in catalog.jobs()}
+
+def test_catalog_accepts_parsed_jds_and_jsonl(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    parsed = JDAgent().run("Data engineer with Spark, Airflow and SQL")
+    path.write_text(
+        '{"title": "Backend", "text": "Python developer with Django"}\n'
+        + '{"title": "Data", "parsed": ' + parsed.json() + '}\n'
+    )
+    catalog = JDCatalog()
+    assert catalog.load_jsonl(str(path)) == 2
+    assert catalog.jobs() == [{"job_id": 1, "title": "Backend"}, {"job_id": 2, "title": "Data"}]
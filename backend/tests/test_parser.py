@@ -0,0 +1,148 @@
+import sys
+import os
+import io
+import zipfile
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import parser
+from utils import preflight as preflight_module
+from utils.preflight import DocumentRejected, OLE_MAGIC, preflight
+
+fitz = pytest.importorskip("fitz")
+
+def pdf_bytes(columns, pages=1):
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        for row in range(20):
+            for col, x in enumerate((50, 320)[:columns]):
+                page.insert_text((x, 60 + row * 30), f"Page {number} developer row {row} col {col}", fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+def test_auto_engine_uses_pdfplumber_only_for_complex_layouts():
+    single = parser.extract_pdf(pdf_bytes(1), "auto")
+    assert single.engine == "pymupdf" and single.layout_score == 0.0 and single.pages == 1
+    assert "Page 0 developer row 19 col 0" in single.text
+
+    double = parser.extract_pdf(pdf_bytes(2), "auto")
+    assert double.engine == "pdfplumber" and double.layout_score > parser.LAYOUT_THRESHOLD
+    assert "row 19 col 1" in double.text
+
+def test_auto_engine_keeps_pymupdf_text_when_pdfplumber_fails(monkeypatch):
+    def broken(*args):
+        raise RuntimeError("pdfplumber crashed")
+    monkeypatch.setattr(parser, "_pdfplumber_pages", broken)
+    report = parser.extract_pdf(pdf_bytes(2), "auto")
+    assert report.engine == "pymupdf" and report.layout_score > parser.LAYOUT_THRESHOLD
+    assert "row 19 col 1" in report.text
+
+def test_pdf_engines_fall_back_and_never_raise():
+    assert parser.extract_pdf(pdf_bytes(1), "pdfplumber").engine == "pdfplumber"
+    broken = parser.extract_pdf(b"%PDF-1.4 not really a pdf", "pymupdf")
+    assert broken.text == "" and broken.engine == "none"
+    with pytest.raises(ValueError):
+        parser.extract_pdf(pdf_bytes(1), "ocr")
+
+def test_long_pdfs_are_split_across_page_workers_and_capped(monkeypatch):
+    data = pdf_bytes(1, pages=12)
+    monkeypatch.setattr(parser, "PDF_MAX_CHARS", 0)
+    serial = parser.extract_pdf(data, "pymupdf")
+    assert serial.pages == 12 and not serial.truncated
+
+    monkeypatch.setattr(parser, "PAGE_WORKERS", 3)
+    monkeypatch.setattr(parser, "PARALLEL_MIN_PAGES", 4)
+    assert parser.extract_pdf(data, "pymupdf").text == serial.text
+
+    monkeypatch.setattr(parser, "PDF_MAX_PAGES", 10)
+    assert parser.extract_pdf(data, "pymupdf").pages == 10
+    page_chars = len(serial.text) // 12
+    monkeypatch.setattr(parser, "PDF_MAX_CHARS", page_chars * 2 + 1) # Reached on the third page
+    budgeted = parser.extract_pdf(data, "pymupdf")
+    assert budgeted.pages == 3 and budgeted.truncated and "Page 3 " not in budgeted.text
+
+def test_broken_page_pool_falls_back_to_serial_and_is_replaced(monkeypatch):
+    data = pdf_bytes(1, pages=12)
+    monkeypatch.setattr(parser, "PDF_MAX_CHARS", 0)
+    serial = parser.extract_pdf(data, "pymupdf")
+    monkeypatch.setattr(parser, "PAGE_WORKERS", 3)
+    monkeypatch.setattr(parser, "PARALLEL_MIN_PAGES", 4)
+
+    broken = parser._page_executor()
+    broken.submit(len, b"").result()
+    for process in list(broken._processes.values()):
+        process.kill()
+        process.join()
+    assert parser.extract_pdf(data, "pymupdf").text == serial.text
+    assert parser._PAGE_EXECUTOR is not broken
+    assert parser.extract_pdf(data, "pymupdf").text == serial.text
+    assert parser._PAGE_EXECUTOR is not None
+
+def docx_package(body):
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    mc = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr("word/document.xml", f'<w:document {w} {mc}><w:body>{body}</w:body></w:document>')
+        package.writestr("word/header1.xml", f'<w:hdr {w}><w:p><w:r><w:t>Jane Doe</w:t></w:r></w:p></w:hdr>')
+        package.writestr("word/header2.xml", f'<w:hdr {w}><w:p><w:r><w:t>Jane Doe</w:t></w:r></w:p></w:hdr>')
+    return buffer.getvalue()
+
+def test_docx_stream_reads_tables_text_boxes_and_headers():
+    box = '<w:txbxContent><w:p><w:r><w:t>Kubernetes</w:t></w:r></w:p></w:txbxContent>'
+    body = (
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        '<w:r><w:t>Skills:</w:t><w:tab/><w:t>Python</w:t></w:r></w:p>'
+        '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Cloud</w:t></w:r></w:p></w:tc>'
+        '<w:tc><w:p><w:r><w:t>AWS</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+        f'<w:p><w:r><mc:AlternateContent><mc:Choice>{box}</mc:Choice><mc:Fallback>{box}</mc:Fallback>'
+        '</mc:AlternateContent></w:r><w:r><w:t>Summary</w:t></w:r></w:p>'
+    )
+    text = parser.extract_text_from_docx(docx_package(body))
+    assert text == "Jane Doe\nSkills:\tPython\nCloud\nAWS\nKubernetes\nSummary"
+
+def image_only_pdf(**save_options):
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_image(fitz.Rect(50, 50, 300, 300), pixmap=fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 20), 0))
+    data = document.tobytes(**save_options)
+    document.close()
+    return data
+
+def ole_file(*streams):
+    # Minimal compound file: header, one FAT sector (0) and one directory sector (1)
+    import struct
+    header = OLE_MAGIC + b"\x00" * 16 + struct.pack("<HHHHH", 0x3E, 3, 0xFFFE, 9, 6) + b"\x00" * 6
+    header += struct.pack("<9I", 0, 1, 1, 0, 4096, 0xFFFFFFFE, 0, 0xFFFFFFFE, 0)
+    header += struct.pack("<109I", 0, *[0xFFFFFFFF] * 108)
+    fat = struct.pack("<128I", 0xFFFFFFFD, 0xFFFFFFFE, *[0xFFFFFFFF] * 126)
+    directory = b""
+    for name in ("Root Entry",) + streams:
+        encoded = name.encode("utf-16-le") + b"\x00\x00"
+        directory += encoded.ljust(64, b"\x00") + struct.pack("<H", len(encoded)) + b"\x00" * 62
+    return header + fat + directory.ljust(512, b"\x00")
+
+def test_preflight_classifies_before_extraction(monkeypatch):
+    assert preflight("pdf", pdf_bytes(1)).status == "text"
+    assert preflight("pdf", image_only_pdf()).status == "image_only"
+    encrypted = image_only_pdf(encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="secret", owner_pw="owner")
+    assert preflight("pdf", encrypted).status == "encrypted"
+    assert preflight("docx", ole_file("EncryptionInfo", "EncryptedPackage")).status == "encrypted"
+    legacy = preflight("docx", ole_file("WordDocument", "1Table"))
+    assert legacy.status == "unsupported_format" and ".doc" in legacy.reason
+    assert preflight("docx", OLE_MAGIC + b"\x00" * 64).status == "unsupported_format" # Truncated container
+    assert preflight("docx", docx_package("<w:p><w:r><w:t>Senior Python developer</w:t></w:r></w:p>")).status == "text"
+    assert preflight("docx", docx_package("<w:p/>")).status == "no_text" # Only a short header
+    assert preflight("pdf", b"%PDF-1.4 garbage").status == "unknown" # Left to full extraction
+    monkeypatch.setattr(preflight_module, "PREFLIGHT_MAX_PAGES", 3)
+    assert preflight("pdf", pdf_bytes(1, pages=4)).status == "oversized"
+
+    monkeypatch.setattr(parser, "SANDBOX", None)
+    monkeypatch.setattr(parser, "extract_pdf", lambda data: pytest.fail("extracted a rejected document"))
+    with pytest.raises(DocumentRejected) as rejected:
+        parser.extract_text(image_only_pdf(), "scan.pdf")
+    assert not rejected.value.preflight.parseable and rejected.value.preflight.reason
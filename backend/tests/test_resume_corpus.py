@@ -0,0 +1,90 @@
+import sys
+import os
+import random
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import scorer
+from utils.it_taxonomy_data import IT_TAXONOMY
+from utils.extraction_engine import mock_ai_parse_resume
+from utils.requirement_plan import compile_jd_text
+from utils.advanced_scorer import advanced_match
+from utils.resume_corpus import ResumeCorpus
+from utils.fingerprint import resume_fingerprint
+
+ALL_SKILLS = sorted({s for skills in IT_TAXONOMY.values() for s in skills})
+ACTIONS = ["Built payment api", "Optimized reporting sql", "Deployed services on aws", "Wrote integration tests", ""]
+JD_TEXT = (
+    "Senior backend engineer. Requirements: Python, Django, PostgreSQL, Docker, AWS, REST APIs. "
+    "Responsibilities: build scalable services and write tests. 5+ years of experience."
+)
+
+def synthetic_resumes(count, seed=7):
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        skills = rng.sample(ALL_SKILLS, rng.randint(0, 12))
+        texts.append(f"Candidate {i}. {rng.randint(0, 12)} years of experience. {rng.choice(ACTIONS)}. Skills: {', '.join(skills)}")
+    return texts
+
+def brute_force_top_k(parsed, plan, k):
+    scored = [(advanced_match(resume, plan).overall_score, row) for row, resume in enumerate(parsed)]
+    return sorted(scored, key=lambda s: (-s[0], s[1]))[:k]
+
+def ranking(corpus, plan, k):
+    result = corpus.rank(plan, k)
+    return [(match.overall_score, resume_id - 1) for resume_id, _, match in result["results"]], result["scored"]
+
+@pytest.fixture
+def blank_nlp(monkeypatch):
+    # Exercises the skill/stack matching path without the en_core_web_sm model
+    spacy = pytest.importorskip("spacy")
+    blank = spacy.blank("en")
+    monkeypatch.setattr(scorer, "get_nlp", lambda: blank)
+    monkeypatch.setattr(scorer, "_lemma_cache", scorer.OrderedDict())
+
+@pytest.mark.parametrize("use_blank_nlp", [False, True])
+def test_rank_matches_brute_force_advanced_match(request, use_blank_nlp):
+    if use_blank_nlp:
+        request.getfixturevalue("blank_nlp")
+    parsed = [mock_ai_parse_resume(text) for text in synthetic_resumes(300)]
+    corpus = ResumeCorpus()
+    for i, resume in enumerate(parsed):
+        corpus.add(resume, f"resume_{i}.pdf")
+
+    plan = compile_jd_text(JD_TEXT)
+    for k in (1, 5, 25):
+        ranked, scored = ranking(corpus, plan, k)
+        assert ranked == brute_force_top_k(parsed, plan, k)
+        assert scored < len(parsed) # Pruned: never scores the whole corpus
+
+def test_corpus_persists_and_deduplicates(tmp_path):
+    path = str(tmp_path / "corpus.sqlite")
+    texts = synthetic_resumes(20)
+    corpus = ResumeCorpus(path)
+    ids = [corpus.add(mock_ai_parse_resume(text), f"r{i}") for i, text in enumerate(texts)]
+    assert corpus.add(mock_ai_parse_resume(texts[0]), "again") == ids[0]
+
+    reopened = ResumeCorpus(path)
+    assert reopened.stats()["resumes"] == 20
+    assert reopened.stats()["postings"] == corpus.stats()["postings"]
+    stored = reopened.get(ids[3])
+    assert stored.total_experience_years == mock_ai_parse_resume(texts[3]).total_experience_years
+    # Loaded with the stored fingerprint, not rebuilt from the skills
+    assert stored._fingerprint == resume_fingerprint(mock_ai_parse_resume(texts[3]))
+
+    plan = compile_jd_text(JD_TEXT)
+    assert [r[0] for r in reopened.rank(plan, 5)["results"]] == [r[0] for r in corpus.rank(plan, 5)["results"]]
+
+def test_corpus_files_without_fingerprints_are_upgraded(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.sqlite")
+    db = sqlite3.connect(path)
+    db.execute("""CREATE TABLE resumes (id INTEGER PRIMARY KEY, label TEXT NOT NULL, content_hash TEXT UNIQUE NOT NULL,
+                  years REAL NOT NULL, exp_text TEXT NOT NULL, parsed BLOB NOT NULL, created REAL NOT NULL)""")
+    db.close()
+    corpus = ResumeCorpus(path)
+    resume_id = corpus.add(mock_ai_parse_resume(synthetic_resumes(1)[0]), "r0")
+    assert corpus.get(resume_id)._fingerprint is not None
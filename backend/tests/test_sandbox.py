@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.sandbox import ExtractionSandbox, ExtractionLimitExceeded, SANDBOX_EVENTS, resource
+
+pytestmark = pytest.mark.skipif(resource is None, reason="needs POSIX resource limits")
+
+def long_pdf_in_sandbox(pages):
+    # Runs in the sandbox worker: settings patched here, since monkeypatch stays in the test process
+    import fitz
+    from utils import parser
+    parser.PAGE_WORKERS, parser.PARALLEL_MIN_PAGES, parser.PDF_MAX_CHARS = 3, 4, 0
+    document = fitz.open()
+    for number in range(pages):
+        document.new_page().insert_text((50, 60), f"Page {number} experience", fontsize=10)
+    report = parser.extract_pdf(document.tobytes(), "pymupdf")
+    executor = parser._PAGE_EXECUTOR
+    return report.pages, executor is not None, [process.pid for process in executor._processes.values()] if executor else []
+
+def dense_pdf_in_sandbox(pages):
+    # Text-heavy pages through pdfplumber: about 0.3s of CPU each
+    import fitz
+    from utils import parser
+    parser.PAGE_WORKERS, parser.PARALLEL_MIN_PAGES, parser.PDF_MAX_CHARS = 3, 4, 0
+    document = fitz.open()
+    for number in range(pages):
+        page = document.new_page()
+        for row in range(70):
+            page.insert_text((20, 20 + row * 11), f"word{row} " * 14, fontsize=7)
+    return parser.extract_pdf(document.tobytes(), "pdfplumber").engine
+
+def running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            return handle.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+def events():
+    return dict(SANDBOX_EVENTS._values)
+
+def test_sandbox_enforces_deadline_cpu_and_memory_limits():
+    sandbox = ExtractionSandbox(timeout=1.0, memory_mb=256, cpu_seconds=1, max_tasks=2, preload=())
+    before = events()
+    try:
+        assert sandbox.run(len, b"resume") == 6
+
+        started = time.monotonic()
+        with pytest.raises(ExtractionLimitExceeded) as timeout:
+            sandbox.run(time.sleep, 30)
+        assert timeout.value.reason == "timeout" and time.monotonic() - started < 5
+
+        with pytest.raises(ExtractionLimitExceeded) as memory:
+            sandbox.run(bytes, 1024 ** 3)
+        assert memory.value.reason == "memory_limit"
+
+        sandbox.timeout = 30.0
+        with pytest.raises(ExtractionLimitExceeded) as cpu:
+            sandbox.run(sum, range(10 ** 12))
+        assert cpu.value.reason == "cpu_limit"
+
+        # Still serving after every kind of failure; the second task recycles the worker
+        assert sandbox.run(len, b"ab") == 2 and sandbox.run(len, b"abc") == 3
+    finally:
+        sandbox.shutdown()
+    after = events()
+    for event in ("timeout", "memory_limit", "cpu_limit", "recycled"):
+        assert after.get((event,), 0) == before.get((event,), 0) + 1
+
+def test_sandboxed_long_pdf_uses_the_page_pool():
+    pytest.importorskip("fitz")
+    sandbox = ExtractionSandbox(timeout=30.0, preload=())
+    try:
+        pages, pooled, pids = sandbox.run(long_pdf_in_sandbox, 12)
+        assert pages == 12 and pooled and pids
+    finally:
+        sandbox.shutdown()
+    # Killing the worker's process group also stops its page pool
+    deadline = time.monotonic() + 5
+    while any(running(pid) for pid in pids) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not any(running(pid) for pid in pids)
+
+def test_cpu_budget_covers_the_page_pool_and_later_documents_still_extract():
+    pytest.importorskip("fitz")
+    pytest.importorskip("pdfplumber")
+    sandbox = ExtractionSandbox(timeout=60.0, cpu_seconds=1, preload=())
+    try:
+        # Page workers run out of the task's budget, the serial fallback runs out of the worker's
+        with pytest.raises(ExtractionLimitExceeded) as limit:
+            sandbox.run(dense_pdf_in_sandbox, 12)
+        assert limit.value.reason == "cpu_limit"
+        pages, pooled, _ = sandbox.run(long_pdf_in_sandbox, 12)
+        assert pages == 12 and pooled
+        pages, pooled, _ = sandbox.run(long_pdf_in_sandbox, 12) # Same worker, same pool
+        assert pages == 12 and pooled
+    finally:
+        sandbox.shutdown()
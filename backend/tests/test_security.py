@@ -83,3 +83,40 @@ def test_missing_input():
     response = client.post("/analyze")
     assert response.status_code == 422 # FastAPI validation error for missing field
 
+def test_upload_stream_aborts_at_size_limit():
+    """Oversized uploads are rejected mid-stream, without buffering the rest."""
+    import asyncio
+    from fastapi import HTTPException
+    from main import read_upload, UPLOAD_CHUNK_SIZE
+
+    class UnsizedUpload:
+        filename = "large.pdf"
+        size = None # Size unknown up front: limit must be enforced while streaming
+        def __init__(self):
+            self.stream = io.BytesIO(VALID_PDF_HEADER + HUGE_CONTENT + HUGE_CONTENT)
+            self.reads = 0
+        async def read(self, size=-1):
+            self.reads += 1
+            return self.stream.read(size)
+
+    upload = UnsizedUpload()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_upload(upload))
+    assert "exceeds maximum size" in exc.value.detail
+    assert upload.reads == MAX_FILE_SIZE // UPLOAD_CHUNK_SIZE + 1
+
+def test_upload_is_read_into_one_buffer_whatever_the_announced_size():
+    import asyncio
+    from main import read_upload, UPLOAD_CHUNK_SIZE
+
+    class SizedUpload:
+        filename = "resume.pdf"
+        def __init__(self, content, size):
+            self.stream = io.BytesIO(content)
+            self.size = size
+        async def read(self, size=-1):
+            return self.stream.read(size)
+
+    content = VALID_PDF_HEADER + b"x" * (3 * UPLOAD_CHUNK_SIZE + 5)
+    for announced in (None, len(content), len(content) + 100, len(content) - 100):
+        assert asyncio.run(read_upload(SizedUpload(content, announced))) == content
@@ -0,0 +1,94 @@
+import sys
+import os
+import random
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.it_taxonomy_data import IT_TAXONOMY, NORMALIZATION_MAP
+from utils.normalizer import normalize_skill
+from utils.skill_proximity import SKILL_PROXIMITY, match_skills
+
+def legacy_semantic_match(jd_items, resume_items):
+    """
+    The nested-loop semantic_match (JD x resume x taxonomy) as it was before
+    the proximity matrix, kept here as the reference implementation.
+    """
+    if not jd_items or not resume_items:
+        return [{"jd_requirement": item, "best_match": None, "confidence": 0.0, "status": "missing"} for item in jd_items]
+
+    normalized_resume_items = [normalize_skill(r) for r in resume_items]
+    results = []
+    for jd_item in jd_items:
+        best_final_score = -1.0
+        best_match_text = None
+        norm_jd = normalize_skill(jd_item)
+        for j, resume_item in enumerate(normalized_resume_items):
+            norm_resume = normalize_skill(resume_item)
+            current_score = 0.0
+            if norm_jd == norm_resume:
+                current_score = 1.0
+            elif norm_jd in norm_resume or norm_resume in norm_jd:
+                current_score = 0.75
+                for cat, skills in IT_TAXONOMY.items():
+                    if norm_jd in skills and norm_resume in skills:
+                        boost_factor = 1.0
+                        min_floor = 0.0
+                        if cat == "languages":
+                            boost_factor = 1.2
+                            min_floor = 0.0
+                        elif cat == "databases":
+                            boost_factor = 1.3
+                            min_floor = 0.5
+                            if norm_jd == "sql" or norm_resume == "sql":
+                                boost_factor = 1.8
+                                min_floor = 0.85
+                        elif cat in ["cloud", "devops", "security", "testing"]:
+                            boost_factor = 1.5
+                            min_floor = 0.70
+                        elif cat in ["frontend", "backend", "data_ai"]:
+                            boost_factor = 1.4
+                            min_floor = 0.65
+                        else:
+                            boost_factor = 1.1
+                            min_floor = 0.0
+                        current_score = max(current_score * boost_factor, min_floor)
+                        current_score = min(1.0, current_score)
+                        break
+            if current_score > best_final_score:
+                best_final_score = current_score
+                best_match_text = resume_items[j]
+
+        status = "missing"
+        if best_final_score >= 0.85:
+            status = "strong"
+        elif best_final_score >= 0.65:
+            status = "partial"
+        results.append({
+            "jd_requirement": jd_item,
+            "best_match": best_match_text if status != "missing" else None,
+            "confidence": round(best_final_score, 2),
+            "status": status
+        })
+    return results
+
+VOCABULARY = sorted({s for skills in IT_TAXONOMY.values() for s in skills} | set(NORMALIZATION_MAP))
+FREE_TEXT = ["API Development", "Flask Api Systems Engineering", "aws cloud", "sql", "spring", "Java", "", "  React.js "]
+
+@pytest.mark.parametrize("seed", range(25))
+def test_match_skills_equivalent_to_legacy(seed):
+    rng = random.Random(seed)
+    pool = VOCABULARY + FREE_TEXT
+    jd = rng.sample(pool, rng.randint(1, 30))
+    resume = [rng.choice(pool) for _ in range(rng.randint(1, 40))]
+    assert match_skills(jd, resume) == legacy_semantic_match(jd, resume)
+
+def test_match_skills_empty_inputs():
+    assert match_skills([], ["python"]) == []
+    assert match_skills(["python"], []) == legacy_semantic_match(["python"], [])
+
+def test_proximity_matrix_is_precomputed_and_readonly():
+    i, j = SKILL_PROXIMITY.ids["sql"], SKILL_PROXIMITY.ids["mysql"]
+    assert SKILL_PROXIMITY.matrix[i, j] == 1.0 # SQL floor inside databases
+    assert not SKILL_PROXIMITY.matrix.flags.writeable
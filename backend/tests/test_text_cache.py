@@ -0,0 +1,54 @@
+import sys
+import os
+import io
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import parser
+from utils.text_cache import TextCache
+
+def test_memory_tier_lru_and_counters():
+    cache = TextCache(max_entries=2)
+    keys = [TextCache.key(bytes([i]), "pdf", "1") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, f"text {i}")
+
+    assert cache.get(keys[0]) is None # Evicted (least recently used)
+    assert cache.get(keys[2]) == "text 2"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 1, 1, 2)
+
+def test_key_depends_on_content_kind_and_parser_version():
+    assert TextCache.key(b"a", "pdf", "1") != TextCache.key(b"b", "pdf", "1")
+    assert TextCache.key(b"a", "pdf", "1") != TextCache.key(b"a", "docx", "1")
+    assert TextCache.key(b"a", "pdf", "1") != TextCache.key(b"a", "pdf", "2")
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "text_cache.sqlite")
+    key = TextCache.key(b"resume", "pdf", "1")
+    TextCache(disk_path=path).put(key, "Python developer " * 100)
+
+    restarted = TextCache(disk_path=path)
+    assert restarted.get(key) == "Python developer " * 100
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.get(key) is not None and restarted.stats()["memory_hits"] == 1 # Promoted
+
+def test_extract_text_parses_each_document_once(monkeypatch):
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("Built REST APIs with Python")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    calls = []
+    original = parser.extract_text_from_docx
+    monkeypatch.setattr(parser, "TEXT_CACHE", TextCache())
+    monkeypatch.setattr(parser, "SANDBOX", None) # Count calls in this process
+    monkeypatch.setattr(parser, "extract_text_from_docx", lambda stream: calls.append(1) or original(stream))
+
+    first = parser.extract_text(buffer.getvalue(), "resume.docx")
+    second = parser.extract_text(buffer.getvalue(), "copy-of-resume.DOCX")
+    assert first == second == "Built REST APIs with Python"
+    assert len(calls) == 1
@@ -1,38 +1,46 @@
 from .schemas import ParsedResume, ParsedJobDescription, MatchScore, MatchReportItem, SkillGapAnalysis
 from .scorer import calculate_semantic_similarity, semantic_match
-from .normalizer import normalize_skill
+from .normalizer import TAXONOMY_INDEX
+from .requirement_plan import RequirementPlan, compile_plan
+from .skill_proximity import SKILL_PROXIMITY
+from .fingerprint import resume_fingerprint
+from . import scorer
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Union
+import numpy as np
 import re
 
-def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore:
+def advanced_match(resume: ParsedResume, jd: Union[RequirementPlan, ParsedJobDescription]) -> MatchScore:
     """
     IT-Optimized Matching Engine.
     Weights: Skills (35%), Responsibilities (25%), Exp (20%), Stacks (10%), ATS Coverage (10%)
+    Pass a compiled RequirementPlan when scoring many resumes against one JD, so
+    only the resume-dependent work is repeated.
     """
+    plan = jd if isinstance(jd, RequirementPlan) else compile_plan(jd)
     
     # 1. NEW IT WEIGHTS
-    weights = {
-        "skills": 35,
-        "resp": 25,
-        "exp": 20,
-        "stacks": 10,
-        "ats": 10
-    }
+    weights = plan.weights
     
     detailed_report = []
     
     # --- PREPARE ASSETS ---
     resume_skills = resume.technical_skills_with_evidence
     # Normalize resume skill names for consistent matching
-    resume_skill_names = [normalize_skill(s.skill) for s in resume_skills]
+    resume_skill_names = [TAXONOMY_INDEX.normalize(s.skill) for s in resume_skills]
+    # First evidence item per normalized skill name
+    evidence_by_skill = {}
+    for name, skill in zip(resume_skill_names, resume_skills):
+        evidence_by_skill.setdefault(name, skill)
     
     # --- CAT 1: SKILLS (LANGUAGES + FRAMEWORKS) - 35% ---
     score_skills = 0.0
-    jd_required_raw = jd.required_skills
-    # Normalize JD requirements
-    jd_required = [normalize_skill(r) for r in jd_required_raw]
+    jd_required_raw = plan.required_raw
+    # Normalized JD requirements (compiled once per JD)
+    jd_required = list(plan.required)
     
     if jd_required:
-        points_per = weights["skills"] / len(jd_required)
+        points_per = plan.points_per_skill
         # Use semantic match with new thresholds
         results = semantic_match(jd_required, resume_skill_names, threshold=0.65)
         
@@ -50,7 +58,7 @@ def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore
             # Boost for context
             if best_match:
                 # Find evidence for the best matched skill
-                evidence = next((s for s in resume_skills if normalize_skill(s.skill) == best_match), None)
+                evidence = evidence_by_skill.get(best_match)
                 if evidence and evidence.context in ["experience", "project"]:
                     match_points = min(points_per, match_points * 1.1)
 
@@ -66,7 +74,7 @@ def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore
     else: score_skills = weights["skills"]
 
     # --- CAT 2: RESPONSIBILITIES & SYSTEMS - 25% ---
-    jd_resp_text = " ".join(jd.responsibilities)
+    jd_resp_text = plan.responsibilities_text
     resume_exp_text = " ".join([" ".join(e.technical_responsibilities) for e in resume.experience])
     resp_overlap = calculate_semantic_similarity(resume_exp_text, jd_resp_text) if jd_resp_text else 1.0
     score_resp = weights["resp"] * resp_overlap
@@ -80,18 +88,18 @@ def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore
     ))
 
     # --- CAT 3: EXPERIENCE DEPTH - 20% ---
-    req_years = jd.minimum_experience_years or 2
+    req_years = plan.required_years
     total_years = resume.total_experience_years or 0
     exp_factor = min(1.0, total_years / req_years) if req_years > 0 else 1.0
     score_exp = weights["exp"] * exp_factor
 
     # --- CAT 4: TOOLS / CLOUD / DATABASES - 10% ---
     score_stack = 0.0
-    jd_stack_raw = list(set(jd.frameworks_and_tools + jd.databases + jd.cloud_platforms))
-    jd_stack = [normalize_skill(s) for s in jd_stack_raw]
+    jd_stack_raw = plan.stack_raw
+    jd_stack = list(plan.stack)
     
     if jd_stack:
-        points_per_stack = weights["stacks"] / len(jd_stack)
+        points_per_stack = plan.points_per_stack
         stack_results = semantic_match(jd_stack, resume_skill_names, threshold=0.65)
         for i, res in enumerate(stack_results):
             status = res["status"]
@@ -116,10 +124,15 @@ def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore
 
     # --- CAT 5: ATS KEYWORD COVERAGE - 10% ---
     score_ats = 0.0
-    if jd.ats_keywords:
-        normalized_ats = [normalize_skill(kw) for kw in jd.ats_keywords]
-        found_keywords = [kw for kw in normalized_ats if kw in resume_skill_names]
-        coverage = len(found_keywords) / len(jd.ats_keywords)
+    if plan.ats_keywords:
+        skills = resume_fingerprint(resume)
+        if len(plan.ats_keyword_set) == len(plan.ats_keywords):
+            # Bitwise intersection of the JD keyword and resume skill fingerprints
+            found_count = plan.ats_fingerprint.overlap(skills)
+        else:
+            # Repeated keywords count once per occurrence
+            found_count = sum(1 for kw in plan.ats_keywords if kw in skills)
+        coverage = found_count / len(plan.ats_keywords)
         score_ats = weights["ats"] * coverage
     else: score_ats = weights["ats"]
 
@@ -200,3 +213,153 @@ def advanced_match(resume: ParsedResume, jd: ParsedJobDescription) -> MatchScore
         detected_years_experience=total_years,
         required_years_experience=req_years
     )
+
+@dataclass
+class BatchMatchScores:
+    """
+    advanced_match sub-scores for N resumes against one JD, as float arrays in
+    input order (unrounded; advanced_match reports them rounded to 0.1), plus
+    full MatchScore reports for the requested indices only.
+    """
+    overall: np.ndarray
+    skills: np.ndarray
+    responsibilities: np.ndarray
+    experience: np.ndarray
+    stack: np.ndarray
+    ats: np.ndarray
+    reports: Dict[int, MatchScore] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.overall)
+
+    def ranking(self) -> np.ndarray:
+        """Indices by overall score, best first (ties in input order)."""
+        return np.argsort(-self.overall, kind="stable")
+
+def _requirement_points_many(requirements, points_per, names_per_resume, boosted_per_resume, boost_evidence):
+    """
+    Per resume sum of the points the skills/stack loop of advanced_match awards,
+    for all resumes at once. Best match per (requirement, resume) is the first
+    resume skill with the highest confidence, as in match_skills.
+    """
+    size = len(names_per_resume)
+    total = np.zeros(size, dtype=np.float64)
+    owners = [i for i, names in enumerate(names_per_resume) if names]
+    if not owners:
+        return total
+
+    # Unique resume skill names across the batch, then one entry per (resume, position)
+    terms, term_ids, flat_terms, lengths = [], {}, [], []
+    for i in owners:
+        for name in names_per_resume[i]:
+            index = term_ids.get(name)
+            if index is None:
+                index = term_ids[name] = len(terms)
+                terms.append(name)
+            flat_terms.append(index)
+        lengths.append(len(names_per_resume[i]))
+    flat_terms = np.asarray(flat_terms, dtype=np.intp)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    segment = np.repeat(np.arange(len(owners)), lengths)
+    positions = np.arange(len(flat_terms))
+    boosted = np.asarray([boosted_per_resume[i][name] for i in owners for name in names_per_resume[i]])
+
+    conf = SKILL_PROXIMITY.scores(list(requirements), terms)[:, flat_terms]
+    best = np.maximum.reduceat(conf, starts, axis=1)
+    first = np.minimum.reduceat(np.where(conf == best[:, segment], positions, len(positions)), starts, axis=1)
+
+    # confidence is round(score, 2) in match_skills; scores take few distinct values
+    values, inverse = np.unique(best, return_inverse=True)
+    confidence = np.asarray([round(float(v), 2) for v in values])[inverse].reshape(best.shape)
+
+    owners = np.asarray(owners, dtype=np.intp)
+    for row in range(len(requirements)):
+        is_strong = best[row] >= 0.85
+        is_partial = (best[row] >= 0.65) & ~is_strong
+        points = np.where(is_strong, points_per, np.where(is_partial, points_per * confidence[row], 0.0))
+        if boost_evidence:
+            lift = boosted[first[row]] & (is_strong | is_partial)
+            points = np.where(lift, np.minimum(points_per, points * 1.1), points)
+        total[owners] += points
+    return total
+
+def advanced_match_many(resumes: Sequence[ParsedResume], jd: Union[RequirementPlan, ParsedJobDescription],
+                        details: Iterable[int] = ()) -> BatchMatchScores:
+    """
+    Scores every resume against one JD with the same numbers as advanced_match,
+    computing each category for the whole batch as arrays. Detailed reports
+    (MatchReportItems, gaps) are built only for the indices in `details`.
+    """
+    plan = jd if isinstance(jd, RequirementPlan) else compile_plan(jd)
+    weights = plan.weights
+    size = len(resumes)
+
+    names_per_resume: List[List[str]] = []
+    boosted_per_resume: List[Dict[str, bool]] = []
+    for resume in resumes:
+        names = [TAXONOMY_INDEX.normalize(s.skill) for s in resume.technical_skills_with_evidence]
+        boosted = {}
+        for name, skill in zip(names, resume.technical_skills_with_evidence):
+            boosted.setdefault(name, skill.context in ["experience", "project"])
+        names_per_resume.append(names)
+        boosted_per_resume.append(boosted)
+    # semantic_match reports every requirement as missing without the NLP model
+    matching_enabled = scorer.get_nlp() is not None
+
+    # --- CAT 1: SKILLS ---
+    if not plan.required:
+        score_skills = np.full(size, float(weights["skills"]))
+    elif matching_enabled:
+        score_skills = _requirement_points_many(plan.required, plan.points_per_skill, names_per_resume, boosted_per_resume, True)
+    else:
+        score_skills = np.zeros(size)
+
+    # --- CAT 2: RESPONSIBILITIES ---
+    exp_texts = [" ".join([" ".join(e.technical_responsibilities) for e in r.experience]) for r in resumes]
+    if not plan.responsibilities_text:
+        overlap = np.ones(size)
+    elif not matching_enabled:
+        overlap = np.asarray([calculate_semantic_similarity(t, plan.responsibilities_text) for t in exp_texts], dtype=np.float64)
+    else:
+        # One lemmatization batch for the JD text and every distinct resume text
+        lemmas = dict(zip(exp_texts, scorer.lemmatize_texts(exp_texts)))
+        jd_lemma = scorer.lemmatize_texts([plan.responsibilities_text])[0]
+        overlap = np.asarray([scorer.tfidf_cosine(lemmas[t], jd_lemma) for t in exp_texts], dtype=np.float64)
+    score_resp = weights["resp"] * overlap
+
+    # --- CAT 3: EXPERIENCE ---
+    years = np.asarray([r.total_experience_years or 0 for r in resumes], dtype=np.float64)
+    score_exp = weights["exp"] * (np.minimum(1.0, years / plan.required_years) if plan.required_years > 0 else np.ones(size))
+
+    # --- CAT 4: STACK ---
+    if not plan.stack:
+        score_stack = np.full(size, float(weights["stacks"]))
+    elif matching_enabled:
+        score_stack = _requirement_points_many(plan.stack, plan.points_per_stack, names_per_resume, boosted_per_resume, False)
+    else:
+        score_stack = np.zeros(size)
+
+    # --- CAT 5: ATS (fingerprint intersections) ---
+    if plan.ats_keywords:
+        unique_keywords = len(plan.ats_keyword_set) == len(plan.ats_keywords)
+        found = []
+        for resume in resumes:
+            skills = resume_fingerprint(resume)
+            if unique_keywords:
+                found.append(plan.ats_fingerprint.overlap(skills))
+            else:
+                found.append(sum(1 for kw in plan.ats_keywords if kw in skills))
+        score_ats = weights["ats"] * (np.asarray(found, dtype=np.float64) / len(plan.ats_keywords))
+    else:
+        score_ats = np.full(size, float(weights["ats"]))
+
+    total = score_skills + score_resp + score_exp + score_stack + score_ats
+    return BatchMatchScores(
+        overall=total.astype(np.int64),
+        skills=score_skills,
+        responsibilities=score_resp,
+        experience=score_exp,
+        stack=score_stack,
+        ats=score_ats,
+        reports={i: advanced_match(resumes[i], plan) for i in details}
+    )
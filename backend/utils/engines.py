@@ -0,0 +1,106 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+class EngineUnavailable(RuntimeError):
+    """Raised when a heavy dependency (parser backend, NLP model) cannot be loaded."""
+
+class _Engine:
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+class EngineRegistry:
+    """
+    Lazily loaded heavy dependencies (pdfplumber, PyMuPDF, python-docx, spaCy).
+    Nothing is imported until the first `get`, so `import main` stays cheap on
+    scale-to-zero cold starts; `/ready` calls `warm_up` to pay the cost up front.
+    Load failures are remembered and not retried.
+    """
+    def __init__(self):
+        self._engines: Dict[str, _Engine] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], required: bool = True):
+        if name not in self._engines:
+            self._engines[name] = _Engine(name, loader, required)
+
+    def _load(self, engine: _Engine):
+        with engine.lock:
+            if engine.loaded:
+                return
+            start = time.perf_counter()
+            try:
+                engine.value = engine.loader()
+            except Exception as e:
+                engine.error = f"{type(e).__name__}: {e}"
+                print(f"Warning: Engine '{engine.name}' unavailable: {engine.error}")
+            engine.load_seconds = time.perf_counter() - start
+            engine.loaded = True
+            if engine.error is None:
+                print(f"Engine '{engine.name}' loaded in {engine.load_seconds:.2f}s")
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the loaded engine, loading it on first use. Raises EngineUnavailable if loading failed.
+        """
+        engine = self._engines[name]
+        if not engine.loaded:
+            self._load(engine)
+        if engine.error is not None:
+            raise EngineUnavailable(f"{name}: {engine.error}")
+        return engine.value
+
+    def available(self, name: str) -> bool:
+        try:
+            self.get(name)
+            return True
+        except EngineUnavailable:
+            return False
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, dict]:
+        for name in names or list(self._engines):
+            self.available(name)
+        return self.status()
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "loaded": engine.loaded and engine.error is None,
+                "required": engine.required,
+                "load_seconds": round(engine.load_seconds, 3) if engine.load_seconds is not None else None,
+                "error": engine.error
+            }
+            for name, engine in self._engines.items()
+        }
+
+    def ready(self) -> bool:
+        """
+        True once every required engine has been loaded successfully.
+        """
+        return all(e.loaded and e.error is None for e in self._engines.values() if e.required)
+
+ENGINES = EngineRegistry()
+
+# --- Startup report: wall time spent importing each module group ---
+STARTUP_REPORT: Dict[str, float] = {}
+
+@contextmanager
+def import_timer(label: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_REPORT[label] = STARTUP_REPORT.get(label, 0.0) + time.perf_counter() - start
+
+def print_startup_report():
+    total = sum(STARTUP_REPORT.values())
+    print(f"Startup: imports took {total:.2f}s")
+    for label, seconds in sorted(STARTUP_REPORT.items(), key=lambda kv: kv[1], reverse=True):
+        print(f"  {label:<28} {seconds * 1000:8.1f} ms")
@@ -1,8 +1,9 @@
 from .schemas import ParsedResume, ParsedJobDescription, MandatoryRequirements, PreferredRequirements, SkillWithEvidence, ExperienceItem, MatchScore
 from .prompts import ATS_EXTRACTOR_SYSTEM_PROMPT, JD_EXTRACTION_USER_PROMPT, RESUME_EXTRACTION_USER_PROMPT, EXPLANATION_USER_PROMPT
 import re
-from .normalizer import normalize_skill, get_skill_category
+from .normalizer import TAXONOMY_INDEX
 from .it_taxonomy_data import IT_TAXONOMY
+from .skill_matcher import IT_SKILL_MATCHER
 
 # ==========================================
 # 🧩 AGENT 1: IT JD ANALYZER AGENT
@@ -83,22 +84,12 @@ class JDAgent:
                     extracted_capabilities.append(mapping)
         
         # IT Taxonomy Extraction
+        # Single compiled scan (word boundaries, symbol-aware for C++, C#, .NET)
         found_techs = {cat: [] for cat in IT_TAXONOMY}
-        for category, skills in IT_TAXONOMY.items():
-            for skill in skills:
-                # Special handling for symbols (C++, C#, .NET) where \b fails
-                if any(c in skill for c in ['+', '#', '.']):
-                    # Check if skill exists and is surrounded by compatible delimiters
-                    # Delimiters: start/end, whitespace, punctuation, brackets
-                    pattern = r'(?:^|[\s\.,;:\(\)\[\]\-/])' + re.escape(skill) + r'(?:$|[\s\.,;:\(\)\[\]\-/])'
-                    if re.search(pattern, jd_lower): 
-                         found_techs[category].append(normalize_skill(skill))
-                else:
-                    # Use word boundaries for standard words
-                    if re.search(r'\b' + re.escape(skill) + r'\b', jd_lower):
-                        found_techs[category].append(normalize_skill(skill))
+        for hit in IT_SKILL_MATCHER.first_hits(jd_lower):
+            found_techs[hit.category].append(TAXONOMY_INDEX.normalize(hit.skill))
 
-        all_normalized_techs = [normalize_skill(t) for sub in found_techs.values() for t in sub]
+        all_normalized_techs = [TAXONOMY_INDEX.normalize(t) for sub in found_techs.values() for t in sub]
         
         # Consolidate categories for the schema
         frameworks_tools = (
@@ -168,29 +159,17 @@ class ResumeAgent:
         
         # IT Taxonomy Extraction (Canonical Skills)
         all_it_techs = []
-        for category, skills in IT_TAXONOMY.items():
-            for skill in skills:
-                # Special handling for symbols (C++, C#, .NET)
-                found = False
-                if any(c in skill for c in ['+', '#', '.']):
-                     pattern = r'(?:^|[\s\.,;:\(\)\[\]\-/])' + re.escape(skill) + r'(?:$|[\s\.,;:\(\)\[\]\-/])'
-                     if re.search(pattern, resume_lower):
-                         found = True
-                else:
-                    if re.search(r'\b' + re.escape(skill) + r'\b', resume_lower):
-                        found = True
-                
-                if found:
-                    normalized = normalize_skill(skill)
-                    idx = resume_lower.find(skill) # Simple find for context snippet
-                    snippet = resume_text[max(0, idx-20):min(len(resume_text), idx+60)].replace('\n', ' ')
-                    skills_evidence.append(SkillWithEvidence(
-                        skill=normalized,
-                        category=category,
-                        context="skills_list",
-                        evidence_text=f"...{snippet}..."
-                    ))
-                    all_it_techs.append(normalized)
+        for hit in IT_SKILL_MATCHER.first_hits(resume_lower):
+            normalized = TAXONOMY_INDEX.normalize(hit.skill)
+            idx = hit.start # Span of the first bounded match, used for the context snippet
+            snippet = resume_text[max(0, idx-20):min(len(resume_text), idx+60)].replace('\n', ' ')
+            skills_evidence.append(SkillWithEvidence(
+                skill=normalized,
+                category=hit.category,
+                context="skills_list",
+                evidence_text=f"...{snippet}..."
+            ))
+            all_it_techs.append(normalized)
                 
         # Experience Year Calculation (Improved)
         # Look for explicit patterns first "5+ years", "5 years experience", "Experience: 5 years"
@@ -0,0 +1,107 @@
+import struct
+import zlib
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Tuple
+
+from .normalizer import TAXONOMY_INDEX
+from .skill_proximity import SKILL_PROXIMITY
+from .schemas import ParsedResume, ParsedJobDescription
+
+# Bit i <-> SKILL_PROXIMITY.vocabulary[i]
+VOCABULARY: Tuple[str, ...] = SKILL_PROXIMITY.vocabulary
+BIT_IDS: Dict[str, int] = SKILL_PROXIMITY.ids
+# Serialized fingerprints from a different vocabulary are rejected instead of silently misread
+VOCABULARY_CRC = zlib.crc32("\n".join(VOCABULARY).encode("utf-8"))
+CATEGORY_MASKS: Tuple[int, ...] = tuple(
+    sum(1 << BIT_IDS[skill] for skill in TAXONOMY_INDEX.skills_by_category[cat] if skill in BIT_IDS)
+    for cat in TAXONOMY_INDEX.categories
+)
+_HEADER = struct.Struct("<IH")
+_EXTRA_SEPARATOR = "\x1f"
+
+class SkillFingerprint(NamedTuple):
+    """
+    Normalized skills of a document as an int bitset over the taxonomy vocabulary,
+    plus the (rare) names outside it, e.g. "API Development" capabilities.
+    Set operations on skills become bitwise ops; to_bytes is ~30 bytes per resume.
+    """
+    bits: int
+    extra: FrozenSet[str] = frozenset()
+
+    def __len__(self) -> int:
+        return self.bits.bit_count() + len(self.extra)
+
+    def __contains__(self, skill: str) -> bool:
+        bit = BIT_IDS.get(skill)
+        return (self.bits >> bit) & 1 == 1 if bit is not None else skill in self.extra
+
+    def __and__(self, other: "SkillFingerprint") -> "SkillFingerprint":
+        return SkillFingerprint(self.bits & other.bits, self.extra & other.extra)
+
+    def __or__(self, other: "SkillFingerprint") -> "SkillFingerprint":
+        return SkillFingerprint(self.bits | other.bits, self.extra | other.extra)
+
+    def overlap(self, other: "SkillFingerprint") -> int:
+        """Number of skills present in both."""
+        return (self.bits & other.bits).bit_count() + len(self.extra & other.extra)
+
+    def category_counts(self) -> Tuple[int, ...]:
+        """Popcount per taxonomy category (TAXONOMY_INDEX.categories order)."""
+        return tuple((self.bits & mask).bit_count() for mask in CATEGORY_MASKS)
+
+    def shared_categories(self, other: "SkillFingerprint") -> Tuple[str, ...]:
+        """Categories in which both documents have at least one skill."""
+        return tuple(
+            cat for cat, mask in zip(TAXONOMY_INDEX.categories, CATEGORY_MASKS)
+            if self.bits & mask and other.bits & mask
+        )
+
+    def skills(self) -> Tuple[str, ...]:
+        bits = self.bits
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(VOCABULARY[low.bit_length() - 1])
+            bits ^= low
+        return tuple(names) + tuple(sorted(self.extra))
+
+    def to_bytes(self) -> bytes:
+        packed = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+        extra = _EXTRA_SEPARATOR.join(sorted(self.extra)).encode("utf-8")
+        return _HEADER.pack(VOCABULARY_CRC, len(packed)) + packed + extra
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SkillFingerprint":
+        crc, size = _HEADER.unpack_from(data)
+        if crc != VOCABULARY_CRC:
+            raise ValueError("Fingerprint was built for a different skill vocabulary")
+        start = _HEADER.size
+        bits = int.from_bytes(data[start:start + size], "little")
+        extra = data[start + size:].decode("utf-8")
+        return cls(bits, frozenset(extra.split(_EXTRA_SEPARATOR)) if extra else frozenset())
+
+def fingerprint(normalized_skills: Iterable[str]) -> SkillFingerprint:
+    """
+    Fingerprint of already normalized skill names.
+    """
+    bits = 0
+    extra = set()
+    for skill in normalized_skills:
+        bit = BIT_IDS.get(skill)
+        if bit is None:
+            extra.add(skill)
+        else:
+            bits |= 1 << bit
+    return SkillFingerprint(bits, frozenset(extra))
+
+def resume_fingerprint(resume: ParsedResume) -> SkillFingerprint:
+    """
+    Fingerprint of a parsed resume's normalized skills, computed once and kept on the resume.
+    """
+    if resume._fingerprint is None:
+        normalize = TAXONOMY_INDEX.normalize
+        resume._fingerprint = fingerprint(normalize(s.skill) for s in resume.technical_skills_with_evidence)
+    return resume._fingerprint
+
+def jd_fingerprint(jd: ParsedJobDescription) -> SkillFingerprint:
+    normalize = TAXONOMY_INDEX.normalize
+    return fingerprint(normalize(s) for s in jd.required_skills + jd.required_tools_or_methods)
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+from typing import Dict, List, Union
+
+import numpy as np
+
+from .schemas import ParsedResume, ParsedJobDescription
+from .normalizer import TAXONOMY_INDEX
+from .skill_proximity import SKILL_PROXIMITY
+from .requirement_plan import RequirementPlan, compile_plan, compile_jd_text
+from .advanced_scorer import advanced_match
+from . import scorer
+
+class JDCatalog:
+    """
+    Open roles kept as compiled requirement plans, for matching one resume
+    against all of them (`recommend`).
+
+    Every requirement, stack item and ATS keyword of every JD is flattened into
+    arrays (unique term id + owning JD), so scoring a resume is one proximity
+    block over the unique terms plus a few gathers and bincounts. The arithmetic
+    mirrors advanced_match step by step, so overall scores are identical; the
+    returned top roles are then materialized with advanced_match for the full report.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._titles: List[str] = []
+        self._plans: List[RequirementPlan] = []
+        # Lemmatized responsibilities per job id, so it holds one entry per role in the catalog
+        self._resp_lemmas: Dict[int, str] = {}
+        self._arrays = None
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def add(self, jd: Union[RequirementPlan, ParsedJobDescription, str], title: str = "") -> int:
+        if isinstance(jd, str):
+            plan = compile_jd_text(jd)
+        elif isinstance(jd, ParsedJobDescription):
+            plan = compile_plan(jd)
+        else:
+            plan = jd
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self._ids.append(job_id)
+            self._titles.append(title or plan.jd.job_title or f"Job {job_id}")
+            self._plans.append(plan)
+            self._arrays = None
+            return job_id
+
+    def jobs(self) -> List[dict]:
+        with self._lock:
+            return [{"job_id": i, "title": t} for i, t in zip(self._ids, self._titles)]
+
+    @staticmethod
+    def _flatten(groups):
+        # Unique terms, then (term index, owner index) for every item of every group
+        terms, term_ids, flat_terms, owners = [], {}, [], []
+        for owner, items in enumerate(groups):
+            for item in items:
+                index = term_ids.get(item)
+                if index is None:
+                    index = term_ids[item] = len(terms)
+                    terms.append(item)
+                flat_terms.append(index)
+                owners.append(owner)
+        return terms, np.asarray(flat_terms, dtype=np.intp), np.asarray(owners, dtype=np.intp)
+
+    def _snapshot(self):
+        # Caller holds the lock
+        if self._arrays is None:
+            plans = list(self._plans)
+            arrays = {"plans": plans, "ids": list(self._ids), "titles": list(self._titles)}
+            for name, groups in (
+                ("required", [p.required for p in plans]),
+                ("stack", [p.stack for p in plans]),
+                ("ats", [p.ats_keywords for p in plans])
+            ):
+                arrays[name] = self._flatten(groups)
+            weights = {key: np.asarray([p.weights[key] for p in plans], dtype=np.float64) for key in plans[0].weights} if plans else {}
+            arrays["weights"] = weights
+            arrays["points_per_skill"] = np.asarray([p.points_per_skill for p in plans], dtype=np.float64)
+            arrays["points_per_stack"] = np.asarray([p.points_per_stack for p in plans], dtype=np.float64)
+            arrays["required_years"] = np.asarray([p.required_years for p in plans], dtype=np.float64)
+            arrays["ats_count"] = np.asarray([len(p.ats_keywords) for p in plans], dtype=np.float64)
+            self._arrays = arrays
+        return self._arrays
+
+    @staticmethod
+    def _requirement_points(flat, points_per, resume_names, boosted, size, boost_evidence):
+        """
+        Per JD sum of the points advanced_match awards for one requirement group
+        (skills or stack), given the normalized resume skill names.
+        """
+        terms, flat_terms, owners = flat
+        if not len(flat_terms):
+            return np.zeros(size)
+        if not resume_names or scorer.get_nlp() is None:
+            # semantic_match reports every requirement as missing
+            return np.zeros(size)
+
+        best_idx, best_scores = SKILL_PROXIMITY.best_matches(list(terms), resume_names)
+        best_scores = best_scores.tolist()
+        strong = np.asarray([s >= 0.85 for s in best_scores])
+        partial = np.asarray([0.65 <= s < 0.85 for s in best_scores])
+        confidence = np.asarray([round(s, 2) for s in best_scores], dtype=np.float64)
+        evidence = np.asarray([boosted[resume_names[j]] for j in best_idx.tolist()])
+
+        pp = points_per[owners]
+        is_strong = strong[flat_terms]
+        is_partial = partial[flat_terms]
+        points = np.where(is_strong, pp, np.where(is_partial, pp * confidence[flat_terms], 0.0))
+        if boost_evidence:
+            # Boost for context: experience/project evidence of the best (non-missing) match
+            lift = evidence[flat_terms] & (is_strong | is_partial)
+            points = np.where(lift, np.minimum(pp, points * 1.1), points)
+        return np.bincount(owners, weights=points, minlength=size)
+
+    def _responsibility_overlap(self, job_ids, plans, resume_exp_text: str) -> np.ndarray:
+        # calculate_semantic_similarity against each JD, with JD lemmas kept across requests
+        if scorer.get_nlp() is None:
+            return np.asarray([scorer.calculate_semantic_similarity(resume_exp_text, p.responsibilities_text)
+                               if p.responsibilities_text else 1.0 for p in plans])
+        pending = [(job_id, p.responsibilities_text) for job_id, p in zip(job_ids, plans)
+                   if p.responsibilities_text and job_id not in self._resp_lemmas]
+        if pending:
+            lemmas = scorer.lemmatize_texts([text for _, text in pending])
+            self._resp_lemmas.update((job_id, lemma) for (job_id, _), lemma in zip(pending, lemmas))
+        resume_lemma = scorer.lemmatize_texts([resume_exp_text])[0]
+        return np.asarray([scorer.tfidf_cosine(resume_lemma, self._resp_lemmas[job_id])
+                           if p.responsibilities_text else 1.0 for job_id, p in zip(job_ids, plans)])
+
+    def scores(self, resume: ParsedResume) -> np.ndarray:
+        """
+        advanced_match overall_score of the resume against every catalog JD, in catalog order.
+        """
+        with self._lock:
+            arrays = self._snapshot()
+            plans = arrays["plans"]
+            size = len(plans)
+            if not size:
+                return np.zeros(0, dtype=np.int64)
+
+            resume_names = [TAXONOMY_INDEX.normalize(s.skill) for s in resume.technical_skills_with_evidence]
+            boosted = {}
+            for name, skill in zip(resume_names, resume.technical_skills_with_evidence):
+                boosted.setdefault(name, skill.context in ["experience", "project"])
+            weights = arrays["weights"]
+
+            # Skills: no requirements means full points
+            skills = self._requirement_points(arrays["required"], arrays["points_per_skill"], resume_names, boosted, size, True)
+            skills = np.where(arrays["points_per_skill"] > 0, skills, weights["skills"])
+
+            resume_exp_text = " ".join([" ".join(e.technical_responsibilities) for e in resume.experience])
+            resp = weights["resp"] * self._responsibility_overlap(arrays["ids"], plans, resume_exp_text)
+
+            total_years = resume.total_experience_years or 0
+            exp = weights["exp"] * np.minimum(1.0, total_years / arrays["required_years"])
+
+            stack = self._requirement_points(arrays["stack"], arrays["points_per_stack"], resume_names, boosted, size, False)
+            stack = np.where(arrays["points_per_stack"] > 0, stack, weights["stacks"])
+
+            ats_terms, ats_flat, ats_owners = arrays["ats"]
+            resume_set = set(resume_names)
+            found = np.asarray([term in resume_set for term in ats_terms], dtype=np.float64)
+            found_per_jd = np.bincount(ats_owners, weights=found[ats_flat] if len(ats_flat) else None, minlength=size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ats = np.where(arrays["ats_count"] > 0, weights["ats"] * (found_per_jd / arrays["ats_count"]), weights["ats"])
+
+            return (skills + resp + exp + stack + ats).astype(np.int64)
+
+    def recommend(self, resume: ParsedResume, top_k: int = 10) -> List[tuple]:
+        """
+        Best matching roles as (job_id, title, MatchScore), highest overall_score first
+        (ties in catalog order). Only the returned roles run the full advanced_match.
+        """
+        overall = self.scores(resume)
+        if not len(overall) or top_k <= 0:
+            return []
+        with self._lock:
+            arrays = self._snapshot()
+        top = np.argsort(-overall, kind="stable")[:top_k].tolist()
+        return [(arrays["ids"][i], arrays["titles"][i], advanced_match(resume, arrays["plans"][i])) for i in top]
+
+    def load_jsonl(self, path: str) -> int:
+        """
+        Adds roles from a JSONL file of {"title": ..., "text": ...} or {"title": ..., "parsed": {ParsedJobDescription}}.
+        """
+        added = 0
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                jd = ParsedJobDescription(**record["parsed"]) if "parsed" in record else record["text"]
+                self.add(jd, record.get("title", ""))
+                added += 1
+        return added
+
+def catalog_from_env() -> JDCatalog:
+    """
+    MATCHLY_JD_CATALOG: optional JSONL file of roles loaded at startup.
+    """
+    catalog = JDCatalog()
+    path = os.getenv("MATCHLY_JD_CATALOG")
+    if path:
+        print(f"Loaded {catalog.load_jsonl(path)} roles into the JD catalog from {path}")
+    return catalog
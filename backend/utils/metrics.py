@@ -0,0 +1,222 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Union
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9)) # 1KB .. 64MB
+CHARS_BUCKETS = (500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# Per thread: updates queued while a pool job runs (see MetricsRegistry.deferred)
+_local = threading.local()
+
+def _deferred():
+    return getattr(_local, "updates", None)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [n + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (Prometheus semantics). observe() is a bisect and
+    three additions under a lock, cheap enough for every request.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=LATENCY_BUCKETS, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, list] = {} # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labelvalues):
+        deferred = _deferred()
+        if deferred is not None:
+            deferred.append((self.name, value, labelvalues))
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> List[str]:
+        lines = []
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        deferred = _deferred()
+        if deferred is not None:
+            deferred.append((self.name, amount, labelvalues))
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(snapshot.items())]
+
+class Gauge:
+    """
+    Read at scrape time from a callback, so pool and cache gauges cost nothing on the hot path.
+    The callback returns a number, or {label values tuple: number} for labelled gauges.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], Union[float, Dict[tuple, float]]],
+                 labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.labelnames = tuple(labelnames)
+
+    def collect(self) -> List[str]:
+        try:
+            value = self.read()
+        except Exception as e:
+            print(f"Warning: gauge {self.name} failed: {e}")
+            return []
+        values = value if isinstance(value, dict) else {(): value}
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}"
+                for labels, v in sorted(values.items())]
+
+class CallbackCounter(Gauge):
+    """
+    Monotonic count kept by another object (pool, cache) and read at scrape time, like Gauge.
+    """
+    kind = "counter"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        # Re-registering a name (e.g. module reload in tests) returns the existing metric
+        return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS, labelnames=()) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets, labelnames))
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, read, labelnames=()) -> Gauge:
+        gauge = Gauge(name, documentation, read, labelnames)
+        self._metrics[name] = gauge # Callbacks are always replaced by the latest registration
+        return gauge
+
+    def callback_counter(self, name, documentation, read, labelnames=()) -> CallbackCounter:
+        counter = CallbackCounter(name, documentation, read, labelnames)
+        self._metrics[name] = counter
+        return counter
+
+    @contextmanager
+    def deferred(self):
+        """
+        Queues the histogram observations and counter increments made by this thread
+        instead of applying them, and yields the queue. Pool jobs (which may run in
+        another process) return it with their result, and the caller replays it here.
+        """
+        previous = _deferred()
+        _local.updates = updates = []
+        try:
+            yield updates
+        finally:
+            _local.updates = previous
+
+    def replay(self, updates):
+        for name, value, labelvalues in updates:
+            metric = self._metrics.get(name)
+            if isinstance(metric, Histogram):
+                metric.observe(value, *labelvalues)
+            elif isinstance(metric, Counter):
+                metric.inc(*labelvalues, amount=value)
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram("matchly_stage_seconds", "Duration of each analysis pipeline stage.", labelnames=("stage",))
+NLP_SECONDS = METRICS.histogram("matchly_nlp_seconds", "Time spent in spaCy (lemmatization cache misses).")
+REQUEST_SECONDS = METRICS.histogram("matchly_request_seconds", "HTTP request latency.", labelnames=("endpoint", "status"))
+DOCUMENT_BYTES = METRICS.histogram("matchly_document_bytes", "Size of uploaded documents.", BYTES_BUCKETS, ("role", "format"))
+DOCUMENT_CHARS = METRICS.histogram("matchly_document_chars", "Characters of extracted document text.", CHARS_BUCKETS, ("role",))
+DOCUMENT_PAGES = METRICS.histogram("matchly_document_pages", "Pages of parsed PDF documents.", PAGE_BUCKETS)
+EXTRACTION_SECONDS = METRICS.histogram("matchly_extraction_seconds", "Text extraction time per document, by format and engine.",
+                                       labelnames=("format", "engine"))
+
+class StageTimings:
+    """
+    Stage durations of one request, in the order they ran. Plain data, so a pool
+    worker can fill one and return it. Feeds the stage histogram and the
+    Server-Timing header.
+    """
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, other: "StageTimings"):
+        for name, seconds in other.stages.items():
+            self.add(name, seconds)
+
+    def observe(self):
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, name)
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items())
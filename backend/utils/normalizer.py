@@ -1,38 +1,71 @@
 import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from .it_taxonomy_data import NORMALIZATION_MAP, IT_TAXONOMY
 
+class TaxonomyIndex:
+    """
+    Read-only lookup structure built once from the IT taxonomy.
+    Replaces the per-call walks over every category list with hashed lookups:
+    frozenset membership per category, a skill -> categories reverse map and
+    an alias table (canonical skills + NORMALIZATION_MAP) behind a memoized normalizer.
+    """
+    def __init__(self, taxonomy: Dict[str, List[str]], aliases: Dict[str, str], cache_size: int = 8192):
+        self.categories: Tuple[str, ...] = tuple(taxonomy)
+        self.skills_by_category: Dict[str, frozenset] = {cat: frozenset(skills) for cat, skills in taxonomy.items()}
+        self.all_skills = frozenset().union(*self.skills_by_category.values())
+
+        # Reverse map keeps taxonomy order, so the first entry is the primary category
+        categories_of: Dict[str, List[str]] = {}
+        for category, skills in taxonomy.items():
+            for skill in skills:
+                if category not in categories_of.setdefault(skill, []):
+                    categories_of[skill].append(category)
+        self.categories_of: Dict[str, Tuple[str, ...]] = {s: tuple(c) for s, c in categories_of.items()}
+
+        # Canonical skills map to themselves; explicit aliases win
+        self.aliases: Dict[str, str] = {skill: skill for skill in self.all_skills}
+        self.aliases.update(aliases)
+
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, skill_name: str) -> str:
+        if not skill_name:
+            return ""
+        cleaned = skill_name.strip().lower()
+        return self.aliases.get(cleaned, cleaned)
+
+    def category(self, skill_name: str) -> str:
+        """
+        Primary category of a (raw or normalized) skill, "other" if unknown.
+        """
+        cats = self.categories_of.get(self.normalize(skill_name))
+        return cats[0] if cats else "other"
+
+    def in_category(self, skill: str, category: str) -> bool:
+        return skill in self.skills_by_category.get(category, ())
+
+    def shared_category(self, skill_a: str, skill_b: str) -> Optional[str]:
+        """
+        First category (taxonomy order) listing both normalized skills, if any.
+        """
+        for category in self.categories_of.get(skill_a, ()):
+            if skill_b in self.skills_by_category[category]:
+                return category
+        return None
+
+# Built once at import; shared by the scorers and extraction agents
+TAXONOMY_INDEX = TaxonomyIndex(IT_TAXONOMY, NORMALIZATION_MAP)
+
 def normalize_skill(skill_name: str) -> str:
     """
     Normalizes an IT skill name to its canonical form using the NORMALIZATION_MAP.
     Falls back to lowercase/cleaned string if not in map.
     """
-    if not skill_name:
-        return ""
-    
-    # 1. Basic Cleaning
-    cleaned = skill_name.strip().lower()
-    
-    # 2. Check direct map
-    if cleaned in NORMALIZATION_MAP:
-        return NORMALIZATION_MAP[cleaned]
-    
-    # 3. Fuzzy match / Pattern match for common variations
-    # Example: "react.js" -> "react" (if not in map)
-    # But since we have a comprehensive map, we can rely on it mostly.
-    
-    # 4. Canonical lookup (case-insensitive)
-    for category, skills in IT_TAXONOMY.items():
-        if cleaned in skills:
-            return cleaned
-            
-    return cleaned
+    return TAXONOMY_INDEX.normalize(skill_name)
 
 def get_skill_category(skill_name: str) -> str:
     """
     Returns the category for a given normalized skill.
     """
-    normalized = normalize_skill(skill_name)
-    for category, skills in IT_TAXONOMY.items():
-        if normalized in skills:
-            return category
-    return "other"
+    return TAXONOMY_INDEX.category(skill_name)
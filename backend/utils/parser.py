@@ -1,62 +1,414 @@
-import pdfplumber
-import docx
-import fitz  # PyMuPDF
 import io
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple, Optional
+from .engines import ENGINES
+from .text_cache import TextCache, text_cache_from_env
+from .metrics import DOCUMENT_PAGES, EXTRACTION_SECONDS
+from . import sandbox
+from .sandbox import sandbox_from_env
+from .preflight import PREFLIGHT_RESULTS, DocumentRejected, preflight
+from .schemas import DocumentPreflight
+from .workers import count_in_parent
 
-def extract_text_from_pdf(file_stream):
+# Bump whenever extraction output changes, so cached text from older parsers is not reused
+PARSER_VERSION = "4"
+
+# PDF engine selection (see extract_pdf)
+PDF_ENGINES = ("auto", "pymupdf", "pdfplumber")
+PDF_ENGINE = os.getenv("MATCHLY_PDF_ENGINE", "auto").lower()
+LAYOUT_THRESHOLD = float(os.getenv("MATCHLY_PDF_LAYOUT_THRESHOLD", "0.3"))
+
+# Long PDFs: extraction limits (0 = unlimited) and page-parallel extraction (see _extract_pages)
+PDF_MAX_PAGES = int(os.getenv("MATCHLY_PDF_MAX_PAGES", "40"))
+PDF_MAX_CHARS = int(os.getenv("MATCHLY_PDF_MAX_CHARS", "20000"))
+PAGE_WORKERS = int(os.getenv("MATCHLY_PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARALLEL_MIN_PAGES = int(os.getenv("MATCHLY_PDF_PARALLEL_MIN_PAGES", "8"))
+_PAGE_EXECUTOR = None
+_PAGE_EXECUTOR_LOCK = threading.Lock()
+
+# PDF/DOCX parsing runs in resource-limited subprocesses (MATCHLY_SANDBOX, see utils.sandbox)
+SANDBOX = sandbox_from_env()
+
+# Extracted text keyed by SHA-256 of the uploaded bytes (see utils.text_cache)
+TEXT_CACHE = text_cache_from_env()
+count_in_parent("text_cache", lambda: TEXT_CACHE)
+
+# Parser backends are imported on first use (see utils.engines)
+def _load_pdfplumber():
+    import pdfplumber
+    return pdfplumber
+
+def _load_pymupdf():
+    import fitz  # PyMuPDF
+    return fitz
+
+def _load_docx():
+    import docx
+    return docx
+
+ENGINES.register("pdfplumber", _load_pdfplumber)
+ENGINES.register("pymupdf", _load_pymupdf)
+ENGINES.register("python-docx", _load_docx)
+
+class ExtractionReport(NamedTuple):
     """
-    Extract text from PDF using pdfplumber (primary) and PyMuPDF (fallback/supplement).
-    file_stream: bytes or file-like object.
+    What extracting one document did. engine: pymupdf | pdfplumber | docx-xml | plain | cache | none.
+    """
+    text: str
+    engine: str
+    seconds: float
+    pages: int = 0
+    layout_score: float = 0.0
+    truncated: bool = False # Stopped at the PDF page cap or character budget
+    total_pages: int = 0
+    preflight: Optional[DocumentPreflight] = None
+
+def layout_score(lines) -> float:
+    """
+    Share of a page's text (by characters) on lines that sit side by side with another
+    line: ~0 for single-column resumes, high for multi-column layouts and tables.
+    lines: (x0, y0, x1, y1, chars) per text line.
     """
-    text = ""
+    lines = sorted(lines, key=lambda line: line[1])
+    total = sum(line[4] for line in lines)
+    if not total:
+        return 0.0
+    side_by_side = set()
+    for i, a in enumerate(lines):
+        for j in range(i + 1, len(lines)):
+            b = lines[j]
+            if b[1] >= a[3]:
+                break # Sorted by top edge: no later line overlaps a vertically
+            overlap = min(a[3], b[3]) - b[1]
+            if overlap > 0.5 * min(a[3] - a[1], b[3] - b[1]) and (a[2] <= b[0] or b[2] <= a[0]):
+                side_by_side.update((i, j))
+    return sum(lines[i][4] for i in side_by_side) / total
+
+def _pymupdf_pages(data: bytes, first: int, last: int, budget: int):
+    # (text, layout score) per page in [first, last); the text is exactly page.get_text(),
+    # rebuilt from the line boxes the layout score needs
+    fitz = ENGINES.get("pymupdf")
+    pages, chars = [], 0
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for number in range(first, min(last, doc.page_count)):
+            parts, lines = [], []
+            for block in doc[number].get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+                for line in block.get("lines", ()):
+                    line_text = "".join(span["text"] for span in line["spans"])
+                    parts.append(line_text + "\n")
+                    if line_text.strip():
+                        lines.append((*line["bbox"], len(line_text)))
+            page_text = "".join(parts)
+            pages.append((page_text, layout_score(lines)))
+            chars += len(page_text)
+            if budget and chars >= budget:
+                break
+    return pages
+
+def _pdfplumber_pages(data: bytes, first: int, last: int, budget: int):
+    pdfplumber = ENGINES.get("pdfplumber")
+    pages, chars = [], 0
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[first:last]:
+            # extract_text() returns None for pages without a text layer
+            page_text = page.extract_text() or ""
+            pages.append((page_text, 0.0))
+            chars += len(page_text)
+            if budget and chars >= budget:
+                break
+    return pages
+
+def _extract_page_range(engine: str, data: bytes, first: int, last: int, budget: int):
+    # Top-level so it can run on PAGE_POOL workers
+    return (_pymupdf_pages if engine == "pymupdf" else _pdfplumber_pages)(data, first, last, budget)
+
+def _page_range_task(engine: str, data: bytes, first: int, last: int, budget: int, cpu_seconds: float):
+    # Runs on PAGE_POOL workers: each range gets what is left of the sandboxed task's CPU
+    # budget (0 = unlimited), and reports the CPU it used so the task is charged for it
+    if sandbox.resource is not None:
+        sandbox.limit_cpu(cpu_seconds)
+    started = time.process_time()
+    pages = _extract_page_range(engine, data, first, last, budget)
+    return pages, time.process_time() - started
+
+def _page_count(engine: str, data: bytes) -> int:
+    if engine == "pymupdf":
+        with ENGINES.get("pymupdf").open(stream=data, filetype="pdf") as doc:
+            return doc.page_count
+    with ENGINES.get("pdfplumber").open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+def _page_executor() -> ProcessPoolExecutor:
+    # Created on first long document, so short uploads never spawn workers
+    global _PAGE_EXECUTOR
+    if _PAGE_EXECUTOR is None:
+        with _PAGE_EXECUTOR_LOCK:
+            if _PAGE_EXECUTOR is None:
+                # Not fork: a forked child could inherit an ENGINES load lock held by another thread
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _PAGE_EXECUTOR = ProcessPoolExecutor(max_workers=PAGE_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _PAGE_EXECUTOR
+
+def _discard_page_executor(executor: ProcessPoolExecutor):
+    # A broken pool stays broken: the next long document starts a new one
+    global _PAGE_EXECUTOR
+    with _PAGE_EXECUTOR_LOCK:
+        if _PAGE_EXECUTOR is executor:
+            _PAGE_EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _within_budget(pages, budget: int):
+    # Keeps pages up to and including the one on which the character budget is reached
+    if not budget:
+        return pages
+    kept, chars = [], 0
+    for page in pages:
+        kept.append(page)
+        chars += len(page[0])
+        if chars >= budget:
+            break
+    return kept
+
+def _extract_pages(engine: str, data: bytes):
+    """
+    (text, layout score) per page, in order, up to PDF_MAX_PAGES and PDF_MAX_CHARS.
+    Documents of at least PARALLEL_MIN_PAGES pages are split into one page range per
+    PAGE_POOL worker; each worker opens the same document bytes and stops at the
+    character budget on its own. Ranges are collected in page order and pages
+    after the one that reaches the budget are dropped. In a sandbox worker each
+    range is capped at the task's remaining CPU and the CPU the ranges used is
+    charged to the task. If the pool breaks, the document is extracted serially
+    and the pool is replaced for the next one.
+    Returns (pages, total page count).
+    """
+    total = _page_count(engine, data)
+    last = min(total, PDF_MAX_PAGES) if PDF_MAX_PAGES else total
+    # Daemonic processes (e.g. the CLI's worker pool) cannot start a pool of their own;
+    # sandbox workers are not daemonic, so server extraction uses the pool
+    if PAGE_WORKERS <= 1 or last < PARALLEL_MIN_PAGES or multiprocessing.current_process().daemon:
+        return _extract_page_range(engine, data, 0, last, PDF_MAX_CHARS), total
+
+    step = -(-last // PAGE_WORKERS)
+    cpu_budget = sandbox.task_cpu_remaining()
+    executor = None
     try:
-        # Try pdfplumber first for better layout preservation often
-        with pdfplumber.open(file_stream) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"pdfplumber failed: {e}, trying PyMuPDF")
+        # Page workers (and their forkserver) must not inherit the task's CPU limit
+        # as a lifetime cap: they get the remaining budget per range instead
+        with sandbox.cpu_unlimited():
+            executor = _page_executor()
+            futures = [executor.submit(_page_range_task, engine, data, first, min(first + step, last), PDF_MAX_CHARS, cpu_budget)
+                       for first in range(0, last, step)]
+        ranges = [future.result() for future in futures]
+    except BrokenProcessPool as e:
+        # A page worker died (CPU limit, crash): this document is extracted serially,
+        # within what is left of the task's own limits
+        print(f"Page pool failed ({e}), extracting serially")
+        if executor is not None:
+            _discard_page_executor(executor)
+        return _extract_page_range(engine, data, 0, last, PDF_MAX_CHARS), total
+    sandbox.charge_cpu(sum(cpu for _, cpu in ranges))
+    pages = [page for range_pages, _ in ranges for page in range_pages]
+    return _within_budget(pages, PDF_MAX_CHARS), total
+
+def extract_pdf(file_stream, engine: Optional[str] = None) -> ExtractionReport:
+    """
+    Extract text from a PDF with the selected engine (default MATCHLY_PDF_ENGINE):
+      pymupdf    - fast, reads blocks in content order
+      pdfplumber - slower, layout-aware line assembly
+      auto       - PyMuPDF, re-extracted with pdfplumber only when the layout score
+                   (multi-column text, tables) reaches MATCHLY_PDF_LAYOUT_THRESHOLD
+    Either engine falls back to the other when it fails; in auto mode a failed
+    pdfplumber pass keeps the PyMuPDF text. Extraction stops at
+    MATCHLY_PDF_MAX_PAGES pages or after the page that reaches MATCHLY_PDF_MAX_CHARS
+    characters. Never raises: a failed document has empty text and engine "none".
+    file_stream: bytes or file-like object.
+    """
+    engine = (engine or PDF_ENGINE).lower()
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown PDF engine {engine!r}, expected one of {', '.join(PDF_ENGINES)}")
+    data = file_stream if isinstance(file_stream, (bytes, bytearray)) else file_stream.read()
+    started = time.perf_counter()
+    score = 0.0
+    deferred = None # PyMuPDF's result while pdfplumber re-extracts a complex layout
+    order = ["pdfplumber", "pymupdf"] if engine == "pdfplumber" else ["pymupdf", "pdfplumber"]
+    for name in order:
         try:
-            # RESET stream if needed, but pdfplumber might not consume it fully if it failed? 
-            # Safest to rely on passed bytes. If stream, seek 0.
-             if hasattr(file_stream, 'seek'):
-                file_stream.seek(0)
-             
-             with fitz.open(stream=file_stream.read(), filetype="pdf") as doc:
-                for page in doc:
-                    text += page.get_text() + "\n"
-        except Exception as e2:
-            print(f"PyMuPDF also failed: {e2}")
-            return ""
-            
-    return text
+            pages, total = _extract_pages(name, data)
+        except Exception as e:
+            print(f"{name} failed: {e}")
+            continue
+        text = "\n".join(text for text, _ in pages) + "\n" if pages else ""
+        if name == "pymupdf":
+            chars = sum(len(text) for text, _ in pages)
+            score = sum(s * len(text) for text, s in pages) / chars if chars else 0.0
+            if engine == "auto" and score >= LAYOUT_THRESHOLD and ENGINES.available("pdfplumber"):
+                deferred = (text, len(pages), total) # Complex layout: worth pdfplumber's cost
+                continue
+        return ExtractionReport(text, name, time.perf_counter() - started, len(pages), score, len(pages) < total, total)
+    if deferred:
+        # pdfplumber failed on the re-extraction: PyMuPDF's reading order beats no text
+        text, count, total = deferred
+        return ExtractionReport(text, "pymupdf", time.perf_counter() - started, count, score, count < total, total)
+    return ExtractionReport("", "none", time.perf_counter() - started)
+
+def extract_text_from_pdf(file_stream):
+    """
+    Extract text from PDF (see extract_pdf for the engine selection).
+    file_stream: bytes or file-like object.
+    """
+    return extract_pdf(file_stream).text
+
+# WordprocessingML elements read by the streaming DOCX extractor
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+def _docx_part_paragraphs(stream):
+    """
+    Paragraph texts of one WordprocessingML part, in document order, read with
+    iterparse: body, table cells and text boxes alike. Finished body-level
+    elements are cleared, so memory stays bounded by the largest paragraph/table.
+    """
+    paragraphs = [] # Open paragraphs; text boxes nest a paragraph inside another
+    in_run = fallback = depth = 0
+    container, container_depth = None, 0
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            depth += 1
+            if tag == _W + "p":
+                paragraphs.append([])
+            elif tag == _W + "r":
+                in_run += 1
+            elif tag == _MC_FALLBACK:
+                fallback += 1 # Legacy (VML) copy of a text box already read from mc:Choice
+            elif tag in (_W + "body", _W + "hdr", _W + "ftr"):
+                container, container_depth = elem, depth
+            continue
+
+        depth -= 1
+        if tag == _W + "p":
+            text = "".join(paragraphs.pop())
+            if not fallback:
+                yield text
+        elif tag == _W + "r":
+            in_run -= 1
+        elif tag == _MC_FALLBACK:
+            fallback -= 1
+        elif paragraphs and in_run and not fallback:
+            if tag == _W + "t":
+                paragraphs[-1].append(elem.text or "")
+            elif tag == _W + "br":
+                if elem.get(_W + "type", "textWrapping") == "textWrapping":
+                    paragraphs[-1].append("\n")
+            elif tag in _RUN_TEXT:
+                paragraphs[-1].append(_RUN_TEXT[tag])
+        if container is not None and depth == container_depth:
+            container.clear()
 
 def extract_text_from_docx(file_stream):
     """
-    Extract text from DOCX using python-docx.
+    Extract text from DOCX by streaming its XML parts: headers, then the body
+    (paragraphs, tables, text boxes), then footers, one paragraph per line.
+    Falls back to python-docx (body paragraphs only) if the package cannot be streamed.
     file_stream: bytes or file-like object.
     """
+    if isinstance(file_stream, (bytes, bytearray)):
+        file_stream = io.BytesIO(file_stream)
+    try:
+        with zipfile.ZipFile(file_stream) as package:
+            names = package.namelist()
+            headers = sorted(n for n in names if n.startswith("word/header") and n.endswith(".xml"))
+            footers = sorted(n for n in names if n.startswith("word/footer") and n.endswith(".xml"))
+            parts, seen = [], set()
+            for name in headers + ["word/document.xml"] + footers:
+                with package.open(name) as part:
+                    part_text = "\n".join(_docx_part_paragraphs(part))
+                # First-page/even-page headers often repeat the default one
+                if name == "word/document.xml" or (part_text.strip() and part_text not in seen):
+                    parts.append(part_text)
+                    seen.add(part_text)
+            return "\n".join(parts)
+    except Exception as e:
+        print(f"Streaming DOCX extraction failed: {e}, trying python-docx")
     try:
+        if hasattr(file_stream, 'seek'):
+            file_stream.seek(0)
+        docx = ENGINES.get("python-docx")
         doc = docx.Document(file_stream)
-        text = []
-        for para in doc.paragraphs:
-            text.append(para.text)
-        return "\n".join(text)
+        return "\n".join(para.text for para in doc.paragraphs)
     except Exception as e:
         print(f"Error reading DOCX: {e}")
         return ""
 
-def extract_text(file_content, filename):
+def _parse(kind: str, file_content: bytes) -> ExtractionReport:
+    # The part of extraction that runs in the sandbox: preflight, then the full parse
+    # only for documents that can produce text
+    started = time.perf_counter()
+    check = preflight(kind, file_content)
+    if not check.parseable:
+        return ExtractionReport("", "preflight", time.perf_counter() - started, preflight=check)
+    if kind == "pdf":
+        report = extract_pdf(file_content)
+    else:
+        report = ExtractionReport(extract_text_from_docx(io.BytesIO(file_content)), "docx-xml", 0.0)
+    return report._replace(seconds=time.perf_counter() - started, preflight=check)
+
+def extract_document(file_content, filename) -> ExtractionReport:
     """
-    Unified extractor based on file extension.
+    Unified extractor based on file extension, reporting the engine that ran and its time.
+    Results are cached by content hash, so re-uploads of the same document skip parsing.
+    PDF/DOCX parsing runs in SANDBOX when enabled and raises ExtractionLimitExceeded
+    when the document hits its limits. A preflight check runs first and raises
+    DocumentRejected for image-only, encrypted, oversized or empty documents.
     file_content: bytes
     filename: str
     """
-    file_stream = io.BytesIO(file_content)
-    
+    started = time.perf_counter()
     if filename.lower().endswith('.pdf'):
-        return extract_text_from_pdf(file_stream)
+        kind, version = "pdf", f"{PARSER_VERSION}:{PDF_ENGINE}:{PDF_MAX_PAGES}:{PDF_MAX_CHARS}"
     elif filename.lower().endswith('.docx'):
-        return extract_text_from_docx(file_stream)
+        kind, version = "docx", PARSER_VERSION
+    elif filename.lower().endswith('.txt'):
+        # Plain text needs no parsing (and no cache)
+        return ExtractionReport(file_content.decode("utf-8", errors="replace"), "plain", time.perf_counter() - started)
     else:
-        return ""
+        return ExtractionReport("", "none", 0.0)
+
+    key = TextCache.key(file_content, kind, version)
+    cached = TEXT_CACHE.get(key)
+    if cached is not None:
+        return ExtractionReport(cached, "cache", time.perf_counter() - started)
+
+    # Daemonic processes (e.g. the CLI's worker pool) cannot start sandbox workers,
+    # and sandbox workers parse directly
+    if SANDBOX is not None and not sandbox.IN_WORKER and not multiprocessing.current_process().daemon:
+        report = SANDBOX.run(_parse, kind, file_content)
+    else:
+        report = _parse(kind, file_content)
+    EXTRACTION_SECONDS.observe(report.seconds, kind, report.engine)
+    if report.total_pages:
+        DOCUMENT_PAGES.observe(report.total_pages)
+    if report.preflight is not None:
+        PREFLIGHT_RESULTS.inc(kind, report.preflight.status)
+        if not report.preflight.parseable:
+            raise DocumentRejected(report.preflight)
+    if report.text:
+        # Failures are not cached: they may come from a missing engine rather than the document
+        TEXT_CACHE.put(key, report.text)
+    return report
+
+def extract_text(file_content, filename):
+    """
+    Text of an uploaded document (see extract_document).
+    file_content: bytes
+    filename: str
+    """
+    return extract_document(file_content, filename).text
@@ -0,0 +1,175 @@
+import io
+import os
+import struct
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from .engines import ENGINES
+from .metrics import METRICS
+from .schemas import DocumentPreflight
+
+PREFLIGHT_RESULTS = METRICS.counter("matchly_preflight_total", "Document preflight classifications.", ("format", "status"))
+
+# A page/part with at least this much text counts as having a text layer
+PREFLIGHT_MIN_CHARS = int(os.getenv("MATCHLY_PREFLIGHT_MIN_CHARS", "20"))
+# PDF pages sampled for text density; a scanned CV has no text on any of them
+PREFLIGHT_PAGES = 2
+PREFLIGHT_MAX_PAGES = int(os.getenv("MATCHLY_PREFLIGHT_MAX_PAGES", "100"))
+# Uncompressed size of all DOCX parts (zip bombs)
+PREFLIGHT_MAX_UNZIPPED_MB = int(os.getenv("MATCHLY_PREFLIGHT_MAX_UNZIPPED_MB", "50"))
+
+# Password-protected Office documents are OLE compound files, not zip packages; so are
+# legacy Word 97-2003 (.doc) files, told apart by the streams in the OLE directory
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+OLE_ENCRYPTION_STREAMS = frozenset({"EncryptionInfo", "EncryptedPackage"})
+_OLE_END_OF_CHAIN = 0xFFFFFFFE
+_W_T = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t"
+
+class DocumentRejected(Exception):
+    """Raised when preflight shows a document cannot produce useful text."""
+    def __init__(self, preflight: DocumentPreflight):
+        super().__init__(preflight)
+        self.preflight = preflight
+
+    def __str__(self):
+        return f"Document rejected by preflight: {self.preflight.status} ({self.preflight.reason})"
+
+def _ole_stream_names(data: bytes) -> set:
+    """
+    Names in the directory of an OLE compound file (MS-CFB): the FAT is read from
+    the header DIFAT (plus DIFAT sectors), then the directory sector chain.
+    """
+    shift = struct.unpack_from("<H", data, 30)[0]
+    sector_size = 1 << shift
+    first_dir = struct.unpack_from("<I", data, 48)[0]
+    first_difat, difat_count = struct.unpack_from("<2I", data, 68)
+
+    def sector(n):
+        return data[(n + 1) * sector_size:(n + 2) * sector_size]
+
+    fat_sectors = list(struct.unpack_from("<109I", data, 76))
+    per_difat = sector_size // 4 - 1
+    for _ in range(difat_count):
+        if first_difat >= _OLE_END_OF_CHAIN:
+            break
+        entries = struct.unpack_from(f"<{per_difat + 1}I", sector(first_difat))
+        fat_sectors.extend(entries[:-1])
+        first_difat = entries[-1]
+    fat = []
+    for n in fat_sectors:
+        if n < _OLE_END_OF_CHAIN:
+            chunk = sector(n)
+            fat.extend(struct.unpack_from(f"<{len(chunk) // 4}I", chunk))
+
+    names, current, seen = set(), first_dir, set()
+    while current < len(fat) and current not in seen: # seen: a corrupt FAT cannot loop forever
+        seen.add(current)
+        directory = sector(current)
+        for offset in range(0, len(directory) - 127, 128):
+            size = struct.unpack_from("<H", directory, offset + 64)[0]
+            if 2 <= size <= 64:
+                names.add(directory[offset:offset + size - 2].decode("utf-16-le", errors="replace"))
+        current = fat[current]
+    return names
+
+def preflight_ole(fmt: str, data: bytes) -> DocumentPreflight:
+    """
+    An OLE file uploaded as DOCX: encrypted only when it holds the encryption streams
+    of a password-protected OOXML package, otherwise some other (legacy) format.
+    """
+    try:
+        names = _ole_stream_names(data)
+    except (struct.error, IndexError) as e:
+        return DocumentPreflight(status="unsupported_format", format=fmt, parseable=False,
+                                 reason=f"The file is not a DOCX document (unreadable OLE container: {e}).")
+    if names & OLE_ENCRYPTION_STREAMS == OLE_ENCRYPTION_STREAMS:
+        return DocumentPreflight(status="encrypted", format=fmt, parseable=False,
+                                 reason="The document is password protected. Upload an unprotected copy.")
+    if "WordDocument" in names:
+        reason = "The file is a legacy Word 97-2003 (.doc) document. Save it as .docx or PDF and upload it again."
+    else:
+        reason = "The file is an OLE compound document, not DOCX. Save it as .docx or PDF and upload it again."
+    return DocumentPreflight(status="unsupported_format", format=fmt, parseable=False, reason=reason)
+
+def _classify_text(fmt: str, chars: int, images: int, pages: int = 0) -> DocumentPreflight:
+    if chars >= PREFLIGHT_MIN_CHARS:
+        return DocumentPreflight(status="text", format=fmt, parseable=True, pages=pages, text_chars=chars, images=images)
+    if images:
+        return DocumentPreflight(status="image_only", format=fmt, parseable=False, pages=pages, text_chars=chars, images=images,
+                                 reason="The document contains images but no text layer (scanned?). Upload a text-based PDF or DOCX.")
+    return DocumentPreflight(status="no_text", format=fmt, parseable=False, pages=pages, text_chars=chars,
+                             reason="The document contains no extractable text.")
+
+def preflight_pdf(data: bytes) -> DocumentPreflight:
+    """
+    Classifies a PDF from its metadata and the text density of its first pages (PyMuPDF only).
+    Files PyMuPDF cannot open are "unknown" and left to full extraction, which has a pdfplumber fallback.
+    """
+    try:
+        fitz = ENGINES.get("pymupdf")
+        doc = fitz.open(stream=data, filetype="pdf")
+    except Exception as e:
+        return DocumentPreflight(status="unknown", format="pdf", parseable=True, reason=f"Preflight could not open the file: {e}")
+    with doc:
+        pages = doc.page_count
+        if doc.needs_pass:
+            return DocumentPreflight(status="encrypted", format="pdf", parseable=False, pages=pages,
+                                     reason="The PDF is password protected. Upload an unprotected copy.")
+        if pages > PREFLIGHT_MAX_PAGES:
+            return DocumentPreflight(status="oversized", format="pdf", parseable=False, pages=pages,
+                                     reason=f"The PDF has {pages} pages; at most {PREFLIGHT_MAX_PAGES} are accepted.")
+        chars = images = 0
+        for number in range(min(PREFLIGHT_PAGES, pages)):
+            page = doc[number]
+            chars += len(page.get_text().strip())
+            images += len(page.get_images())
+            if chars >= PREFLIGHT_MIN_CHARS:
+                break
+    return _classify_text("pdf", chars, images, pages)
+
+def preflight_docx(data: bytes) -> DocumentPreflight:
+    """
+    Classifies a DOCX from its package: OLE (encrypted or legacy .doc), uncompressed size, and whether
+    document.xml or a header/footer has any text (streamed until the threshold is reached).
+    Packages that cannot be read are "unknown" and left to full extraction.
+    """
+    if data[:8] == OLE_MAGIC:
+        return preflight_ole("docx", data)
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as package:
+            infos = package.infolist()
+            unzipped = sum(info.file_size for info in infos)
+            if unzipped > PREFLIGHT_MAX_UNZIPPED_MB * 1024 * 1024:
+                return DocumentPreflight(status="oversized", format="docx", parseable=False,
+                                         reason=f"The document unpacks to {unzipped // (1024 * 1024)}MB; at most {PREFLIGHT_MAX_UNZIPPED_MB}MB is accepted.")
+            names = [info.filename for info in infos]
+            parts = ["word/document.xml"] + [n for n in names if n.startswith(("word/header", "word/footer")) and n.endswith(".xml")]
+            images = sum(1 for n in names if n.startswith("word/media/"))
+            chars = 0
+            for name in parts:
+                with package.open(name) as part:
+                    for _, elem in ET.iterparse(part):
+                        if elem.tag == _W_T and elem.text:
+                            chars += len(elem.text.strip())
+                            if chars >= PREFLIGHT_MIN_CHARS:
+                                return _classify_text("docx", chars, images)
+                        elem.clear()
+    except Exception as e:
+        return DocumentPreflight(status="unknown", format="docx", parseable=True, reason=f"Preflight could not read the package: {e}")
+    return _classify_text("docx", chars, images)
+
+def preflight(kind: str, data: bytes) -> DocumentPreflight:
+    """
+    Milliseconds-cheap classification run before full extraction:
+    text | image_only | encrypted | unsupported_format | oversized | no_text | unknown.
+    """
+    started = time.perf_counter()
+    if kind == "pdf":
+        result = preflight_pdf(data)
+    elif kind == "docx":
+        result = preflight_docx(data)
+    else:
+        result = _classify_text(kind, len(data.strip()), 0)
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    return result
@@ -0,0 +1,168 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+PROFILE_HEADER = "x-matchly-profile"
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a daemon thread
+    and counts collapsed stacks ("root;...;leaf"), the input format of flamegraph.pl
+    and speedscope.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="matchly-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def profiled_call(interval: float, fn, *args):
+    """
+    Runs fn(*args) under cProfile and the stack sampler, in the calling (worker) thread.
+    Returns (result, (raw pstats dict, collapsed stack counts)); both are plain data so
+    they cross process pool boundaries. On failure the pair is attached to the
+    exception as `profile_part`.
+    """
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler is active in this process (sys.monitoring, Python 3.12+): sample only
+        profile = None
+    sampler = StackSampler(threading.get_ident(), interval)
+    try:
+        with sampler:
+            result = fn(*args)
+    except Exception as e:
+        # The failing stage is usually the slow one: its profile travels with the error
+        e.profile_part = _profile_part(profile, sampler)
+        raise
+    return result, _profile_part(profile, sampler)
+
+def _profile_part(profile: Optional[cProfile.Profile], sampler: StackSampler):
+    stats = {}
+    if profile is not None:
+        profile.disable()
+        profile.create_stats()
+        stats = profile.stats
+    return stats, sampler.stacks
+
+class _RawStats:
+    # pstats.Stats accepts any object with create_stats() and .stats
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+class ProfileCapture:
+    """
+    Profile of one request: the parts returned by every profiled pool call, plus tags
+    (document hashes, stage timings) written next to it.
+    """
+    def __init__(self, interval: float):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.interval = interval
+        self.tags: Dict[str, object] = {}
+        self._stats: List[dict] = []
+        self.stacks = Counter()
+
+    def add(self, part):
+        stats, stacks = part
+        if stats:
+            self._stats.append(stats)
+        self.stacks.update(stacks)
+
+    def pstats(self) -> Optional[pstats.Stats]:
+        if not self._stats:
+            return None
+        merged = pstats.Stats(_RawStats(self._stats[0]))
+        for stats in self._stats[1:]:
+            merged.add(_RawStats(stats))
+        return merged
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class RequestProfiler:
+    """
+    Opt-in profiling of /analyze requests. Disabled unless a directory is configured;
+    then a request is profiled when it sends the X-Matchly-Profile header or is picked
+    by the sample rate. Each profile is written as <id>.prof (pstats), <id>.folded
+    (collapsed stacks) and <id>.json (tags).
+    """
+    def __init__(self, directory: Optional[str] = None, sample_rate: float = 0.0, interval: float = 0.005):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def start(self, headers) -> Optional[ProfileCapture]:
+        """
+        Returns a capture when this request should be profiled, otherwise None.
+        """
+        if not self.directory:
+            return None
+        requested = headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+        if requested or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return ProfileCapture(self.interval)
+        return None
+
+    def write(self, capture: ProfileCapture) -> List[str]:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, capture.id)
+        paths = []
+        stats = capture.pstats()
+        if stats is not None:
+            stats.dump_stats(base + ".prof")
+            paths.append(base + ".prof")
+        with open(base + ".folded", "w") as handle:
+            handle.write(capture.collapsed())
+        paths.append(base + ".folded")
+        with open(base + ".json", "w") as handle:
+            json.dump({"id": capture.id, "sample_interval_ms": capture.interval * 1000,
+                       "samples": sum(capture.stacks.values()), **capture.tags}, handle, indent=2)
+        paths.append(base + ".json")
+        return paths
+
+def profiler_from_env() -> RequestProfiler:
+    """
+    MATCHLY_PROFILE_DIR (enables profiling), MATCHLY_PROFILE_SAMPLE_RATE (0-1),
+    MATCHLY_PROFILE_INTERVAL_MS (stack sampling interval).
+    """
+    return RequestProfiler(
+        directory=os.getenv("MATCHLY_PROFILE_DIR") or None,
+        sample_rate=float(os.getenv("MATCHLY_PROFILE_SAMPLE_RATE", "0")),
+        interval=float(os.getenv("MATCHLY_PROFILE_INTERVAL_MS", "5")) / 1000
+    )
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+import numpy as np
+
+from .schemas import ParsedJobDescription
+from .normalizer import TAXONOMY_INDEX
+from .skill_proximity import SKILL_PROXIMITY
+from .fingerprint import SkillFingerprint, fingerprint
+from .extraction_engine import JDAgent
+from .workers import count_in_parent
+
+# IT weights: Skills (35%), Responsibilities (25%), Exp (20%), Stacks (10%), ATS Coverage (10%)
+IT_WEIGHTS = MappingProxyType({
+    "skills": 35,
+    "resp": 25,
+    "exp": 20,
+    "stacks": 10,
+    "ats": 10
+})
+
+@dataclass(frozen=True)
+class RequirementPlan:
+    """
+    A job description compiled once into everything advanced_match needs that
+    does not depend on the resume: normalized requirements (+ proximity ids),
+    per-requirement point weights, ATS keyword sets and fingerprint, responsibilities text and
+    required years. Scoring another resume against the same JD reuses it as-is.
+    """
+    jd: ParsedJobDescription
+    required_raw: Tuple[str, ...]
+    required: Tuple[str, ...]
+    stack_raw: Tuple[str, ...]
+    stack: Tuple[str, ...]
+    ats_keywords: Tuple[str, ...]
+    ats_keyword_set: frozenset
+    responsibilities_text: str
+    required_years: int
+    weights: Mapping[str, int] = field(default_factory=lambda: dict(IT_WEIGHTS))
+    required_ids: np.ndarray = field(default=None, repr=False, compare=False)
+    stack_ids: np.ndarray = field(default=None, repr=False, compare=False)
+    ats_fingerprint: SkillFingerprint = field(default=None, repr=False, compare=False)
+
+    @property
+    def points_per_skill(self) -> float:
+        return self.weights["skills"] / len(self.required) if self.required else 0.0
+
+    @property
+    def points_per_stack(self) -> float:
+        return self.weights["stacks"] / len(self.stack) if self.stack else 0.0
+
+def _read_only_ids(skills: Tuple[str, ...]) -> np.ndarray:
+    ids = SKILL_PROXIMITY.to_ids(skills)
+    ids.setflags(write=False)
+    return ids
+
+def compile_plan(jd: ParsedJobDescription) -> RequirementPlan:
+    normalize = TAXONOMY_INDEX.normalize
+    required = tuple(normalize(r) for r in jd.required_skills)
+    # Deduplicated once here; the order is then fixed for every resume scored against this plan
+    stack_raw = tuple(set(jd.frameworks_and_tools + jd.databases + jd.cloud_platforms))
+    stack = tuple(normalize(s) for s in stack_raw)
+    ats_keywords = tuple(normalize(kw) for kw in jd.ats_keywords)
+
+    return RequirementPlan(
+        jd=jd,
+        required_raw=tuple(jd.required_skills),
+        required=required,
+        stack_raw=stack_raw,
+        stack=stack,
+        ats_keywords=ats_keywords,
+        ats_keyword_set=frozenset(ats_keywords),
+        responsibilities_text=" ".join(jd.responsibilities),
+        required_years=jd.minimum_experience_years or 2,
+        required_ids=_read_only_ids(required),
+        stack_ids=_read_only_ids(stack),
+        ats_fingerprint=fingerprint(ats_keywords)
+    )
+
+class RequirementPlanCache:
+    """
+    Bounded LRU of compiled plans keyed by the hash of the normalized JD text.
+    JDAgent only looks at the lowercased text, so that is the normalization used.
+    """
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(jd_text: str) -> str:
+        return hashlib.sha256(jd_text.lower().encode("utf-8")).hexdigest()
+
+    def get_or_compile(self, jd_text: str) -> RequirementPlan:
+        key = self.key(jd_text)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = compile_plan(JDAgent().run(jd_text))
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def counters(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def add_counters(self, counts: dict):
+        # Counts recorded by another process's copy of this cache (see utils.workers)
+        with self._lock:
+            self.hits += counts.get("hits", 0)
+            self.misses += counts.get("misses", 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._plans)}
+
+PLAN_CACHE = RequirementPlanCache(int(os.getenv("MATCHLY_PLAN_CACHE_SIZE", "128")))
+count_in_parent("jd_plans", lambda: PLAN_CACHE)
+
+def compile_jd_text(jd_text: str) -> RequirementPlan:
+    """
+    Parses (JDAgent) and compiles a JD, reusing the cached plan for a JD seen before.
+    """
+    return PLAN_CACHE.get_or_compile(jd_text)
@@ -0,0 +1,353 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .schemas import ParsedResume
+from .skill_proximity import SKILL_PROXIMITY
+from .fingerprint import SkillFingerprint, resume_fingerprint
+from .requirement_plan import RequirementPlan
+from .advanced_scorer import advanced_match, advanced_match_many
+from . import scorer
+
+MATCH_THRESHOLD = 0.65
+STRONG_THRESHOLD = 0.85
+# advanced_match lifts a partial skill match by 10% when its evidence comes from experience/projects
+EVIDENCE_BOOST = 1.1
+# Candidates fully scored per advanced_match_many call
+SCORING_BLOCK = 32
+
+class ResumeCorpus:
+    """
+    Persistent store of parsed resumes with a skill -> posting-list inverted index.
+
+    SQLite holds the parsed resumes (compressed JSON without raw text, plus their
+    skill fingerprint so scoring does not rebuild it) and the postings; on open they are loaded into memory as numpy arrays. `rank` returns
+    the top-k resumes for a compiled JD with advanced_match scores:
+      - experience and ATS coverage are computed exactly for every resume from the
+        arrays / postings,
+      - skill and stack points get a per-resume upper bound from the postings of
+        every corpus term that can match a requirement; responsibility overlap is
+        bounded by its weight (a cosine is at most 1),
+      - resumes are then taken in decreasing bound order, a block at a time: the
+        responsibility bound is replaced by the exact overlap (once per distinct
+        text), and the rows that can still reach the current k-th score are fully
+        scored (advanced_match_many), stopping once no remaining bound can.
+    """
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS resumes (
+                id INTEGER PRIMARY KEY,
+                label TEXT NOT NULL,
+                content_hash TEXT UNIQUE NOT NULL,
+                years REAL NOT NULL,
+                exp_text TEXT NOT NULL,
+                parsed BLOB NOT NULL,
+                created REAL NOT NULL,
+                fingerprint BLOB
+            );
+            CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS postings (
+                term_id INTEGER NOT NULL,
+                resume_id INTEGER NOT NULL,
+                PRIMARY KEY (term_id, resume_id)
+            ) WITHOUT ROWID;
+        """)
+        if "fingerprint" not in {column[1] for column in self._db.execute("PRAGMA table_info(resumes)")}:
+            # Corpus files from before fingerprints: those rows get theirs rebuilt when loaded
+            self._db.execute("ALTER TABLE resumes ADD COLUMN fingerprint BLOB")
+        self._db.commit()
+
+        # Row-aligned arrays (row = position in insertion order)
+        self._ids: List[int] = []
+        self._labels: List[str] = []
+        self._years: List[float] = []
+        self._exp_group: List[int] = []
+        self._hashes: Dict[str, int] = {}
+        # Distinct responsibility texts; their TF-IDF overlap is computed once per text
+        self._exp_texts: List[str] = []
+        self._exp_text_ids: Dict[str, int] = {}
+        self._exp_terms: Dict[int, Counter] = {} # Lemmatized term counts
+        # Inverted index over normalized skill names
+        self._terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._postings: List[List[int]] = []
+        self._arrays = None
+        self._load()
+
+    def _load(self):
+        rows = {}
+        for resume_id, label, content_hash, years, exp_text in self._db.execute(
+            "SELECT id, label, content_hash, years, exp_text FROM resumes ORDER BY id"
+        ):
+            rows[resume_id] = self._append_row(resume_id, label, content_hash, years, exp_text)
+        db_terms = {}
+        for term_id, term in self._db.execute("SELECT id, term FROM terms"):
+            db_terms[term_id] = self._term_index(term)
+        for term_id, resume_id in self._db.execute("SELECT term_id, resume_id FROM postings ORDER BY resume_id"):
+            self._postings[db_terms[term_id]].append(rows[resume_id])
+
+    def _append_row(self, resume_id, label, content_hash, years, exp_text) -> int:
+        row = len(self._ids)
+        self._ids.append(resume_id)
+        self._labels.append(label)
+        self._years.append(years)
+        self._hashes[content_hash] = resume_id
+        group = self._exp_text_ids.get(exp_text)
+        if group is None:
+            group = self._exp_text_ids[exp_text] = len(self._exp_texts)
+            self._exp_texts.append(exp_text)
+        self._exp_group.append(group)
+        return row
+
+    def _term_index(self, term: str) -> int:
+        index = self._term_ids.get(term)
+        if index is None:
+            index = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+            self._postings.append([])
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def content_hash(resume: ParsedResume) -> str:
+        return hashlib.sha256(resume.raw_text.encode("utf-8")).hexdigest()
+
+    def add(self, resume: ParsedResume, label: str = "") -> int:
+        """
+        Stores a parsed resume and indexes its normalized skills. Re-adding the same
+        resume text returns the existing id.
+        """
+        content_hash = self.content_hash(resume)
+        # Exactly what advanced_match derives from the resume
+        skills_fingerprint = resume_fingerprint(resume)
+        skills = sorted(skills_fingerprint.skills())
+        years = resume.total_experience_years or 0
+        exp_text = " ".join([" ".join(e.technical_responsibilities) for e in resume.experience])
+        payload = zlib.compress(resume.json(exclude={"raw_text"}).encode("utf-8"))
+
+        with self._lock:
+            existing = self._hashes.get(content_hash)
+            if existing is not None:
+                return existing
+            cursor = self._db.execute(
+                "INSERT INTO resumes (label, content_hash, years, exp_text, parsed, created, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (label, content_hash, years, exp_text, payload, time.time(), skills_fingerprint.to_bytes())
+            )
+            resume_id = cursor.lastrowid
+            for skill in skills:
+                self._db.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (skill,))
+            self._db.executemany(
+                "INSERT INTO postings (term_id, resume_id) SELECT id, ? FROM terms WHERE term = ?",
+                [(resume_id, skill) for skill in skills]
+            )
+            self._db.commit()
+
+            row = self._append_row(resume_id, label, content_hash, years, exp_text)
+            for skill in skills:
+                self._postings[self._term_index(skill)].append(row)
+            self._arrays = None
+            return resume_id
+
+    @staticmethod
+    def _resume(parsed: bytes, stored_fingerprint: Optional[bytes]) -> ParsedResume:
+        resume = ParsedResume(**json.loads(zlib.decompress(parsed)))
+        if stored_fingerprint is not None:
+            try:
+                resume._fingerprint = SkillFingerprint.from_bytes(stored_fingerprint)
+            except ValueError:
+                pass # Stored under another skill vocabulary: rebuilt on first use
+        return resume
+
+    def get(self, resume_id: int) -> Optional[ParsedResume]:
+        with self._lock:
+            found = self._db.execute("SELECT parsed, fingerprint FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        if found is None:
+            return None
+        return self._resume(*found)
+
+    def get_many(self, resume_ids: List[int]) -> List[ParsedResume]:
+        with self._lock:
+            placeholders = ",".join("?" * len(resume_ids))
+            found = {row[0]: row[1:] for row in self._db.execute(
+                f"SELECT id, parsed, fingerprint FROM resumes WHERE id IN ({placeholders})", resume_ids
+            )}
+        return [self._resume(*found[i]) for i in resume_ids]
+
+    def _snapshot(self):
+        # Caller holds the lock; numpy views are rebuilt only after new resumes were added
+        if self._arrays is None:
+            self._arrays = {
+                "years": np.asarray(self._years, dtype=np.float64),
+                "exp_group": np.asarray(self._exp_group, dtype=np.intp),
+                "postings": [np.asarray(p, dtype=np.intp) for p in self._postings],
+                "terms": tuple(self._terms),
+                "ids": list(self._ids),
+                "labels": list(self._labels),
+                "exp_texts": list(self._exp_texts),
+            }
+        return self._arrays
+
+    def _requirement_bounds(self, arrays, requirements, points_per: float, boost: float) -> np.ndarray:
+        """
+        Per resume upper bound of the points advanced_match can award for `requirements`:
+        each requirement is worth at most what its best matching corpus term gives.
+        """
+        bound = np.zeros(len(arrays["years"]), dtype=np.float64)
+        terms = arrays["terms"]
+        if not requirements or not terms:
+            return bound
+        conf = SKILL_PROXIMITY.scores(list(requirements), list(terms))
+        best = np.zeros_like(bound)
+        for row in conf:
+            matching = np.flatnonzero(row >= MATCH_THRESHOLD)
+            if not len(matching):
+                continue
+            scores = row[matching]
+            gains = np.where(
+                scores >= STRONG_THRESHOLD,
+                points_per,
+                np.minimum(points_per, points_per * np.round(scores, 2) * boost)
+            )
+            best[:] = 0.0
+            # Ascending gains: a resume holding several matching terms keeps the largest
+            for t in np.argsort(gains, kind="stable").tolist():
+                best[arrays["postings"][matching[t]]] = gains[t]
+            bound += best
+        return bound
+
+    def _responsibility_scores(self, arrays, plan: RequirementPlan, rows: List[int], overlaps: Dict[int, float]) -> np.ndarray:
+        """
+        Exact responsibility points of `rows` (calculate_semantic_similarity with the
+        spaCy pipeline). Overlaps are computed once per distinct text and kept in
+        `overlaps` for the rest of the query; lemmatized term counts are kept for later queries.
+        """
+        groups = arrays["exp_group"][rows].tolist()
+        pending = sorted({g for g in groups if g not in overlaps})
+        if pending:
+            with self._lock:
+                missing = [g for g in pending if g not in self._exp_terms]
+            if missing:
+                lemmas = scorer.lemmatize_texts([arrays["exp_texts"][g] for g in missing])
+                with self._lock:
+                    self._exp_terms.update(zip(missing, map(scorer.term_counts, lemmas)))
+            jd_terms = scorer.term_counts(scorer.lemmatize_texts([plan.responsibilities_text])[0])
+            for g in pending:
+                overlaps[g] = scorer.tfidf_cosine_counts(self._exp_terms[g], jd_terms)
+        return plan.weights["resp"] * np.fromiter((overlaps[g] for g in groups), dtype=np.float64, count=len(groups))
+
+    def rank(self, plan: RequirementPlan, top_k: int = 10) -> dict:
+        """
+        Top-k resumes for a compiled JD, best first (ties by insertion order).
+        Returns {"results": [(resume_id, label, MatchScore)], "scored": n, "corpus_size": N}.
+        """
+        with self._lock:
+            arrays = self._snapshot()
+            size = len(arrays["ids"])
+            if size == 0 or top_k <= 0:
+                return {"results": [], "scored": 0, "corpus_size": size}
+            weights = plan.weights
+
+            # Exact parts: experience, ATS coverage
+            years = arrays["years"]
+            bound = weights["exp"] * (np.minimum(1.0, years / plan.required_years) if plan.required_years > 0 else np.ones(size))
+            if plan.ats_keywords:
+                found = np.zeros(size, dtype=np.float64)
+                for kw in plan.ats_keywords: # Duplicate keywords count twice, as in advanced_match
+                    term = self._term_ids.get(kw)
+                    if term is not None:
+                        found[arrays["postings"][term]] += 1
+                bound += weights["ats"] * found / len(plan.ats_keywords)
+            else:
+                bound += weights["ats"]
+
+            # Upper bounds: responsibilities (exact without the pipeline, where the overlap does
+            # not depend on the text), skills and stack (zero when the semantic matcher is unavailable)
+            matching_enabled = scorer.get_nlp() is not None
+            refine_resp = matching_enabled and bool(plan.responsibilities_text)
+            if plan.responsibilities_text and not matching_enabled:
+                bound += weights["resp"] * scorer.calculate_semantic_similarity("", plan.responsibilities_text)
+            else:
+                bound += weights["resp"]
+            if not plan.required:
+                bound += weights["skills"]
+            elif matching_enabled:
+                bound += self._requirement_bounds(arrays, plan.required, plan.points_per_skill, EVIDENCE_BOOST)
+            if not plan.stack:
+                bound += weights["stacks"]
+            elif matching_enabled:
+                bound += self._requirement_bounds(arrays, plan.stack, plan.points_per_stack, 1.0)
+
+        # Full scoring in decreasing bound order, a block at a time, until no remaining
+        # bound can enter the top-k
+        order = np.argsort(-bound, kind="stable").tolist()
+        block_size = max(top_k, SCORING_BLOCK)
+        top = [] # min-heap of (score, -row, resume)
+        scored = taken = 0
+        overlaps = {} # Responsibility overlap per distinct text
+        while taken < size:
+            block = []
+            for row in order[taken:taken + block_size]:
+                if len(top) >= top_k and math.floor(bound[row] + 1e-9) < top[0][0]:
+                    break
+                block.append(row)
+            if not block:
+                break
+            taken += len(block)
+            if refine_resp:
+                # Exact responsibility points instead of their bound: skip rows that no longer reach the top-k
+                exact = bound[block] - weights["resp"] + self._responsibility_scores(arrays, plan, block, overlaps)
+                block = [row for row, b in zip(block, exact.tolist())
+                         if len(top) < top_k or math.floor(b + 1e-9) >= top[0][0]]
+                if not block:
+                    continue
+            resumes = self.get_many([arrays["ids"][row] for row in block])
+            overall = advanced_match_many(resumes, plan).overall.tolist()
+            scored += len(block)
+            for row, resume, score in zip(block, resumes, overall):
+                entry = (score, -row, resume)
+                if len(top) < top_k:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
+
+        # Full reports only for the winners
+        ranked = sorted(top, key=lambda e: (-e[0], -e[1]))
+        return {
+            "results": [
+                (arrays["ids"][-neg_row], arrays["labels"][-neg_row], advanced_match(resume, plan))
+                for _, neg_row, resume in ranked
+            ],
+            "scored": scored,
+            "corpus_size": size
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "resumes": len(self._ids),
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._postings)
+            }
+
+def corpus_from_env() -> Optional[ResumeCorpus]:
+    """
+    MATCHLY_CORPUS_PATH (SQLite file) enables the resume corpus; unset keeps resumes out of storage.
+    """
+    path = os.getenv("MATCHLY_CORPUS_PATH")
+    return ResumeCorpus(path) if path else None
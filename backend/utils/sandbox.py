@@ -0,0 +1,288 @@
+import atexit
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError: # Not on Windows: the sandbox is disabled there
+    resource = None
+
+from .metrics import METRICS
+
+SANDBOX_EVENTS = METRICS.counter(
+    "matchly_sandbox_events_total",
+    "Extraction sandbox worker events: timeout, cpu_limit, memory_limit, crashed (worker killed) and recycled.",
+    ("event",)
+)
+
+class ExtractionLimitExceeded(Exception):
+    """Raised when a document hit the sandbox deadline, CPU or memory limit (reason says which)."""
+    def __init__(self, reason: str):
+        super().__init__(reason) # Only the reason in args, so it pickles across process pools
+        self.reason = reason
+
+    def __str__(self):
+        return f"Extraction stopped: {self.reason}"
+
+def _address_space() -> int:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+def _forget_forkserver():
+    # A forked child (e.g. a worker of a process-kind AnalysisPool) inherits the parent's
+    # forkserver state but cannot waitpid() the server ("No child processes"), so
+    # both sandbox and page pool would fail there. Start afresh: the child's own
+    # forkserver exits with it, when its end of the alive pipe closes.
+    from multiprocessing import forkserver
+    server = forkserver._forkserver
+    if server._forkserver_alive_fd is not None:
+        os.close(server._forkserver_alive_fd)
+    server._forkserver_address = server._forkserver_alive_fd = server._forkserver_pid = None
+    server._lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_forkserver)
+
+# True inside a sandbox worker, where extraction runs directly instead of in another sandbox
+IN_WORKER = False
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def limit_cpu(seconds: float):
+    """
+    Caps this process at `seconds` more CPU time (soft RLIMIT_CPU, whole seconds,
+    rounded up); 0 lifts the cap. RLIMIT_CPU counts the process lifetime, so the
+    limit is moved per task rather than set once.
+    """
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    soft = resource.RLIM_INFINITY if not seconds else int(_cpu_used()) + math.ceil(seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = hard if soft == resource.RLIM_INFINITY else min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def task_cpu_remaining() -> float:
+    """
+    CPU seconds left in the current sandbox task; 0 outside a worker or without a CPU limit.
+    """
+    if not IN_WORKER or resource is None:
+        return 0.0
+    soft = resource.getrlimit(resource.RLIMIT_CPU)[0]
+    if soft == resource.RLIM_INFINITY:
+        return 0.0
+    return max(0.0, soft - _cpu_used())
+
+def charge_cpu(seconds: float):
+    """
+    Counts CPU spent by helper processes (the page pool) against the current task.
+    Past the budget the worker ends itself with SIGXCPU, as if it had used the CPU
+    itself (the kernel only checks the limit while the worker is running).
+    """
+    if not IN_WORKER or resource is None or seconds <= 0:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if soft == resource.RLIM_INFINITY:
+        return
+    if _cpu_used() + seconds >= soft:
+        os.kill(os.getpid(), signal.SIGXCPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft - int(seconds), hard))
+
+@contextmanager
+def cpu_unlimited():
+    """
+    Lifts the task's CPU limit while helper processes are started, so they (and the
+    forkserver they come from) do not inherit it as a cap on their whole lifetime.
+    """
+    if not IN_WORKER or resource is None:
+        yield
+        return
+    limits = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (limits[1], limits[1]))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, limits)
+
+def _worker_main(conn, memory_headroom: int, cpu_seconds: int):
+    global IN_WORKER
+    IN_WORKER = True
+    # Own process group: killing the worker also kills the page pool it may have started
+    os.setpgrp()
+    # Address space is capped at the size after start-up plus the headroom, so the
+    # limit means the same whatever the parent had mapped before forking
+    if memory_headroom:
+        limit = _address_space() + memory_headroom
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            return
+        if cpu_seconds:
+            limit_cpu(cpu_seconds)
+        try:
+            conn.send((True, fn(*args)))
+        except MemoryError:
+            conn.send((False, "memory_limit"))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, context, memory_headroom: int, cpu_seconds: int):
+        self.conn, child = context.Pipe()
+        # Not daemonic, so extraction can start its page pool (see parser._extract_pages);
+        # the sandbox kills workers itself on shutdown and at exit
+        self.process = context.Process(target=_worker_main, args=(child, memory_headroom, cpu_seconds),
+                                       name="matchly-extractor")
+        self.process.start()
+        child.close()
+        self.tasks = 0
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass # Group already gone (or the worker died before setpgrp)
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class ExtractionSandbox:
+    """
+    Runs document extraction in recyclable subprocesses with a wall-clock deadline,
+    an RLIMIT_AS memory cap and an RLIMIT_CPU limit per task. A worker that misses
+    the deadline or dies is killed and replaced; the caller gets
+    ExtractionLimitExceeded and the server carries on. Workers are reused for up
+    to `max_tasks` documents, then recycled. Each worker leads its own process
+    group, so killing it also stops any page pool it started.
+
+    Workers come from a forkserver that has the parsers imported, so starting one is a fork.
+    """
+    def __init__(self, timeout: float = 20.0, memory_mb: int = 384, cpu_seconds: int = 15, max_tasks: int = 200,
+                 preload=("utils.parser", "fitz", "pdfplumber")):
+        self.timeout = timeout
+        self.memory_headroom = memory_mb * 1024 * 1024
+        self.cpu_seconds = cpu_seconds
+        self.max_tasks = max_tasks
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(list(preload))
+        self._idle: List[_Worker] = []
+        self._workers = set() # Idle and busy, for shutdown
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+        # A forked child (e.g. a worker of a process-kind AnalysisPool) starts its own workers
+        multiprocessing.util.register_after_fork(self, ExtractionSandbox._after_fork)
+
+    def _after_fork(self):
+        # The inherited workers belong to the parent: only it can poll or join them.
+        # atexit does not run in multiprocessing children, so shut ours down from the
+        # exit finalizers, which run before non-daemonic children are joined
+        self._idle, self._workers, self._lock = [], set(), threading.Lock()
+        multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
+    def _start(self) -> _Worker:
+        worker = _Worker(self._context, self.memory_headroom, self.cpu_seconds)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: _Worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+
+    def _acquire(self) -> _Worker:
+        while True:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                return self._start()
+            if worker.process.is_alive():
+                return worker
+            self._kill(worker)
+
+    def _release(self, worker: _Worker):
+        if worker.tasks >= self.max_tasks:
+            SANDBOX_EVENTS.inc("recycled")
+            self._kill(worker)
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def run(self, fn, *args):
+        """
+        fn(*args) in a sandbox worker; fn and its arguments must be picklable.
+        """
+        worker = self._acquire()
+        worker.tasks += 1
+        deadline = time.monotonic() + self.timeout
+        try:
+            worker.conn.send((fn, args))
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                self._kill(worker)
+                SANDBOX_EVENTS.inc("timeout")
+                raise ExtractionLimitExceeded("timeout")
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError):
+            # The worker died mid-task: SIGXCPU at the CPU limit, or killed (OOM, crash in a C parser)
+            self._kill(worker)
+            reason = "cpu_limit" if worker.process.exitcode == -signal.SIGXCPU else "crashed"
+            SANDBOX_EVENTS.inc(reason)
+            raise ExtractionLimitExceeded(reason)
+        if not ok:
+            # The worker's heap may be fragmented or half-initialised: do not reuse it
+            self._kill(worker)
+            if value == "memory_limit":
+                SANDBOX_EVENTS.inc("memory_limit")
+                raise ExtractionLimitExceeded("memory_limit")
+            raise RuntimeError(f"Sandboxed extraction failed: {value}")
+        self._release(worker)
+        return value
+
+    def warm_up(self):
+        """
+        Starts the forkserver and one idle worker, so the first document does not pay for them.
+        """
+        with self._lock:
+            if self._idle:
+                return
+        worker = self._start()
+        with self._lock:
+            self._idle.append(worker)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle_workers": len(self._idle), "timeout_s": self.timeout,
+                    "memory_headroom_mb": self.memory_headroom // (1024 * 1024), "cpu_seconds": self.cpu_seconds}
+
+    def shutdown(self):
+        # Busy workers too: non-daemonic workers would otherwise keep the interpreter from exiting
+        with self._lock:
+            workers, self._workers, self._idle = self._workers, set(), []
+        for worker in workers:
+            worker.kill()
+
+def sandbox_from_env() -> Optional[ExtractionSandbox]:
+    """
+    MATCHLY_SANDBOX (1/0), MATCHLY_SANDBOX_TIMEOUT (s), MATCHLY_SANDBOX_MEMORY_MB,
+    MATCHLY_SANDBOX_CPU_SECONDS, MATCHLY_SANDBOX_MAX_TASKS. None when disabled or unsupported.
+    """
+    if os.getenv("MATCHLY_SANDBOX", "1").lower() in ("0", "false", "no") or resource is None:
+        return None
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    return ExtractionSandbox(
+        timeout=float(os.getenv("MATCHLY_SANDBOX_TIMEOUT", "20")),
+        memory_mb=int(os.getenv("MATCHLY_SANDBOX_MEMORY_MB", "384")),
+        cpu_seconds=int(os.getenv("MATCHLY_SANDBOX_CPU_SECONDS", "15")),
+        max_tasks=int(os.getenv("MATCHLY_SANDBOX_MAX_TASKS", "200"))
+    )
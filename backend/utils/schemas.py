@@ -1,5 +1,5 @@
 from typing import List, Dict, Optional, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 # --- 1. JD Analysis Parsing Schema ---
 class MandatoryRequirements(BaseModel):
@@ -78,6 +78,8 @@ class ParsedResume(BaseModel):
     tools_and_methods_used: List[str] = []
     domains_worked_in: List[str] = []
     raw_text: str = "" 
+    # SkillFingerprint of the normalized skills, set once by fingerprint.resume_fingerprint
+    _fingerprint: Any = PrivateAttr(default=None)
     
     # Backward compatibility properties
     @property
@@ -119,3 +121,14 @@ class MatchScore(BaseModel):
     # UI Metadata
     detected_years_experience: float = 0.0
     required_years_experience: int = 0
+
+# --- 4. Document Preflight Schema ---
+class DocumentPreflight(BaseModel):
+    status: str # text | image_only | encrypted | unsupported_format | oversized | no_text | unknown
+    format: str # pdf | docx | txt
+    parseable: bool # False: extraction is skipped and the upload rejected
+    reason: str = ""
+    pages: int = 0
+    text_chars: int = 0 # Text found in the sampled pages/parts (stops counting at the threshold)
+    images: int = 0
+    elapsed_ms: float = 0.0
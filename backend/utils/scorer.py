@@ -1,28 +1,43 @@
+import os
 import re
 import math
-from collections import Counter
-from utils.normalizer import normalize_skill
-from utils.it_taxonomy_data import IT_TAXONOMY
+import threading
+import time
+from collections import Counter, OrderedDict
+from utils.normalizer import TAXONOMY_INDEX
+from utils.skill_matcher import SkillMatcher
+from utils.skill_proximity import match_skills
+from utils.engines import ENGINES, EngineUnavailable
+from utils.metrics import NLP_SECONDS
 
 # Lightweight Semantic Matching (TF-IDF + Spacy) for Memory Optimization
-try:
+# "fast" (default) keeps only what lemma/stopword cleaning needs: tok2vec, tagger,
+# attribute_ruler, lemmatizer. "full" loads the whole pipeline as before.
+SPACY_MODE = os.getenv("MATCHLY_SPACY_MODE", "fast").lower()
+SPACY_EXCLUDED = ["parser", "ner", "senter"] if SPACY_MODE == "fast" else []
+LEMMA_CACHE_SIZE = int(os.getenv("MATCHLY_LEMMA_CACHE_SIZE", "1024"))
+LEMMA_BATCH_SIZE = 32
+SEMANTIC_TEXT_LIMIT = 2000 # Limit to 2000 chars for speed
+
+def _load_spacy():
     import spacy
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
     
     # Load small spacy model for lemma/stopword handling (Lightweight)
-    nlp = spacy.load("en_core_web_sm") 
-    SEMANTIC_AVAILABLE = True
-    print("Semantic Engine: Loaded lightweight TF-IDF + Spacy en_core_web_sm.")
-except ImportError as e:
-    nlp = None
-    SEMANTIC_AVAILABLE = False
-    print(f"Warning: Semantic dependencies missing: {e}")
-except Exception as e:
-    nlp = None
-    SEMANTIC_AVAILABLE = False
-    print(f"Warning: Could not load Semantic Engine: {e}")
+    model = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED)
+    print(f"Semantic Engine: Loaded lightweight TF-IDF + Spacy en_core_web_sm ({SPACY_MODE} mode: {', '.join(model.pipe_names)}).")
+    return model
+
+# Loaded on first use (or via /ready warm-up); the scorer degrades gracefully without it
+ENGINES.register("spacy", _load_spacy, required=False)
+
+def get_nlp():
+    """
+    The shared spaCy pipeline, or None when the semantic dependencies are missing.
+    """
+    try:
+        return ENGINES.get("spacy")
+    except EngineUnavailable:
+        return None
 
 COMMON_SKILLS_DB = [
     "python", "java", "javascript", "typescript", "react", "angular", "vue", "node.js", 
@@ -32,6 +47,7 @@ COMMON_SKILLS_DB = [
     "c++", "c#", ".net", "go", "rust", "terraform", "ansible", "jenkins", "linux", "agile",
     "scrum", "jira", "figma", "photoshop", "redis", "kafka", "elasticsearch"
 ]
+COMMON_SKILLS_MATCHER = SkillMatcher({"common": COMMON_SKILLS_DB})
 
 def extract_skills_with_context(text):
     """
@@ -41,13 +57,9 @@ def extract_skills_with_context(text):
     text_lower = text.lower()
     found_skills = Counter()
     
-    # Check against known DB
-    for skill in COMMON_SKILLS_DB:
-        # Regex for whole word match
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        matches = re.findall(pattern, text_lower)
-        if matches:
-            found_skills[normalize_skill(skill)] += len(matches)
+    # Check against known DB (single compiled scan, symbol-aware for c++, c#, .net)
+    for hit in COMMON_SKILLS_MATCHER.finditer(text_lower):
+        found_skills[TAXONOMY_INDEX.normalize(hit.skill)] += 1
             
     return found_skills
 
@@ -95,32 +107,93 @@ def parse_job_description(jd_text):
         "all_skills_flat": list(required_skills.union(preferred_skills))
     }
 
+# Bounded LRU: cleaned (lowercased, truncated) text -> lemmatized, stopword-free text
+_lemma_cache = OrderedDict()
+# Analysis pool threads share the cache; spaCy itself runs outside the lock
+_lemma_lock = threading.Lock()
+
+def lemmatize_texts(texts):
+    """
+    Lemmatizes + removes stopwords/punctuation for a batch of texts.
+    Cache hits (same JD text, repeated responsibilities) skip spaCy entirely;
+    misses go through nlp.pipe in batches.
+    """
+    keys = [text[:SEMANTIC_TEXT_LIMIT].lower() for text in texts]
+    results = {}
+    misses = []
+    with _lemma_lock:
+        for key in keys:
+            cached = _lemma_cache.get(key)
+            if cached is not None:
+                _lemma_cache.move_to_end(key)
+                results[key] = cached
+            elif key not in results:
+                results[key] = None
+                misses.append(key)
+
+    if misses:
+        nlp = get_nlp()
+        started = time.perf_counter()
+        for key, doc in zip(misses, nlp.pipe(misses, batch_size=LEMMA_BATCH_SIZE)):
+            results[key] = " ".join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct])
+        NLP_SECONDS.observe(time.perf_counter() - started)
+        with _lemma_lock:
+            for key in misses:
+                _lemma_cache[key] = results[key]
+                _lemma_cache.move_to_end(key)
+            while len(_lemma_cache) > LEMMA_CACHE_SIZE:
+                _lemma_cache.popitem(last=False)
+
+    return [results[key] for key in keys]
+
+# Same tokenization as sklearn's TfidfVectorizer default
+TFIDF_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+def term_counts(doc) -> Counter:
+    """Raw term frequencies of a (lemmatized) document, tokenized like TfidfVectorizer."""
+    return Counter(TFIDF_TOKEN_PATTERN.findall(doc.lower()))
+
+def tfidf_cosine(doc1, doc2):
+    """
+    Cosine similarity of the two documents' TF-IDF vectors, identical to fitting
+    TfidfVectorizer() on [doc1, doc2] (raw tf, smooth idf, l2 norm) without
+    building a vectorizer per call. Returns 0.0 for an empty vocabulary.
+    """
+    return tfidf_cosine_counts(term_counts(doc1), term_counts(doc2))
+
+def tfidf_cosine_counts(tf1: Counter, tf2: Counter) -> float:
+    """tfidf_cosine on term_counts, for callers that compare one document many times."""
+    if not tf1 or not tf2:
+        return 0.0 # Handle empty vocabulary
+
+    # idf = ln((1 + n) / (1 + df)) + 1 with n = 2 documents
+    idf_shared = math.log(3 / 3) + 1
+    idf_single = math.log(3 / 2) + 1
+
+    def norm(tf, other):
+        return math.sqrt(sum((count * (idf_shared if term in other else idf_single)) ** 2 for term, count in tf.items()))
+
+    dot = sum(count * tf2[term] * idf_shared ** 2 for term, count in tf1.items() if term in tf2)
+    return float(dot / (norm(tf1, tf2) * norm(tf2, tf1)))
+
 def calculate_semantic_similarity(text1, text2):
-    if not SEMANTIC_AVAILABLE or not nlp:
+    if get_nlp() is None:
         return 0.5 
     
-    # 1. Preprocess (Lemmatize + Remove Stopwords)
-    def clean(text):
-        doc = nlp(text[:2000].lower()) # Limit to 2000 chars for speed
-        return " ".join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct])
-
-    t1_clean = clean(text1)
-    t2_clean = clean(text2)
+    # 1. Preprocess (Lemmatize + Remove Stopwords), batched and cached
+    t1_clean, t2_clean = lemmatize_texts([text1, text2])
     
     # 2. TF-IDF Similarity
-    vectorizer = TfidfVectorizer()
-    try:
-        tfidf_matrix = vectorizer.fit_transform([t1_clean, t2_clean])
-        return float(cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0])
-    except ValueError:
-        return 0.0 # Handle empty vocabulary
+    return tfidf_cosine(t1_clean, t2_clean)
 
 def semantic_match(jd_items, resume_items, threshold=0.65):
     """
     Performs semantic matching between a list of JD requirements and Resume items.
     Returns a structured list of match results with status and confidence.
+    Exact + substring + taxonomy category boost, gathered from the precomputed
+    skill proximity matrix with a row-wise argmax (see utils.skill_proximity).
     """
-    if not SEMANTIC_AVAILABLE or not nlp:
+    if get_nlp() is None:
         # Fallback for when model is not loaded
         return [{
             "jd_requirement": item,
@@ -128,106 +201,8 @@ def semantic_match(jd_items, resume_items, threshold=0.65):
             "confidence": 0.0,
             "status": "missing"
         } for item in jd_items]
-        
-    if not jd_items or not resume_items:
-         return [{
-            "jd_requirement": item,
-            "best_match": None,
-            "confidence": 0.0,
-            "status": "missing"
-        } for item in jd_items]
-
-    # Normalize items
-    normalized_resume_items = [normalize_skill(r) for r in resume_items]
-    
-    # Pre-compute spacy docs for resume items (Small en_core_web_sm doesn't have vectors but we can fuzzy match or just trust strict match + taxonomy)
-    # Using 'en_core_web_sm', .similarity() is weak. We rely more heavily on Taxonomy + Strict Match.
-    # To recover some "Fuzzy" capability, we use basic Jaccard or Levenshtein via Spacy tokens if needed
-    # But for now, we rely on the Taxonomy Loop which is robust.
-    
-    # Note: Removing heavy SentenceTransformer completely. 
-    # relying on the Exact Match + Taxonomy Boost logic which was already the core driver.
-
-    results = []
-    
-    for i, jd_item in enumerate(jd_items):
-        best_final_score = -1.0
-        best_match_text = None
-        
-        norm_jd = normalize_skill(jd_item)
-
-        # Iterate all resume items to find true best match after boost
-        for j, resume_item in enumerate(normalized_resume_items):
-             
-            norm_resume = normalize_skill(resume_item)
-            
-            # Base Score: 0.0 (Since we dropped BERT)
-            # We ONLY rely on Exact + Taxonomy Boost now. 
-            # This is safer for free tier than trying to run 400MB tensors.
-            current_score = 0.0 
-            
-            # 1. Exact Normal Match
-            if norm_jd == norm_resume:
-                current_score = 1.0
-            
-            # 1b. Substring Match (Cheap Semantic)
-            elif norm_jd in norm_resume or norm_resume in norm_jd:
-                current_score = 0.75 # Partial word match e.g. "aws" in "aws cloud"
-            
-            # 2. Category Cluster Boost (The "Secret Sauce")
-                # 2. Category Cluster Boost
-                for cat, skills in IT_TAXONOMY.items():
-                    if norm_jd in skills and norm_resume in skills:
-                        boost_factor = 1.0
-                        min_floor = 0.0
-                        
-                        # Foundational tech gets higher boost
-                        if cat == "languages":
-                            boost_factor = 1.2
-                            min_floor = 0.0 # Languages are distinct. C# != Java.
-                        elif cat == "databases":
-                            boost_factor = 1.3
-                            min_floor = 0.5 # Some overlap
-                            if norm_jd == "sql" or norm_resume == "sql": 
-                                boost_factor = 1.8 
-                                min_floor = 0.85 # SQL is universal
-                        elif cat in ["cloud", "devops", "security", "testing"]:
-                            boost_factor = 1.5
-                            min_floor = 0.70 # Tools are often swappable (AWS vs Azure)
-                        elif cat in ["frontend", "backend", "data_ai"]:
-                            boost_factor = 1.4
-                            min_floor = 0.65 # Frameworks (React vs Vue) have shared concepts
-                        else:
-                            boost_factor = 1.1 
-                            min_floor = 0.0
-                        
-                        # Apply Boost AND Floor
-                        current_score = max(current_score * boost_factor, min_floor)
-                        current_score = min(1.0, current_score)
-                        break
-            
-            if current_score > best_final_score:
-                best_final_score = current_score
-                best_match_text = resume_items[j] # Use original text
-
-        # Determine Status based on Best Final Score
-        status = "missing"
-        if best_final_score >= 0.85:
-            status = "strong"
-        elif best_final_score >= 0.65:
-            status = "partial"
-        
-        # If missing, don't show the "best match" as it's irrelevant/confusing
-        match_text = best_match_text if status != "missing" else None
-
-        results.append({
-            "jd_requirement": jd_item,
-            "best_match": match_text,
-            "confidence": round(best_final_score, 2),
-            "status": status
-        })
 
-    return results
+    return match_skills(jd_items, resume_items)
 
 def calculate_score(resume_sections, jd_text):
     """
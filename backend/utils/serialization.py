@@ -0,0 +1,41 @@
+import json
+from enum import Enum
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError: # Optional: falls back to the stdlib encoder with the same output
+    orjson = None
+
+def _default(obj):
+    # Models built by our own agents are already valid: dump them without re-validation
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj) -> bytes:
+    """
+    Compact UTF-8 JSON of dicts/lists that may contain pydantic models and numpy values.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with dumps(). Returning it from an endpoint also skips
+    FastAPI's jsonable_encoder pass over the payload.
+    """
+    def render(self, content) -> bytes:
+        return dumps(content)
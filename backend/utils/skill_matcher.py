@@ -0,0 +1,113 @@
+import re
+from typing import Dict, Iterator, List, NamedTuple
+
+from .it_taxonomy_data import IT_TAXONOMY
+
+# Delimiters accepted around skills that contain symbols (C++, C#, .NET) where \b fails
+SYMBOL_DELIMITERS = r'[\s\.,;:\(\)\[\]\-/]'
+SYMBOL_CHARS = ('+', '#', '.')
+
+
+class SkillHit(NamedTuple):
+    skill: str
+    category: str
+    start: int
+    end: int
+
+
+def _skill_pattern(skill: str) -> str:
+    """
+    Exact boundary rule for one skill, written with lookarounds so it can be
+    anchored at a candidate position without consuming the delimiters.
+    """
+    if any(c in skill for c in SYMBOL_CHARS):
+        return r'(?:^|(?<=' + SYMBOL_DELIMITERS + r'))' + re.escape(skill) + r'(?=$|' + SYMBOL_DELIMITERS + r')'
+    return r'\b' + re.escape(skill) + r'\b'
+
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Builds a prefix-factored alternation (longest alternative first at every node)
+    so the regex engine branches on one character instead of trying every skill.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if '' in node:
+            branches.append('')  # Shorter word ends here; tried last so the longest wins
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """
+    Compiled multi-pattern matcher over a {category: [skills]} taxonomy.
+
+    One scan finds the longest skill literal starting at each position; every
+    shorter skill that is a prefix of it is then verified with its own boundary
+    rule. This reports exactly the hits the per-skill `re.search` loops found,
+    with category and character span, in a single pass over the text.
+    Input text is expected to be lowercased already (taxonomy skills are lowercase).
+    """
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.categories: Dict[str, List[str]] = {}
+        self._order: Dict[tuple, int] = {}
+        for category, skills in taxonomy.items():
+            for skill in skills:
+                if (category, skill) in self._order:
+                    continue
+                self._order[(category, skill)] = len(self._order)
+                self.categories.setdefault(skill, []).append(category)
+
+        skills = list(self.categories)
+        self._exact = {s: re.compile(_skill_pattern(s)) for s in skills}
+        # Longest first: a literal hit implies a candidate hit for each of its skill prefixes
+        self._prefixes = {
+            s: sorted((p for p in skills if s.startswith(p)), key=len, reverse=True)
+            for s in skills
+        }
+
+        word_start = [s for s in skills if re.match(r'\w', s)]
+        other_start = [s for s in skills if not re.match(r'\w', s)]
+        alternatives = []
+        if word_start:
+            alternatives.append(r'(?<!\w)(?=(' + _trie_regex(word_start) + r'))')
+        if other_start:
+            alternatives.append(r'(?=(' + _trie_regex(other_start) + r'))')
+        self._scanner = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def finditer(self, text: str) -> Iterator[SkillHit]:
+        """
+        Yields every skill occurrence in text order (one hit per category the skill belongs to).
+        """
+        if self._scanner is None:
+            return
+        for match in self._scanner.finditer(text):
+            literal = match.group(match.lastindex)
+            start = match.start()
+            for skill in self._prefixes[literal]:
+                if self._exact[skill].match(text, start):
+                    for category in self.categories[skill]:
+                        yield SkillHit(skill, category, start, start + len(skill))
+
+    def first_hits(self, text: str) -> List[SkillHit]:
+        """
+        Returns the first occurrence of each (category, skill), in taxonomy order.
+        """
+        first = {}
+        for hit in self.finditer(text):
+            first.setdefault((hit.category, hit.skill), hit)
+        return [first[key] for key in sorted(first, key=self._order.__getitem__)]
+
+
+# Built once at import; shared by the extraction agents and the legacy scorer
+IT_SKILL_MATCHER = SkillMatcher(IT_TAXONOMY)
@@ -0,0 +1,139 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .normalizer import TaxonomyIndex, TAXONOMY_INDEX
+
+# Category Cluster Boost (The "Secret Sauce"): (boost_factor, min_floor)
+CATEGORY_BOOST = {
+    "languages": (1.2, 0.0),      # Languages are distinct. C# != Java.
+    "databases": (1.3, 0.5),      # Some overlap
+    "cloud": (1.5, 0.70),         # Tools are often swappable (AWS vs Azure)
+    "devops": (1.5, 0.70),
+    "security": (1.5, 0.70),
+    "testing": (1.5, 0.70),
+    "frontend": (1.4, 0.65),      # Frameworks (React vs Vue) have shared concepts
+    "backend": (1.4, 0.65),
+    "data_ai": (1.4, 0.65),
+}
+DEFAULT_BOOST = (1.1, 0.0)
+SQL_BOOST = (1.8, 0.85)           # SQL is universal
+
+def pair_confidence(norm_jd: str, norm_resume: str, index: TaxonomyIndex = TAXONOMY_INDEX) -> float:
+    """
+    Match confidence between two normalized skills:
+    exact match, cheap substring match, then the category boost/floor on substring hits.
+    """
+    # 1. Exact Normal Match
+    if norm_jd == norm_resume:
+        return 1.0
+
+    # 1b. Substring Match (Cheap Semantic), e.g. "aws" in "aws cloud"
+    if not (norm_jd in norm_resume or norm_resume in norm_jd):
+        return 0.0
+    score = 0.75
+
+    # 2. Category Cluster Boost
+    cat = index.shared_category(norm_jd, norm_resume)
+    if cat is not None:
+        boost_factor, min_floor = CATEGORY_BOOST.get(cat, DEFAULT_BOOST)
+        if cat == "databases" and (norm_jd == "sql" or norm_resume == "sql"):
+            boost_factor, min_floor = SQL_BOOST
+        # Apply Boost AND Floor
+        score = min(1.0, max(score * boost_factor, min_floor))
+    return score
+
+class SkillProximityMatrix:
+    """
+    Dense skill x skill confidence matrix over the taxonomy vocabulary (canonical
+    skills + alias targets), precomputed once. Skills outside the vocabulary
+    (free-text capabilities such as "API Development") are scored on the fly:
+    they can only match exactly or by substring, never through a shared category.
+    """
+    def __init__(self, index: TaxonomyIndex = TAXONOMY_INDEX):
+        self.index = index
+        self.vocabulary: Tuple[str, ...] = tuple(sorted(index.all_skills | set(index.aliases.values())))
+        self.ids: Dict[str, int] = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+        size = len(self.vocabulary)
+        matrix = np.zeros((size, size), dtype=np.float64)
+        for i, a in enumerate(self.vocabulary):
+            for j, b in enumerate(self.vocabulary):
+                matrix[i, j] = pair_confidence(a, b, index)
+        matrix.setflags(write=False)
+        self.matrix = matrix
+
+    def to_ids(self, skills: Sequence[str]) -> np.ndarray:
+        """
+        Integer ids for normalized skills, -1 for out-of-vocabulary entries.
+        """
+        return np.fromiter((self.ids.get(s, -1) for s in skills), dtype=np.intp, count=len(skills))
+
+    def scores(self, jd_skills: Sequence[str], resume_skills: Sequence[str]) -> np.ndarray:
+        """
+        (len(jd_skills), len(resume_skills)) confidence block for normalized skills.
+        """
+        jd_ids = self.to_ids(jd_skills)
+        resume_ids = self.to_ids(resume_skills)
+        jd_known = jd_ids >= 0
+        resume_known = resume_ids >= 0
+
+        block = np.empty((len(jd_ids), len(resume_ids)), dtype=np.float64)
+        block[np.ix_(jd_known, resume_known)] = self.matrix[np.ix_(jd_ids[jd_known], resume_ids[resume_known])]
+
+        # Out-of-vocabulary rows/columns: exact or substring only (never in a shared category)
+        for i in np.flatnonzero(~jd_known).tolist():
+            a = jd_skills[i]
+            block[i, :] = [1.0 if a == b else 0.75 if (a in b or b in a) else 0.0 for b in resume_skills]
+        known_rows = np.flatnonzero(jd_known).tolist()
+        for j in np.flatnonzero(~resume_known).tolist():
+            b = resume_skills[j]
+            block[known_rows, j] = [0.75 if (a in b or b in a) else 0.0 for a in (jd_skills[i] for i in known_rows)]
+        return block
+
+    def best_matches(self, jd_skills: Sequence[str], resume_skills: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row-wise argmax: index of the best resume skill per JD skill (first on ties) and its confidence.
+        """
+        block = self.scores(jd_skills, resume_skills)
+        best_idx = block.argmax(axis=1)
+        return best_idx, block[np.arange(len(jd_skills)), best_idx]
+
+# Built once at import; shared by semantic_match and the batch scorers
+SKILL_PROXIMITY = SkillProximityMatrix()
+
+def match_skills(jd_items: List[str], resume_items: List[str]) -> List[dict]:
+    """
+    Best resume match per JD item with status/confidence (the core of semantic_match).
+    """
+    if not jd_items or not resume_items:
+        return [{
+            "jd_requirement": item,
+            "best_match": None,
+            "confidence": 0.0,
+            "status": "missing"
+        } for item in jd_items]
+
+    normalize = SKILL_PROXIMITY.index.normalize
+    best_idx, best_scores = SKILL_PROXIMITY.best_matches(
+        [normalize(j) for j in jd_items],
+        [normalize(r) for r in resume_items]
+    )
+
+    results = []
+    for jd_item, j, score in zip(jd_items, best_idx.tolist(), best_scores.tolist()):
+        # Determine Status based on Best Final Score
+        status = "missing"
+        if score >= 0.85:
+            status = "strong"
+        elif score >= 0.65:
+            status = "partial"
+
+        results.append({
+            "jd_requirement": jd_item,
+            # If missing, don't show the "best match" as it's irrelevant/confusing
+            "best_match": resume_items[j] if status != "missing" else None,
+            "confidence": round(score, 2),
+            "status": status
+        })
+    return results
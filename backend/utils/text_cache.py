@@ -0,0 +1,127 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+class TextCache:
+    """
+    Content-addressed cache of extracted document text.
+
+    Keys are the SHA-256 of the uploaded bytes plus document kind and parser
+    version, so re-uploads of the same file skip extraction and a parser
+    change invalidates old entries. Two tiers:
+      - an in-memory LRU bounded by entry count and total characters
+      - an optional SQLite file of zlib-compressed text that survives restarts
+    """
+    def __init__(self, max_entries: int = 256, max_chars: int = 64 * 1024 * 1024,
+                 disk_path: Optional[str] = None, disk_max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.disk_max_entries = disk_max_entries
+        self._memory = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS text_cache (key TEXT PRIMARY KEY, text BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(content: bytes, kind: str, parser_version: str) -> str:
+        return f"{hashlib.sha256(content).hexdigest()}:{kind}:{parser_version}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return text
+
+            if self._db is not None:
+                row = self._db.execute("SELECT text FROM text_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    text = zlib.decompress(row[0]).decode("utf-8")
+                    self._db.execute("UPDATE text_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    self._remember(key, text)
+                    return text
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._remember(key, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO text_cache (key, text, accessed) VALUES (?, ?, ?)",
+                    (key, zlib.compress(text.encode("utf-8")), time.time())
+                )
+                overflow = self._db.execute("SELECT COUNT(*) FROM text_cache").fetchone()[0] - self.disk_max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM text_cache WHERE key IN (SELECT key FROM text_cache ORDER BY accessed LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._counters["disk_evictions"] += overflow
+                self._db.commit()
+
+    def _remember(self, key: str, text: str):
+        # Caller holds the lock
+        if key in self._memory:
+            self._chars -= len(self._memory.pop(key))
+        if len(text) > self.max_chars:
+            return
+        self._memory[key] = text
+        self._chars += len(text)
+        while len(self._memory) > self.max_entries or self._chars > self.max_chars:
+            _, evicted = self._memory.popitem(last=False)
+            self._chars -= len(evicted)
+            self._counters["evictions"] += 1
+
+    def counters(self) -> dict:
+        """Monotonic event counts (hits, misses, evictions)."""
+        with self._lock:
+            return dict(self._counters)
+
+    def add_counters(self, counts: dict):
+        """Adds counts recorded by another process's copy of this cache (see utils.workers)."""
+        with self._lock:
+            for key, value in counts.items():
+                self._counters[key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._memory),
+                "chars": self._chars,
+                "disk_enabled": self._db is not None
+            }
+
+def text_cache_from_env() -> TextCache:
+    """
+    MATCHLY_TEXT_CACHE_SIZE (entries), MATCHLY_TEXT_CACHE_MAX_MB (characters, in millions),
+    MATCHLY_TEXT_CACHE_DB (SQLite path, enables the disk tier), MATCHLY_TEXT_CACHE_DB_SIZE (entries).
+    """
+    return TextCache(
+        max_entries=int(os.getenv("MATCHLY_TEXT_CACHE_SIZE", "256")),
+        max_chars=int(os.getenv("MATCHLY_TEXT_CACHE_MAX_MB", "64")) * 1024 * 1024,
+        disk_path=os.getenv("MATCHLY_TEXT_CACHE_DB") or None,
+        disk_max_entries=int(os.getenv("MATCHLY_TEXT_CACHE_DB_SIZE", "10000"))
+    )
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .metrics import METRICS
+
+class PoolBusy(Exception):
+    """Raised when the analysis pool and its queue are full (backpressure)."""
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis pool is at capacity, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+# Caches whose hit/miss counters live in the process that uses them: name -> callable
+# returning the cache (looked up per job, since the cache object may be replaced)
+_COUNTED_CACHES = {}
+# True in the workers of a process-kind pool
+_IN_PROCESS_WORKER = False
+
+def count_in_parent(name: str, get_cache):
+    """
+    Registers a cache with counters() and add_counters(counts). In a process worker,
+    the counts a job adds come back with its result and are added to the parent's
+    cache, so /stats and /metrics count lookups made in every worker.
+    """
+    _COUNTED_CACHES[name] = get_cache
+
+def _mark_process_worker():
+    global _IN_PROCESS_WORKER
+    _IN_PROCESS_WORKER = True
+
+def _cache_counters() -> dict:
+    return {name: get_cache().counters() for name, get_cache in _COUNTED_CACHES.items()}
+
+def _counter_deltas(before) -> dict:
+    if before is None:
+        return {}
+    deltas = {}
+    for name, counts in _cache_counters().items():
+        changed = {key: value - before.get(name, {}).get(key, 0) for key, value in counts.items()}
+        changed = {key: value for key, value in changed.items() if value}
+        if changed:
+            deltas[name] = changed
+    return deltas
+
+def _add_counters(deltas: dict):
+    for name, counts in deltas.items():
+        get_cache = _COUNTED_CACHES.get(name)
+        if get_cache is not None:
+            get_cache().add_counters(counts)
+
+def _timed_call(enqueued_at, fn, *args):
+    # Runs inside the worker: report how long the job sat in the queue and how long it ran.
+    # time.monotonic is system-wide on Linux, so this also holds for process workers.
+    # Metric updates made by fn (and, in a process worker, the cache counts it added)
+    # come back with the result (or the error) and are applied by the caller, so they
+    # reach /metrics and /stats from process workers too.
+    started_at = time.monotonic()
+    counters = _cache_counters() if _IN_PROCESS_WORKER else None
+    with METRICS.deferred() as updates:
+        try:
+            result = fn(*args)
+        except Exception as e:
+            e.metric_updates = updates
+            e.cache_counts = _counter_deltas(counters)
+            raise
+    return started_at - enqueued_at, time.monotonic() - started_at, result, updates, _counter_deltas(counters)
+
+class AnalysisPool:
+    """
+    Bounded executor for the CPU-bound pipeline stages (text extraction,
+    agents, scoring), so they never run on the event loop.
+
+    At most `workers + queue_size` requests are admitted at once; beyond that
+    `admit()` fails fast with PoolBusy instead of piling work up.
+    """
+    def __init__(self, workers: int, queue_size: int, kind: str = "thread", retry_after: int = 2):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.kind = kind
+        self.retry_after = retry_after
+        self._executor = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def _get_executor(self):
+        # Created on first use so importing the app does not spawn workers
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_mark_process_worker)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="matchly-worker")
+        return self._executor
+
+    @asynccontextmanager
+    async def admit(self, slots: int = 1):
+        """
+        Reserves `slots` slots (one per job the caller runs at a time) for the duration
+        of the block; raises PoolBusy when they are not all free.
+        """
+        with self._lock:
+            if self._admitted + slots > self.capacity:
+                self._rejected += 1
+                raise PoolBusy(self.retry_after)
+            self._admitted += slots
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._admitted -= slots
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) on the pool and awaits the result without blocking the event loop.
+        """
+        result, _, _ = await self.run_timed(fn, *args)
+        return result
+
+    async def run_timed(self, fn, *args):
+        """
+        Like run, but returns (result, queue wait seconds, run seconds).
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            wait, duration, result, updates, counts = await loop.run_in_executor(self._get_executor(), _timed_call, time.monotonic(), fn, *args)
+        except Exception as e:
+            METRICS.replay(getattr(e, "metric_updates", ()))
+            _add_counters(getattr(e, "cache_counts", {}))
+            raise
+        METRICS.replay(updates)
+        _add_counters(counts)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_last = wait
+            self._wait_max = max(self._wait_max, wait)
+        return result, wait, duration
+
+    def stats(self) -> dict:
+        with self._lock:
+            admitted = self._admitted
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": admitted,
+                "queue_depth": max(0, admitted - self.workers),
+                "rejected": self._rejected,
+                "completed_jobs": self._completed,
+                "avg_wait_ms": round(self._wait_total / self._completed * 1000, 2) if self._completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "last_wait_ms": round(self._wait_last * 1000, 2)
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def pool_from_env() -> AnalysisPool:
+    """
+    MATCHLY_POOL_KIND (thread|process), MATCHLY_WORKERS, MATCHLY_QUEUE_SIZE, MATCHLY_RETRY_AFTER.
+    """
+    workers = int(os.getenv("MATCHLY_WORKERS", str(min(4, os.cpu_count() or 1))))
+    return AnalysisPool(
+        workers=workers,
+        queue_size=int(os.getenv("MATCHLY_QUEUE_SIZE", str(workers * 2))),
+        kind=os.getenv("MATCHLY_POOL_KIND", "thread").lower(),
+        retry_after=int(os.getenv("MATCHLY_RETRY_AFTER", "2"))
+    )
@@ -65,7 +65,7 @@ export default function Home() {
     }
 
     try {
-      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000'}/analyze`, {
+      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000'}/analyze?fields=filename,analysis,ai_insights,debug_advanced`, {
         method: 'POST',
         body: formData
       });